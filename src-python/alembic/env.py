@@ -9,6 +9,7 @@ import sys; import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from models import Base  # Import your models here to access metadata
+from schema_fingerprint import clear_schema_fingerprint
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -75,6 +76,8 @@ def run_migrations_online() -> None:
 
         with context.begin_transaction():
             context.run_migrations()
+            # The migrated schema is re-checked by the app's full startup steps on its next launch.
+            clear_schema_fingerprint(connection)
 
 
 if context.is_offline_mode():
@@ -0,0 +1,40 @@
+"""Move document, logo and receipt blobs out of the database into the blob store
+
+Revision ID: 3c9a41f07d2b
+Revises: 7f83e0eaece2
+Create Date: 2026-10-19 14:03:27.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from blob_store import externalize_inline_blobs, inline_external_blobs
+from models import blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a41f07d2b'
+down_revision: Union[str, Sequence[str], None] = '7f83e0eaece2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, primary key, column) - the ExternalBlob columns in models.py.
+BLOB_COLUMNS = [
+    ("user", "user_id", "business_logo"),
+    ("subscription_payments", "payment_id", "trx_screenshot"),
+    ("documents", "doc_id", "file_blob"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Identical blobs are stored once; the columns keep only "ssc-blob:sha256:<hash>:<size>".
+    externalize_inline_blobs(op.get_bind(), blob_store, BLOB_COLUMNS, commit_batches=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The files are left in the blob store.
+    inline_external_blobs(op.get_bind(), blob_store, BLOB_COLUMNS)
@@ -0,0 +1,76 @@
+"""Add the local sync telemetry tables (sync runs and per-table metrics)
+
+Revision ID: 5e2b9c7d1a08
+Revises: 8d1521fa94c6
+Create Date: 2026-10-19 08:11:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b9c7d1a08'
+down_revision: Union[str, Sequence[str], None] = '8d1521fa94c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamp_dirty_columns():
+    # TimestampDirtyMixin in models.py.
+    return [
+        sa.Column('uuid', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('is_dirty', sa.Boolean(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_db_and_tables may already have added these on startup.
+    op.create_table('sync_runs',
+    sa.Column('sync_run_id', sa.Integer(), nullable=False),
+    sa.Column('user_uuid', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('duration_ms', sa.Float(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    *_timestamp_dirty_columns(),
+    sa.CheckConstraint("status IN ('success', 'failed')", name='check_sync_run_status'),
+    sa.ForeignKeyConstraint(['user_uuid'], ['user.uuid'], ),
+    sa.PrimaryKeyConstraint('sync_run_id'),
+    sa.UniqueConstraint('uuid'),
+    if_not_exists=True,
+    )
+    op.create_table('sync_table_metrics',
+    sa.Column('sync_table_metric_id', sa.Integer(), nullable=False),
+    sa.Column('sync_run_uuid', sa.String(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('phase', sa.String(), nullable=False),
+    sa.Column('rows', sa.Integer(), nullable=True),
+    sa.Column('bytes', sa.Integer(), nullable=True),
+    sa.Column('rpc_ms', sa.Float(), nullable=True),
+    sa.Column('merge_ms', sa.Float(), nullable=True),
+    sa.Column('blob_upload_ms', sa.Float(), nullable=True),
+    sa.Column('blob_uploads', sa.Integer(), nullable=True),
+    sa.Column('failures', sa.Integer(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    *_timestamp_dirty_columns(),
+    sa.CheckConstraint("phase IN ('push', 'pull')", name='check_sync_table_metric_phase'),
+    sa.ForeignKeyConstraint(['sync_run_uuid'], ['sync_runs.uuid'], ),
+    sa.PrimaryKeyConstraint('sync_table_metric_id'),
+    sa.UniqueConstraint('uuid'),
+    if_not_exists=True,
+    )
+    op.create_index('ix_sync_table_metrics_run', 'sync_table_metrics', ['sync_run_uuid'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sync_table_metrics_run', table_name='sync_table_metrics', if_exists=True)
+    op.drop_table('sync_table_metrics', if_exists=True)
+    op.drop_table('sync_runs', if_exists=True)
@@ -0,0 +1,97 @@
+"""Add secondary indexes for foreign keys, soft-delete and dirty flags
+
+Revision ID: 7f83e0eaece2
+Revises: d7c1f3b5a924
+Create Date: 2026-10-19 10:12:41.503214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f83e0eaece2'
+down_revision: Union[str, Sequence[str], None] = 'd7c1f3b5a924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) - mirrors the Index() declarations at the end of models.py.
+INDEXES = [
+    ("ix_user_organization_branch", "user", ["organization_uuid", "branch_uuid"]),
+    ("ix_user_branch", "user", ["branch_uuid"]),
+    ("ix_branches_organization", "branches", ["organization_uuid"]),
+    ("ix_application_settings_user", "application_settings", ["user_uuid"]),
+    ("ix_authentications_user", "authentications", ["user_uuid"]),
+    ("ix_customers_user_deleted", "customers", ["user_uuid", "deleted_at"]),
+    ("ix_customers_org_branch_deleted", "customers", ["organization_uuid", "branch_uuid", "deleted_at"]),
+    ("ix_projects_user_deleted", "projects", ["user_uuid", "deleted_at"]),
+    ("ix_projects_org_branch_deleted", "projects", ["organization_uuid", "branch_uuid", "deleted_at"]),
+    ("ix_projects_customer", "projects", ["customer_uuid"]),
+    ("ix_projects_system_config", "projects", ["system_config_uuid"]),
+    ("ix_invoices_user_deleted", "invoices", ["user_uuid", "deleted_at"]),
+    ("ix_payments_invoice", "payments", ["invoice_uuid"]),
+    ("ix_appliances_project", "appliances", ["project_uuid"]),
+    ("ix_documents_project", "documents", ["project_uuid"]),
+    ("ix_project_components_project", "project_components", ["project_uuid"]),
+    ("ix_project_components_item", "project_components", ["item_uuid"]),
+    ("ix_subscriptions_user", "subscriptions", ["user_uuid"]),
+    ("ix_subscription_payments_subscription", "subscription_payments", ["subscription_uuid"]),
+    ("ix_inventory_items_user_deleted", "inventory_items", ["user_uuid", "deleted_at"]),
+    ("ix_inventory_items_org_branch_deleted", "inventory_items", ["organization_uuid", "branch_uuid", "deleted_at"]),
+    ("ix_inventory_items_category", "inventory_items", ["category_uuid"]),
+    ("ix_stock_adjustments_item", "stock_adjustments", ["item_uuid"]),
+    ("ix_stock_adjustments_org_branch", "stock_adjustments", ["organization_uuid", "branch_uuid"]),
+    ("ix_stock_adjustments_user", "stock_adjustments", ["user_uuid"]),
+    ("ix_sync_log_user", "sync_log", ["user_uuid"]),
+    ("ix_sync_state_user_device", "sync_state", ["user_uuid", "device_id"]),
+]
+# ix_sync_lane_cursors_user_device and ix_sync_table_metrics_run are created with their tables
+# (9a4d6e2f8c15, 5e2b9c7d1a08).
+
+# Tables pushed by sync; each gets a partial index over its dirty rows.
+DIRTY_TABLES = [
+    "organizations",
+    "branches",
+    "user",
+    "application_settings",
+    "authentications",
+    "customers",
+    "system_configurations",
+    "projects",
+    "appliances",
+    "invoices",
+    "payments",
+    "subscription_payments",
+    "subscriptions",
+    "documents",
+    "sync_log",
+    "inventory_items",
+    "stock_adjustments",
+    "project_components",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_db_and_tables may already have added these on startup.
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    for table in DIRTY_TABLES:
+        op.create_index(
+            f"ix_{table}_dirty",
+            table,
+            ["is_dirty"],
+            sqlite_where=sa.text("is_dirty = 1"),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(DIRTY_TABLES):
+        op.drop_index(f"ix_{table}_dirty", table_name=table, if_exists=True)
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,52 @@
+"""Add per-lane pull cursors and record the lanes of each sync run
+
+Revision ID: 9a4d6e2f8c15
+Revises: 5e2b9c7d1a08
+Create Date: 2026-10-19 08:14:03.771925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d6e2f8c15'
+down_revision: Union[str, Sequence[str], None] = '5e2b9c7d1a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_db_and_tables may already have added these on startup.
+    op.create_table('sync_lane_cursors',
+    sa.Column('sync_lane_cursor_id', sa.Integer(), nullable=False),
+    sa.Column('user_uuid', sa.String(), nullable=False),
+    sa.Column('device_id', sa.String(), nullable=False),
+    sa.Column('lane', sa.String(), nullable=False),
+    sa.Column('last_cursor', sa.DateTime(), nullable=False),
+    sa.Column('uuid', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_dirty', sa.Boolean(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("lane IN ('fast', 'normal', 'bulk')", name='check_sync_lane_cursor_lane'),
+    sa.ForeignKeyConstraint(['user_uuid'], ['user.uuid'], ),
+    sa.PrimaryKeyConstraint('sync_lane_cursor_id'),
+    sa.UniqueConstraint('uuid'),
+    if_not_exists=True,
+    )
+    op.create_index('ix_sync_lane_cursors_user_device', 'sync_lane_cursors', ['user_uuid', 'device_id'], if_not_exists=True)
+    # SQLite has no ADD COLUMN IF NOT EXISTS.
+    if 'lanes' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('sync_runs')}:
+        op.add_column('sync_runs', sa.Column('lanes', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sync_runs') as batch_op:
+        batch_op.drop_column('lanes')
+    op.drop_index('ix_sync_lane_cursors_user_device', table_name='sync_lane_cursors', if_exists=True)
+    op.drop_table('sync_lane_cursors', if_exists=True)
@@ -0,0 +1,44 @@
+"""Add the finance dashboard rollup tables and the indexes that rebuild them by day
+
+Revision ID: a91d6c3e5f27
+Revises: e4a7c21b9f30
+Create Date: 2026-10-19 19:26:37.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from finance_rollups import DAILY_TABLE, INVENTORY_TABLE, create_rollup_tables, rebuild_all_rollups
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d6c3e5f27'
+down_revision: Union[str, Sequence[str], None] = 'e4a7c21b9f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) - mirrors the Index() declarations at the end of models.py.
+SOURCE_INDEXES = [
+    ("ix_payments_created_at", "payments", ["created_at"]),
+    ("ix_invoices_issued_at", "invoices", ["issued_at"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_db_and_tables may already have added these (and the tables) on startup.
+    for name, table, columns in SOURCE_INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    bind = op.get_bind()
+    if create_rollup_tables(bind):
+        rebuild_all_rollups(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP TABLE IF EXISTS {INVENTORY_TABLE}")
+    op.execute(f"DROP TABLE IF EXISTS {DAILY_TABLE}")
+    for name, table, _columns in reversed(SOURCE_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,34 @@
+"""Add the FTS5 search index over customers, projects, invoices and inventory items
+
+Revision ID: b52e07c4a9d1
+Revises: 3c9a41f07d2b
+Create Date: 2026-10-19 16:41:09.327715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from search_index import SEARCH_TABLE, create_search_index, rebuild_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e07c4a9d1'
+down_revision: Union[str, Sequence[str], None] = '3c9a41f07d2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    create_search_index(bind)
+    # Entries hold Arabic-folded text (search_index.fold), so they are built in Python, from the
+    # indexed columns only (later revisions add columns the current models already map).
+    # Rebuilt even when the table exists: it may be left empty by an interrupted upgrade.
+    rebuild_search_index(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
@@ -0,0 +1,44 @@
+"""Add the local table of edited columns per dirty row, for delta pushes
+
+Revision ID: d7c1f3b5a924
+Revises: 9a4d6e2f8c15
+Create Date: 2026-10-19 08:17:09.245816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7c1f3b5a924'
+down_revision: Union[str, Sequence[str], None] = '9a4d6e2f8c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_db_and_tables may already have added it on startup. Existing dirty rows have no
+    # entry here, so their next push sends the whole row.
+    op.create_table('sync_dirty_columns',
+    sa.Column('sync_dirty_columns_id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('row_uuid', sa.String(), nullable=False),
+    sa.Column('columns', sa.String(), nullable=False),
+    sa.Column('uuid', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('is_dirty', sa.Boolean(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sync_dirty_columns_id'),
+    sa.UniqueConstraint('table_name', 'row_uuid', name='uq_sync_dirty_columns_row'),
+    sa.UniqueConstraint('uuid'),
+    if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sync_dirty_columns', if_exists=True)
@@ -0,0 +1,33 @@
+"""Materialize paid amount, remainder and last payment date on invoices
+
+Revision ID: e4a7c21b9f30
+Revises: b52e07c4a9d1
+Create Date: 2026-10-19 18:02:44.510318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from invoice_balances import BALANCE_COLUMNS, add_balance_columns, refresh_all_invoice_balances
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c21b9f30'
+down_revision: Union[str, Sequence[str], None] = 'b52e07c4a9d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if add_balance_columns(bind):
+        refresh_all_invoice_balances(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('invoices') as batch_op:
+        for name in reversed(BALANCE_COLUMNS):
+            batch_op.drop_column(name)
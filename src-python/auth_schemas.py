@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import datetime
 
 # --- Pydantic Schemas for Registration Payload ---
@@ -54,6 +54,9 @@ class RegistrationPayload(BaseModel):
 class IsRegistration(BaseModel):
     registration: bool = False
 
+class SyncRequest(IsRegistration):
+    lanes: Optional[List[str]] = None  # Subset of fast/normal/bulk; every lane when omitted
+
 # --- Pydantic Schemas for Login ---
 
 class LoginRequest(BaseModel):
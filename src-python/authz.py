@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
@@ -9,10 +11,40 @@ from sqlalchemy.orm import Session
 
 from models import Authentication, Invoice, Project, User
 
+# Safety net for changes the invalidation hooks can't see (e.g. raw SQL); normally the
+# cached context is dropped by invalidate_auth_context() long before this.
+AUTH_CONTEXT_MAX_AGE_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Detached snapshot of the logged-in User: safe to share between requests and sessions."""
+    uuid: str
+    username: str
+    email: str
+    role: Optional[str]
+    status: Optional[str]
+    account_type: Optional[str]
+    organization_uuid: Optional[str]
+    branch_uuid: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(
+            uuid=user.uuid,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            status=user.status,
+            account_type=user.account_type,
+            organization_uuid=user.organization_uuid,
+            branch_uuid=user.branch_uuid,
+        )
+
 
 @dataclass(frozen=True)
 class AuthContext:
-    user: User
+    user: AuthUser
 
     @property
     def is_admin(self) -> bool:
@@ -34,26 +66,91 @@ class AuthContext:
     def user_uuid(self) -> str:
         return self.user.uuid
 
+    @property
+    def scope(self) -> dict:
+        """Data scope: org-wide for org admins, branch for other org members, else the user's own rows."""
+        if self.org_uuid:
+            if self.is_admin:
+                return {"level": "org", "org_uuid": self.org_uuid, "branch_uuid": None, "user_uuid": None}
+            return {"level": "branch", "org_uuid": self.org_uuid, "branch_uuid": self.branch_uuid, "user_uuid": None}
+        return {"level": "user", "org_uuid": None, "branch_uuid": None, "user_uuid": self.user_uuid}
+
+
+class AuthContextProvider:
+    """
+    Resolves the logged-in user (newest logged-in Authentication, then its User) once and
+    serves it from memory until something changes it. Login, logout, user updates and
+    sync pulls of users/authentications invalidate it via the session hooks in db_setup.
+    Failures (nobody logged in, user missing) are never cached.
+    """
+
+    def __init__(self, max_age: float = AUTH_CONTEXT_MAX_AGE_SECONDS):
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[AuthContext, float]] = None
+        # Bumped by every invalidation so lookups that were in flight at the time don't repopulate the cache.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session) -> Tuple[Optional[AuthContext], Optional[tuple]]:
+        with self._lock:
+            cached = self._cached
+            generation = self._generation
+            if cached is not None and time.monotonic() - cached[1] <= self._max_age:
+                self.hits += 1
+                return cached[0], None
+            self.misses += 1
+
+        ctx, error_response = self._resolve(db)
+        if ctx is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self._cached = (ctx, time.monotonic())
+        return ctx, error_response
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cached = None
+
+    @staticmethod
+    def _resolve(db: Session) -> Tuple[Optional[AuthContext], Optional[tuple]]:
+        auth_record = (
+            db.query(Authentication)
+            .filter(Authentication.is_logged_in.is_(True))
+            .order_by(Authentication.last_active.desc())
+            .first()
+        )
+        if not auth_record:
+            return None, (jsonify({"error": "No authenticated user found. Please log in."}), 401)
+
+        current_user = (
+            db.query(User)
+            .filter(User.uuid == auth_record.user_uuid, User.deleted_at.is_(None))
+            .first()
+        )
+        if not current_user:
+            return None, (jsonify({"error": "Authenticated user not found in user table."}), 404)
+
+        return AuthContext(user=AuthUser.from_user(current_user)), None
+
+
+auth_context = AuthContextProvider()
+
 
 def get_current_user(db: Session) -> Tuple[Optional[AuthContext], Optional[tuple]]:
-    auth_record = (
-        db.query(Authentication)
-        .filter(Authentication.is_logged_in.is_(True))
-        .order_by(Authentication.last_active.desc())
-        .first()
-    )
-    if not auth_record:
-        return None, (jsonify({"error": "No authenticated user found. Please log in."}), 401)
-
-    current_user = (
-        db.query(User)
-        .filter(User.uuid == auth_record.user_uuid, User.deleted_at.is_(None))
-        .first()
-    )
-    if not current_user:
-        return None, (jsonify({"error": "Authenticated user not found in user table."}), 404)
-
-    return AuthContext(user=current_user), None
+    return auth_context.get(db)
+
+
+def get_current_auth_user(db: Session) -> Tuple[Optional[AuthUser], Optional[tuple]]:
+    """Like get_current_user, for callers that only need the user snapshot."""
+    ctx, error_response = auth_context.get(db)
+    return (ctx.user if ctx else None), error_response
+
+
+def invalidate_auth_context() -> None:
+    auth_context.invalidate()
 
 
 def invoice_effective_org_branch(invoice: Invoice) -> tuple[Optional[str], Optional[str]]:
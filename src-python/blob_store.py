@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import time
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Column, LargeBinary, type_coerce
+from sqlalchemy.orm import column_property, deferred
+from sqlalchemy.types import TypeDecorator
+
+# What an externalized column holds instead of the bytes: b"ssc-blob:sha256:<hex>:<size>".
+BLOB_REF_PREFIX = b"ssc-blob:sha256:"
+_BLOB_REF = re.compile(rb"ssc-blob:sha256:([0-9a-f]{64}):([0-9]+)")
+# Files younger than this are never garbage-collected: a transaction may be about to reference them.
+ORPHAN_GRACE_SECONDS = 3600.0
+
+
+def make_ref(digest: str, size: int) -> bytes:
+    return BLOB_REF_PREFIX + f"{digest}:{size}".encode("ascii")
+
+
+def parse_ref(value) -> Optional[Tuple[str, int]]:
+    """(sha256 hex, size) when `value` is a blob reference, otherwise None (inline bytes, NULL, ...)."""
+    if not isinstance(value, (bytes, bytearray, memoryview)) or len(value) > 128:
+        return None
+    match = _BLOB_REF.fullmatch(bytes(value))
+    if not match:
+        return None
+    return match.group(1).decode("ascii"), int(match.group(2))
+
+
+class StoredBlob(bytes):
+    """Blob content read back from the store; keeps its digest so re-saving it needn't hash again."""
+    sha256: str
+
+    def __new__(cls, data, sha256: str):
+        blob = super().__new__(cls, data)
+        blob.sha256 = sha256
+        return blob
+
+
+class BlobMissing(LookupError):
+    pass
+
+
+class BlobStore:
+    """
+    Content-addressed file store for blobs that used to live inside local_data.db.
+    Each blob is written once to <root>/<first two hex digits>/<sha256>, so identical
+    documents and images share a file, and the database, its WAL and backups only carry
+    the short reference. Reads memory-map the file.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store `data` unless the same content is already there; returns (sha256 hex, size)."""
+        digest = getattr(data, "sha256", None) or hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        try:
+            # Already stored: refresh its age so garbage collection can't race the row about to reference it.
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Atomic: readers see either no file or the complete one.
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+        return digest, len(data)
+
+    def open(self, digest: str) -> mmap.mmap:
+        """Read-only memory map of a stored blob (zero-copy; the caller closes it)."""
+        path = self.path_for(digest)
+        try:
+            with open(path, "rb") as f:
+                # mmap cannot map an empty file.
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise BlobMissing(f"Blob {digest} is empty on disk.")
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise BlobMissing(f"Blob {digest} is missing from {self.root}.")
+
+    def read(self, digest: str, size: Optional[int] = None) -> StoredBlob:
+        if size == 0:
+            return StoredBlob(b"", digest)
+        with self.open(digest) as mapped:
+            return StoredBlob(mapped, digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path_for(digest))
+
+    def digests(self) -> Iterable[Tuple[str, str]]:
+        """(digest, path) for every stored blob."""
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.startswith(".tmp-"):
+                    yield entry.name, entry.path
+
+    def collect_garbage(self, referenced: set, grace_seconds: float = ORPHAN_GRACE_SECONDS) -> dict:
+        """Delete blobs no row references any more (replaced, deleted, or written by a rolled-back flush)."""
+        cutoff = time.time() - grace_seconds
+        removed = freed = 0
+        for digest, path in list(self.digests()):
+            if digest in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += stat.st_size
+        return {"removed": removed, "freed_bytes": freed}
+
+
+class ExternalBlob(TypeDecorator):
+    """
+    LargeBinary column whose bytes live in a BlobStore. Models keep reading and assigning
+    plain bytes; the column itself stores make_ref(sha256, size). Values that are not
+    bytes, and rows written before the store existed, pass through unchanged.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, store: BlobStore, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+
+    def process_bind_param(self, value, dialect):
+        if not isinstance(value, (bytes, bytearray, memoryview)) or not len(value) or parse_ref(value):
+            return value
+        digest, size = self.store.put(value)
+        return make_ref(digest, size)
+
+    def process_result_value(self, value, dialect):
+        ref = parse_ref(value)
+        if ref is None:
+            return value
+        digest, size = ref
+        try:
+            return self.store.read(digest, size)
+        except BlobMissing as e:
+            print(f"Warning: {e}")
+            return None
+
+
+class BlobInfo(TypeDecorator):
+    """Reads an ExternalBlob column as {"sha256", "size"} without touching the store."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, blob_column: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blob_column = blob_column
+
+    def process_result_value(self, value, dialect):
+        if value is None or not len(value):
+            return None
+        ref = parse_ref(value)
+        if ref is not None:
+            return {"sha256": ref[0], "size": ref[1]}
+        # Not externalized yet (or not bytes at all): describe it as it is.
+        data = value if isinstance(value, (bytes, bytearray, memoryview)) else str(value).encode("utf-8")
+        return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+
+def external_blob_column(store: BlobStore, name: str, **column_kwargs):
+    """
+    (blob, info) mapped attributes for a model: the blob itself is deferred so list and
+    detail queries never read it, and `<name>_info` carries its hash and size.
+    Usage: `file_blob, file_blob_info = external_blob_column(blob_store, "file_blob")`.
+    """
+    column = Column(name, ExternalBlob(store), **column_kwargs)
+    return deferred(column), column_property(type_coerce(column, BlobInfo(name)))
+
+
+# --- Migration of inline blobs ---
+
+MIGRATION_BATCH_ROWS = 200
+
+
+def blob_columns(metadata) -> list:
+    """(table, primary key column, blob column) for every ExternalBlob column in the metadata."""
+    columns = []
+    for table in metadata.sorted_tables:
+        for column in table.columns:
+            if isinstance(column.type, ExternalBlob):
+                (pk,) = table.primary_key.columns
+                columns.append((table.name, pk.name, column.name))
+    return columns
+
+
+def externalize_inline_blobs(connection, store: BlobStore, columns, commit_batches: bool = True) -> dict:
+    """
+    Move blobs still stored inside the database into `store`, replacing each with its
+    reference. Identical blobs end up as one file. Runs in batches on `connection`
+    (committing each unless commit_batches=False), touches neither updated_at nor
+    is_dirty, and is safe to re-run.
+    """
+    stats = {"rows": 0, "bytes": 0, "unique_blobs": 0, "stored_bytes": 0}
+    seen = set()
+    for table, pk, column in columns:
+        last = None
+        while True:
+            rows = connection.exec_driver_sql(
+                f'SELECT "{pk}", "{column}" FROM "{table}" '
+                f'WHERE typeof("{column}") = \'blob\' AND length("{column}") > 0 '
+                f'AND substr("{column}", 1, {len(BLOB_REF_PREFIX)}) != ? '
+                + (f'AND "{pk}" > ? ' if last is not None else '')
+                + f'ORDER BY "{pk}" LIMIT {MIGRATION_BATCH_ROWS}',
+                (BLOB_REF_PREFIX,) + ((last,) if last is not None else ()),
+            ).all()
+            if not rows:
+                break
+            for row_pk, data in rows:
+                digest, size = store.put(data)
+                connection.exec_driver_sql(
+                    f'UPDATE "{table}" SET "{column}" = ? WHERE "{pk}" = ?', (make_ref(digest, size), row_pk)
+                )
+                stats["rows"] += 1
+                stats["bytes"] += size
+                if digest not in seen:
+                    seen.add(digest)
+                    stats["unique_blobs"] += 1
+                    stats["stored_bytes"] += size
+                last = row_pk
+            if commit_batches:
+                connection.commit()
+    return stats
+
+
+def inline_external_blobs(connection, store: BlobStore, columns) -> int:
+    """Reverse of externalize_inline_blobs: copy stored blobs back into their rows."""
+    restored = 0
+    for table, pk, column in columns:
+        rows = connection.exec_driver_sql(
+            f'SELECT "{pk}", "{column}" FROM "{table}" WHERE substr("{column}", 1, {len(BLOB_REF_PREFIX)}) = ?',
+            (BLOB_REF_PREFIX,),
+        ).all()
+        for row_pk, value in rows:
+            ref = parse_ref(value)
+            if ref is None:
+                continue
+            connection.exec_driver_sql(
+                f'UPDATE "{table}" SET "{column}" = ? WHERE "{pk}" = ?', (bytes(store.read(*ref)), row_pk)
+            )
+            restored += 1
+    return restored
+
+
+def referenced_digests(connection, columns) -> set:
+    """Digests referenced by any row, for BlobStore.collect_garbage."""
+    referenced = set()
+    for table, _pk, column in columns:
+        for (value,) in connection.exec_driver_sql(
+            f'SELECT "{column}" FROM "{table}" WHERE substr("{column}", 1, {len(BLOB_REF_PREFIX)}) = ?',
+            (BLOB_REF_PREFIX,),
+        ):
+            ref = parse_ref(value)
+            if ref:
+                referenced.add(ref[0])
+    return referenced
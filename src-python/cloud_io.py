@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextlib
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+# Upper bound on cloud requests (RPCs + uploads) in flight at once during a sync.
+CLOUD_IO_CONCURRENCY = max(1, int(os.getenv("SSC_SYNC_CONCURRENCY", "6")))
+# Bulk-lane uploads get a smaller share so they can't crowd out fast-lane traffic.
+BULK_UPLOAD_CONCURRENCY = max(1, int(os.getenv("SSC_SYNC_BULK_CONCURRENCY", "2")))
+# Pull responses fetched ahead of the table being merged; each holds a whole table's changes.
+PULL_PREFETCH_TABLES = max(1, int(os.getenv("SSC_SYNC_PULL_PREFETCH", "2")))
+# Same budget as the blocking clients in supabase_client.py.
+CLOUD_IO_TIMEOUT_SECONDS = 10.0
+
+
+def pipeline_enabled() -> bool:
+    """The async pipeline can be switched off (SSC_SYNC_PIPELINE=0) to fall back to the blocking path."""
+    return os.getenv("SSC_SYNC_PIPELINE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class CloudIO:
+    """
+    Asyncio-based Supabase transport for the sync pipeline.
+    Owns a private event loop running on a daemon thread, so Flask/waitress handlers
+    stay synchronous: they submit coroutines here and block on (or collect) the results.
+    Requests share one pooled httpx.AsyncClient and a semaphore that bounds concurrency.
+    """
+
+    def __init__(self, concurrency: int = CLOUD_IO_CONCURRENCY):
+        self._concurrency = concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bulk_semaphore: Optional[asyncio.Semaphore] = None
+
+    # --- Event loop ---
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _run():
+                    asyncio.set_event_loop(loop)
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_run, name="cloud-io-loop", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """Schedule a coroutine on the I/O loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro: Awaitable) -> Any:
+        """Run a coroutine on the I/O loop and block the calling thread until it finishes."""
+        return self.submit(coro).result()
+
+    def _client(self) -> httpx.AsyncClient:
+        # Only touched from the loop thread, so no locking is needed.
+        if self._http is None:
+            import httpx  # Deferred: only syncs need it, and it is slow to import
+
+            self._http = httpx.AsyncClient(
+                timeout=CLOUD_IO_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self._concurrency,
+                    max_keepalive_connections=self._concurrency,
+                ),
+                http2=True,
+                follow_redirects=True,
+            )
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+            self._bulk_semaphore = asyncio.Semaphore(min(BULK_UPLOAD_CONCURRENCY, self._concurrency))
+        return self._http
+
+    # --- Requests ---
+
+    async def rpc(self, fn: str, params: dict, jwt: Optional[str] = None, stats: Optional[dict] = None) -> Any:
+        """
+        Call a PostgREST function as the given user (anon key when jwt is None).
+        Returns the decoded JSON body; raises postgrest APIError on error responses,
+        like `client.rpc(...).execute()` does.
+        When `stats` is given it receives the request's elapsed_ms, bytes_sent and bytes_received.
+        """
+        from postgrest.exceptions import APIError
+        from supabase_client import url, anon_key
+
+        client = self._client()
+        headers = {
+            "apikey": anon_key,
+            "authorization": f"Bearer {jwt or anon_key}",
+            "accept-profile": "public",
+            "content-profile": "public",
+        }
+        async with self._semaphore:
+            started = time.perf_counter()
+            response = await client.post(f"{url}/rest/v1/rpc/{fn}", json=params, headers=headers)
+            if stats is not None:
+                stats["elapsed_ms"] = (time.perf_counter() - started) * 1000.0
+                stats["bytes_sent"] = len(response.request.content)
+                stats["bytes_received"] = len(response.content)
+        if not 200 <= response.status_code <= 299:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            if not isinstance(body, dict):
+                body = {}
+            raise APIError({
+                "message": body.get("message") or response.text or f"HTTP {response.status_code}",
+                "code": body.get("code") or str(response.status_code),
+                "hint": body.get("hint"),
+                "details": body.get("details"),
+            })
+        return response.json() if response.content else None
+
+    async def upload(self, blob_data: bytes, bucket_name: str, destination_path: str, content_type: str, throttle: bool = False) -> None:
+        """Upsert an object into Supabase Storage with the service role key. `throttle` applies the bulk-lane limit."""
+        from supabase_client import url, service_role_key
+
+        if not service_role_key:
+            raise ValueError("SERVICE_ROLE_KEY environment variable not set.")
+        client = self._client()
+        headers = {
+            "apikey": service_role_key,
+            "authorization": f"Bearer {service_role_key}",
+            "cache-control": "max-age=3600",
+            "x-upsert": "true",
+        }
+        filename = destination_path.rsplit("/", 1)[-1]
+        async with (self._bulk_semaphore if throttle else contextlib.nullcontext()), self._semaphore:
+            response = await client.post(
+                f"{url}/storage/v1/object/{bucket_name}/{destination_path}",
+                headers=headers,
+                files={"file": (filename, blob_data, content_type)},
+                data={"cacheControl": "3600"},
+            )
+        if not 200 <= response.status_code <= 299:
+            raise Exception(f"HTTP {response.status_code}: {response.text}")
+
+
+cloud_io = CloudIO()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from blob_store import blob_columns, referenced_digests
+from db_write_queue import write_queue
+from finance_rollups import verify_finance_rollups
+from invoice_balances import verify_invoice_balances
+
+# How often the worker wakes up to see whether maintenance is due.
+MAINTENANCE_POLL_SECONDS = 30.0
+# The app counts as idle once no request has been in flight for this long.
+IDLE_AFTER_SECONDS = 60.0
+# PRAGMA optimize and incremental vacuum run at most this often.
+OPTIMIZE_INTERVAL_SECONDS = 6 * 3600.0
+# Checkpoints run at most this often, or sooner when the WAL grows past WAL_CHECKPOINT_BYTES.
+CHECKPOINT_INTERVAL_SECONDS = 600.0
+WAL_CHECKPOINT_BYTES = 32 * 1024 * 1024
+# Free pages returned to the OS per incremental_vacuum pass (4 KiB pages: 16 MiB).
+INCREMENTAL_VACUUM_PAGES = 4096
+# A database without incremental auto-vacuum gets one full VACUUM to convert it,
+# but only when at least this share of its pages is free.
+CONVERT_FREE_PAGE_RATIO = 0.10
+
+
+def maintenance_enabled() -> bool:
+    """Background maintenance can be switched off with SSC_DB_MAINTENANCE=0."""
+    return os.getenv("SSC_DB_MAINTENANCE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class DBMaintenance:
+    """
+    Keeps the local SQLite file healthy over months of use: refreshes planner statistics
+    (PRAGMA optimize), returns free pages to the OS (incremental vacuum) and folds the WAL
+    back into the database (TRUNCATE checkpoint). Alongside the optimize step it checks the
+    materialized invoice balances and the finance rollups against the rows they come from.
+    Work only runs while no request is in flight, so it never competes with the UI for the
+    write lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_activity = time.monotonic()
+        self._last_optimize: Optional[float] = None
+        self._last_checkpoint: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_run: dict = {}
+
+    # --- Activity tracking (wired to Flask request hooks) ---
+
+    def request_started(self):
+        with self._lock:
+            self._in_flight += 1
+            self._last_activity = time.monotonic()
+
+    def request_finished(self, _exc=None):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        with self._lock:
+            return self._in_flight == 0 and time.monotonic() - self._last_activity >= IDLE_AFTER_SECONDS
+
+    # --- Worker ---
+
+    def start(self):
+        if not maintenance_enabled() or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(MAINTENANCE_POLL_SECONDS):
+            if not self.is_idle():
+                continue
+            try:
+                self.run_due()
+            except Exception as e:
+                print(f"Warning: Database maintenance failed: {e}")
+
+    def _due(self, last: Optional[float], interval: float) -> bool:
+        return last is None or time.monotonic() - last >= interval
+
+    def run_due(self, force: bool = False) -> dict:
+        """Run whichever maintenance steps are due (all of them with force=True) and return what was done."""
+        from db_setup import engine, DB_FILE_PATH
+        from models import Base, blob_store
+
+        result = {}
+        checkpoint_due = force or self._due(self._last_checkpoint, CHECKPOINT_INTERVAL_SECONDS)
+        if not checkpoint_due:
+            try:
+                checkpoint_due = os.path.getsize(DB_FILE_PATH + "-wal") >= WAL_CHECKPOINT_BYTES
+            except OSError:
+                checkpoint_due = False
+        optimize_due = force or self._due(self._last_optimize, OPTIMIZE_INTERVAL_SECONDS)
+        if not (checkpoint_due or optimize_due):
+            return result
+
+        started = time.perf_counter()
+        # Holding the write queue keeps the UI's writes from failing on a VACUUM or checkpoint.
+        with write_queue.hold(), engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            def pragma(sql):
+                return connection.exec_driver_sql(f"PRAGMA {sql}")
+
+            if optimize_due:
+                pragma("optimize")
+                result["optimized"] = True
+                freelist = pragma("freelist_count").scalar()
+                page_count = pragma("page_count").scalar()
+                if pragma("auto_vacuum").scalar() == 2:
+                    if freelist:
+                        # Each step frees one page and execute() only steps once; executescript runs it out.
+                        connection.connection.driver_connection.executescript(
+                            f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});"
+                        )
+                        result["vacuumed_pages"] = freelist - pragma("freelist_count").scalar()
+                elif page_count and freelist / page_count >= CONVERT_FREE_PAGE_RATIO:
+                    # One-off rewrite; afterwards free pages are reclaimed incrementally.
+                    pragma("auto_vacuum=INCREMENTAL")
+                    connection.exec_driver_sql("VACUUM")
+                    result["converted_to_incremental_vacuum"] = True
+                # Blobs replaced, deleted or written by a rolled-back flush.
+                referenced = referenced_digests(connection, blob_columns(Base.metadata))
+                collected = blob_store.collect_garbage(referenced)
+                if collected["removed"]:
+                    result["blob_gc"] = collected
+                # Materialized invoice balances vs. their payments; drifted rows are repaired.
+                balances = verify_invoice_balances(connection)
+                if balances["drifted"]:
+                    print(f"Warning: {balances['drifted']} invoice balances had drifted from their payments; repaired.")
+                    result["invoice_balance_drift"] = balances
+                # Finance dashboard buckets vs. a rebuild from their rows (after the balances they read).
+                rollups = verify_finance_rollups(connection)
+                if rollups["repaired"]:
+                    print(
+                        f"Warning: {rollups['drifted_days']} finance rollup days and {rollups['drifted_inventory_groups']} "
+                        "inventory groups had drifted; rebuilt."
+                    )
+                    result["finance_rollup_drift"] = rollups
+                self._last_optimize = time.monotonic()
+
+            if checkpoint_due:
+                busy, wal_pages, checkpointed = pragma("wal_checkpoint(TRUNCATE)").first()
+                result["checkpoint"] = {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed_pages": checkpointed}
+                self._last_checkpoint = time.monotonic()
+
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        result["finished_at"] = datetime.now(timezone.utc).isoformat()
+        self._last_run = result
+        print(f"Database maintenance: {result}")
+        return result
+
+    def status(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            idle_for = time.monotonic() - self._last_activity
+        return {
+            "enabled": maintenance_enabled() and self._thread is not None,
+            "in_flight_requests": in_flight,
+            "idle_for_seconds": round(idle_for, 1),
+            "last_run": self._last_run or None,
+        }
+
+
+db_maintenance = DBMaintenance()
@@ -1,31 +1,223 @@
 # src-python/db_setup.py
 
 import os
-from sqlalchemy import create_engine, event, inspect
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from sqlalchemy import create_engine, event, inspect, select
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, attributes
 # Import Base from your models file
-from models import Base, SQLITE_URL, DB_FILE_PATH, TimestampDirtyMixin
+from models import Base, SQLITE_URL, DB_FILE_PATH, INVENTORY_CATEGORY_DEFINITIONS, TimestampDirtyMixin, SyncDirtyColumns, User, Authentication, Payment, Invoice, Project, InventoryItem, blob_store
+from blob_store import blob_columns, externalize_inline_blobs
+from db_write_queue import write_queue, is_write_statement
+from authz import invalidate_auth_context
+from query_metrics import query_metrics
+from schema_fingerprint import compute_schema_fingerprint, read_schema_fingerprint, store_schema_fingerprint
+from search_index import (
+    collect_search_changes,
+    apply_search_changes,
+    create_search_index,
+    rebuild_search_index,
+    is_indexed_model,
+    bulk_search_pks,
+    reindex_rows,
+)
+from invoice_balances import (
+    add_balance_columns,
+    bulk_payment_invoice_uuids,
+    collect_balance_changes,
+    expire_invoice_balances,
+    refresh_all_invoice_balances,
+    refresh_invoice_balances,
+)
+from finance_rollups import (
+    RollupChanges,
+    apply_rollup_changes,
+    bulk_rollup_changes,
+    collect_rollup_changes,
+    rebuild_all_rollups,
+    rollups_missing,
+)
 
 # --- 1. Database Initialization ---
 
 # Ensure the 'db' subdirectory exists before doing anything else
 os.makedirs(os.path.dirname(DB_FILE_PATH), exist_ok=True)
 
+class _WriteGatedConnection(sqlite3.Connection):
+    """sqlite3 connection that hands the write queue back as soon as its transaction ends."""
+    write_owner = None
+
+    def release_write(self):
+        owner, self.write_owner = self.write_owner, None
+        if owner is not None:
+            write_queue.release(owner)
+
+    def commit(self):
+        try:
+            super().commit()
+        finally:
+            self.release_write()
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self.release_write()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.release_write()
+
 # Create a single, module-level engine. SQLite requires check_same_thread=False
 # for multi-threaded applications like Flask.
 engine = create_engine(
     SQLITE_URL,
-    connect_args={"check_same_thread": False, "timeout": 30},
+    connect_args={"check_same_thread": False, "timeout": 30, "factory": _WriteGatedConnection},
     echo=False # Set to True for debugging SQL queries
 )
 
+# Read-only connections for GET routes (see utils.get_read_db). WAL lets them read while
+# a write is in progress, so they never wait on the write queue.
+READ_POOL_SIZE = max(1, int(os.environ.get("SSC_SQLITE_READERS", "8")))
+read_engine = create_engine(
+    "sqlite://",
+    creator=lambda: sqlite3.connect(
+        Path(DB_FILE_PATH).as_uri() + "?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        timeout=30,
+    ),
+    poolclass=QueuePool,
+    pool_size=READ_POOL_SIZE,
+    max_overflow=READ_POOL_SIZE,
+    echo=False,
+)
+
+# Per-connection SQLite settings. Pick a profile with SSC_SQLITE_PROFILE and override single
+# pragmas with SSC_SQLITE_PRAGMAS, e.g. "cache_size=-4000,mmap_size=0".
+# foreign_keys stays OFF: pull merges child tables before their parents, and synced rows
+# may reference parents outside this device's sync scope.
+SQLITE_PROFILES = {
+    # WAL + synchronous=NORMAL only risks the last commits on power loss, never corruption.
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -16000,         # KiB (negative) per connection
+        "mmap_size": 268435456,       # 256 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,        # ms; matches the driver timeout
+        "foreign_keys": "OFF",
+        "journal_size_limit": 67108864,  # Shrink the WAL back to 64 MiB after checkpoints
+    },
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+        "foreign_keys": "OFF",
+        "journal_size_limit": 67108864,
+    },
+    "low_memory": {
+        "synchronous": "NORMAL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 30000,
+        "foreign_keys": "OFF",
+        "journal_size_limit": 16777216,
+    },
+}
+DEFAULT_SQLITE_PROFILE = "balanced"
+
+def _resolve_sqlite_pragmas() -> dict:
+    name = os.environ.get("SSC_SQLITE_PROFILE", DEFAULT_SQLITE_PROFILE).strip().lower()
+    if name not in SQLITE_PROFILES:
+        print(f"Warning: unknown SSC_SQLITE_PROFILE '{name}', using '{DEFAULT_SQLITE_PROFILE}'.")
+        name = DEFAULT_SQLITE_PROFILE
+    pragmas = dict(SQLITE_PROFILES[name])
+    for item in os.environ.get("SSC_SQLITE_PRAGMAS", "").split(","):
+        key, sep, value = item.partition("=")
+        key, value = key.strip().lower(), value.strip()
+        if not item.strip():
+            continue
+        # Only known pragmas with plain values, since they are interpolated into SQL.
+        if not sep or key not in pragmas or not value.lstrip("-").isalnum():
+            print(f"Warning: ignoring SSC_SQLITE_PRAGMAS entry '{item.strip()}'.")
+            continue
+        pragmas[key] = value
+    return pragmas
+
+SQLITE_PRAGMAS = _resolve_sqlite_pragmas()
+
 # Enable WAL mode for better concurrent read/write performance
 @event.listens_for(engine, "connect")
 def _set_sqlite_pragma(dbapi_connection, connection_record):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
+    for key, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {key}={value}")
     cursor.close()
 
+@event.listens_for(read_engine, "connect")
+def _set_sqlite_read_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for key, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {key}={value}")
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+# Writers take a place in the write queue on their first write statement and keep it until
+# the transaction ends (_WriteGatedConnection.commit/rollback), so they are served in order
+# instead of racing on SQLite's busy handler.
+@event.listens_for(engine, "before_cursor_execute")
+def _enter_write_queue(conn, cursor, statement, parameters, context, executemany):
+    dbapi_connection = conn.connection.dbapi_connection
+    if dbapi_connection.write_owner is None and is_write_statement(statement):
+        write_queue.acquire()
+        dbapi_connection.write_owner = threading.get_ident()
+
+@event.listens_for(engine, "after_cursor_execute")
+def _leave_write_queue_after_autocommit(conn, cursor, statement, parameters, context, executemany):
+    # DDL, VACUUM and AUTOCOMMIT connections never open a transaction to commit.
+    dbapi_connection = conn.connection.dbapi_connection
+    if dbapi_connection.write_owner is not None and not dbapi_connection.in_transaction:
+        dbapi_connection.release_write()
+
+@event.listens_for(engine, "handle_error")
+def _leave_write_queue_on_error(exception_context):
+    try:
+        dbapi_connection = exception_context.connection.connection.dbapi_connection
+    except Exception:
+        return  # Closed or invalidated; close() has released the queue.
+    if dbapi_connection.write_owner is not None and not dbapi_connection.in_transaction:
+        dbapi_connection.release_write()
+
+# Statement count and time per endpoint (see query_metrics). Registered after the write queue
+# listeners, so the timer starts once a writer has its turn and measures SQLite alone.
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+def _stop_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["statement_started"].pop()) * 1000.0
+    query_metrics.statement_finished(statement, parameters, executemany, elapsed_ms)
+
+def _drop_statement_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_started"):
+        connection.info["statement_started"].pop()
+
+for _engine in (engine, read_engine):
+    event.listen(_engine, "before_cursor_execute", _start_statement_timer)
+    event.listen(_engine, "after_cursor_execute", _stop_statement_timer)
+    event.listen(_engine, "handle_error", _drop_statement_timer)
+del _engine
+
 # Create a single, module-level session factory to be used throughout the app
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -33,6 +225,13 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Sessions on the read-only pool; flushing one raises instead of writing.
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
 # --- 2. SQLAlchemy Event Listeners ---
 
 @event.listens_for(SessionLocal, 'before_flush')
@@ -69,6 +268,9 @@ def before_flush_listener(session, flush_context, instances):
                 has_other_changes = True
                 break
 
+        if has_other_changes:
+            _collect_dirty_columns(session, insp)
+
         if not has_other_changes:
             # If no other attributes were changed, then the only possible change
             # is to 'is_dirty' itself. We only want to block the change if
@@ -82,21 +284,336 @@ def before_flush_listener(session, flush_context, instances):
         instance.is_dirty = True
 
 
+# Columns that every push payload carries anyway, so they are never recorded as edits.
+_UNTRACKED_COLUMNS = frozenset({'is_dirty', 'updated_at'})
+# Models the sync pushes; routes/sync_log registers its SYNC_CONFIG models here. Local-only tables
+# (sync_state, inventory_categories, ...) are never pushed, so their edits are not recorded.
+_DELTA_TRACKED_MODELS = set()
+# Row uuids per DELETE ... WHERE row_uuid IN (...), well under SQLite's bound-parameter limit.
+_DIRTY_COLUMNS_CHUNK = 500
+
+def track_sync_deltas(models) -> None:
+    """Record edited columns of these models for the delta push."""
+    _DELTA_TRACKED_MODELS.update(models)
+
+def _collect_dirty_columns(session, insp):
+    """Remember which columns of an existing row changed, for the delta push (written in after_flush)."""
+    if insp.mapper.class_ not in _DELTA_TRACKED_MODELS:
+        return
+    changed = {
+        attr.key for attr in insp.mapper.column_attrs
+        if attr.key not in _UNTRACKED_COLUMNS and insp.attrs[attr.key].history.has_changes()
+    }
+    if not changed:
+        return
+    is_dirty_history = insp.attrs.is_dirty.history
+    if is_dirty_history.deleted:
+        was_dirty = bool(is_dirty_history.deleted[0])
+    else:
+        was_dirty = bool(is_dirty_history.unchanged[0]) if is_dirty_history.unchanged else False
+    key = (insp.mapper.local_table.name, insp.obj().uuid)
+    pending = session.info.setdefault('sync_dirty_columns', {})
+    if key in pending:
+        # Flushed twice before after_flush ran; keep the earliest "was dirty" answer.
+        was_dirty = pending[key][0]
+        changed |= pending[key][1]
+    pending[key] = (was_dirty, changed)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def after_flush_listener(session, flush_context):
+    """
+    Store the columns collected in before_flush. A row that was clean starts a new delta.
+    A row that was already dirty extends its delta, unless it has none: then a full push
+    is still pending for it (e.g. it was never pushed) and must stay that way.
+    """
+    pending = session.info.pop('sync_dirty_columns', None)
+    if not pending:
+        return
+
+    table = SyncDirtyColumns.__table__
+    connection = session.connection()
+    existing = {
+        (row.table_name, row.row_uuid): set(row.columns.split(','))
+        for row in connection.execute(
+            select(table.c.table_name, table.c.row_uuid, table.c.columns)
+            .where(table.c.row_uuid.in_([row_uuid for _, row_uuid in pending]))
+        )
+    }
+
+    rows = []
+    for (table_name, row_uuid), (was_dirty, changed) in pending.items():
+        if was_dirty:
+            previous = existing.get((table_name, row_uuid))
+            if previous is None:
+                continue
+            changed = changed | previous
+        rows.append({"table_name": table_name, "row_uuid": row_uuid, "columns": ",".join(sorted(changed))})
+    if not rows:
+        return
+
+    stmt = sqlite_insert(table)
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.table_name, table.c.row_uuid],
+            set_={"columns": stmt.excluded.columns, "updated_at": stmt.excluded.updated_at},
+        ),
+        rows,
+    )
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _drop_deltas_after_bulk_writes(orm_execute_state):
+    """
+    Bulk UPDATE/DELETE (soft deletes, logout, branch removal) bypass the flush, so the columns
+    they write are never recorded. Drop the matched rows' deltas: they go back to full payloads.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in _DELTA_TRACKED_MODELS:
+        return None
+    session = orm_execute_state.session
+    model = mapper.class_
+    query = select(model.uuid)
+    if orm_execute_state.statement.whereclause is not None:
+        query = query.where(orm_execute_state.statement.whereclause)
+    uuids = [uuid for (uuid,) in session.execute(query)]
+    result = orm_execute_state.invoke_statement()
+    table = SyncDirtyColumns.__table__
+    for start in range(0, len(uuids), _DIRTY_COLUMNS_CHUNK):
+        session.connection().execute(
+            table.delete().where(
+                table.c.table_name == model.__table__.name,
+                table.c.row_uuid.in_(uuids[start:start + _DIRTY_COLUMNS_CHUNK]),
+            )
+        )
+    return result
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def after_rollback_listener(session):
+    # Changes collected for a flush that never completed must not leak into the next one.
+    session.info.pop('sync_dirty_columns', None)
+    session.info.pop('search_index_changes', None)
+    session.info.pop('invoice_balance_changes', None)
+    session.info.pop('invoice_balances_refreshed', None)
+    session.info.pop('finance_rollup_changes', None)
+
+@event.listens_for(SessionLocal, 'before_flush')
+def _collect_search_index_changes(session, flush_context, instances):
+    # Runs for pull merges too: pulled customers and items must be searchable.
+    changes = collect_search_changes(session)
+    if changes:
+        pending = session.info.setdefault('search_index_changes', ([], []))
+        pending[0].extend(changes[0])
+        pending[1].extend(changes[1])
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _apply_search_index_changes(session, flush_context):
+    """Keep the FTS index in the same transaction as the rows; new rows have their keys by now."""
+    changes = session.info.pop('search_index_changes', None)
+    if changes:
+        apply_search_changes(session.connection(), changes)
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _reindex_after_bulk_writes(orm_execute_state):
+    """Bulk UPDATE/DELETE (e.g. branch and user soft-delete cascades) bypass the flush."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not is_indexed_model(mapper.class_):
+        return None
+    session = orm_execute_state.session
+    pk_values = bulk_search_pks(session, mapper.class_, orm_execute_state.statement)
+    result = orm_execute_state.invoke_statement()
+    if pk_values:
+        reindex_rows(session, mapper.class_, pk_values)
+    return result
+
+@event.listens_for(SessionLocal, 'before_flush')
+def _collect_invoice_balance_changes(session, flush_context, instances):
+    # Runs for pull merges too: pulled payments must move the balance of their invoice.
+    changes = collect_balance_changes(session)
+    if changes:
+        pending = session.info.setdefault('invoice_balance_changes', (set(), []))
+        pending[0].update(changes[0])
+        pending[1].extend(changes[1])
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _refresh_invoice_balances(session, flush_context):
+    """Payments are written by now; refresh the balances they feed in the same transaction."""
+    changes = session.info.pop('invoice_balance_changes', None)
+    if not changes:
+        return
+    uuids = changes[0] | {invoice.uuid for invoice in changes[1]}
+    refresh_invoice_balances(session.connection(), uuids)
+    session.info.setdefault('invoice_balances_refreshed', set()).update(uuids)
+
+@event.listens_for(SessionLocal, 'after_flush_postexec')
+def _expire_refreshed_invoice_balances(session, flush_context):
+    refreshed = session.info.pop('invoice_balances_refreshed', None)
+    if refreshed:
+        expire_invoice_balances(session, refreshed)
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _refresh_balances_after_bulk_payment_writes(orm_execute_state):
+    """Bulk UPDATE/DELETE on payments (e.g. the invoice delete cascade) bypass the flush."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Payment:
+        return None
+    session = orm_execute_state.session
+    uuids = bulk_payment_invoice_uuids(session, orm_execute_state.statement)
+    result = orm_execute_state.invoke_statement()
+    if uuids:
+        refresh_invoice_balances(session.connection(), uuids)
+        expire_invoice_balances(session, uuids)
+    return result
+
+# Rows the finance rollups are computed from.
+_ROLLUP_SOURCE_MODELS = (Payment, Invoice, Project, User, InventoryItem)
+
+@event.listens_for(SessionLocal, 'before_flush')
+def _collect_finance_rollup_changes(session, flush_context, instances):
+    # Runs for pull merges too: pulled payments, invoices and items must reach the dashboard.
+    changes = collect_rollup_changes(session)
+    if changes:
+        session.info.setdefault('finance_rollup_changes', RollupChanges()).merge(changes)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _apply_finance_rollup_changes(session, flush_context):
+    """Registered after _refresh_invoice_balances, so outstanding amounts read the refreshed remainders."""
+    changes = session.info.pop('finance_rollup_changes', None)
+    if changes:
+        apply_rollup_changes(session.connection(), changes)
+
+@event.listens_for(SessionLocal, 'do_orm_execute', insert=True)
+def _refresh_rollups_after_bulk_writes(orm_execute_state):
+    """
+    Bulk UPDATE/DELETE bypass the flush. Inserted first so that its invoke_statement runs the
+    balance refresh above before the rollups read the remainders.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in _ROLLUP_SOURCE_MODELS:
+        return None
+    session = orm_execute_state.session
+    changes = bulk_rollup_changes(session, mapper.class_, orm_execute_state.statement)
+    result = orm_execute_state.invoke_statement()
+    if changes:
+        apply_rollup_changes(session.connection(), changes)
+    return result
+
+# Rows that decide who is logged in and what they may see; changing one drops authz's cached AuthContext.
+AUTH_CONTEXT_MODELS = (User, Authentication)
+_AUTH_CONTEXT_TABLES = frozenset(model.__tablename__ for model in AUTH_CONTEXT_MODELS)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _note_auth_context_changes(session, flush_context):
+    # new/dirty/deleted still show the pre-flush state here.
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, AUTH_CONTEXT_MODELS):
+            session.info['auth_context_changed'] = True
+            return
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _note_auth_context_bulk_changes(orm_execute_state):
+    """Bulk UPDATE/DELETE (e.g. logout's query(Authentication).update(...)) bypass the flush."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if (mapper is not None and mapper.class_ in AUTH_CONTEXT_MODELS) or getattr(table, 'name', None) in _AUTH_CONTEXT_TABLES:
+        orm_execute_state.session.info['auth_context_changed'] = True
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _invalidate_auth_context_after_commit(session):
+    if session.info.pop('auth_context_changed', False):
+        invalidate_auth_context()
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _forget_auth_context_changes(session):
+    session.info.pop('auth_context_changed', None)
+
 # --- 3. Database and Table Creation Function ---
 
+def _create_missing_indexes():
+    """create_all skips tables that already exist, indexes included; add any an older database lacks."""
+    with engine.begin() as connection:
+        existing = {name for (name,) in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(bind=connection)
+
+def _externalize_inline_blobs():
+    """Databases from before the blob store still hold documents and images inline; move them out once."""
+    with engine.connect() as connection:
+        stats = externalize_inline_blobs(connection, blob_store, blob_columns(Base.metadata))
+    if stats["rows"]:
+        # The freed pages are handed back to the OS by db_maintenance's incremental vacuum.
+        print(
+            f"Moved {stats['rows']} blobs ({stats['bytes']} bytes) to {blob_store.root}: "
+            f"{stats['unique_blobs']} unique files, {stats['stored_bytes']} bytes on disk."
+        )
+
+def _ensure_search_index():
+    """Create the FTS5 search table; a new one (new database or first run with search) is filled from the rows."""
+    with engine.begin() as connection:
+        if create_search_index(connection):
+            indexed = rebuild_search_index(connection)
+            print(f"Built search index ({indexed} entries).")
+
+def _ensure_invoice_balances():
+    """Databases from before the materialized invoice balances get the columns, filled from the payments."""
+    with engine.begin() as connection:
+        if add_balance_columns(connection):
+            refreshed = refresh_all_invoice_balances(connection)
+            print(f"Computed balances for {refreshed} invoices.")
+
+def _ensure_finance_rollups():
+    """Databases from before the finance rollups get them built from their payments, invoices and items."""
+    with engine.begin() as connection:
+        if rollups_missing(connection):
+            built = rebuild_all_rollups(connection)
+            print(f"Built finance rollups ({built['daily_buckets']} daily buckets, {built['inventory_groups']} inventory groups).")
+
 def create_db_and_tables():
     """
     Creates the database file and all defined tables if they do not already exist.
     This should be called once on application startup to prevent "no such table" errors.
+    When the stored schema fingerprint matches the code, every step is skipped (see schema_fingerprint).
     """
     try:
+        # Warm start: the database was already set up for exactly this schema and these categories.
+        fingerprint = compute_schema_fingerprint(Base.metadata, INVENTORY_CATEGORY_DEFINITIONS)
+        with engine.connect() as connection:
+            stored = read_schema_fingerprint(connection)
+        if stored == fingerprint:
+            print(f"Database schema is current: {DB_FILE_PATH}")
+            return
+
         print(f"Ensuring tables are created for database at: {DB_FILE_PATH}")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            # A brand-new file is switched to incremental auto-vacuum while the VACUUM that
+            # applies it is still free; older databases are converted by db_maintenance.
+            if not connection.exec_driver_sql("SELECT 1 FROM sqlite_master LIMIT 1").first():
+                connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.exec_driver_sql("VACUUM")
         # Base.metadata.create_all checks for table existence before creating
         Base.metadata.create_all(bind=engine)
+        _create_missing_indexes()
+        _externalize_inline_blobs()
+        _ensure_search_index()
+        _ensure_invoice_balances()
+        _ensure_finance_rollups()
         from inventory_categories import ensure_inventory_categories
 
         with SessionLocal() as db:
             ensure_inventory_categories(db, commit=True)
+        # Written last, so a launch that fails part-way runs every step again next time.
+        with engine.begin() as connection:
+            store_schema_fingerprint(connection, fingerprint)
         print("Tables created successfully (if they didn't exist).")
     except Exception as e:
         print(f"Error during table creation: {e}")
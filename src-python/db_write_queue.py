@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Optional
+
+# Matches SQLite's busy timeout: a writer that waits longer than this fails like a locked database would.
+WRITE_QUEUE_TIMEOUT_SECONDS = 30.0
+# Recent lock waits kept for the percentiles reported by stats().
+WAIT_SAMPLES = 1024
+
+# Statements that need SQLite's write lock (or, for VACUUM, exclusive access).
+_WRITE_STATEMENT = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|VACUUM)\b", re.IGNORECASE)
+
+
+def is_write_statement(statement: str) -> bool:
+    return bool(_WRITE_STATEMENT.match(statement))
+
+
+class WriteQueueTimeout(TimeoutError):
+    pass
+
+
+class WriteQueue:
+    """
+    FIFO gate in front of SQLite's single write lock.
+    SQLite's own busy handler makes waiting writers poll with growing sleeps, so under load
+    they are served in no particular order and can run into the 30s timeout. Here each writer
+    takes a ticket on its first write statement and holds the gate until its transaction ends,
+    so writers queue in arrival order and the wait is measured.
+    The gate is re-entrant per thread: a thread that already writes on one connection is not
+    queued behind itself when it opens another.
+    """
+
+    def __init__(self, timeout: float = WRITE_QUEUE_TIMEOUT_SECONDS):
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        self._tickets: Deque[object] = deque()
+        self._owner: Optional[int] = None
+        self._holds = 0
+        self._held_since = 0.0
+        # Metrics
+        self._acquired = 0
+        self._timeouts = 0
+        self._max_depth = 0
+        self._wait_ms: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._total_hold_ms = 0.0
+        self._max_hold_ms = 0.0
+
+    def acquire(self) -> float:
+        """Block until this thread may write; returns the time spent waiting in ms."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._holds += 1
+                return 0.0
+            ticket = object()
+            self._tickets.append(ticket)
+            self._max_depth = max(self._max_depth, len(self._tickets))
+            started = time.perf_counter()
+            deadline = started + self._timeout
+            while self._owner is not None or self._tickets[0] is not ticket:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._tickets.remove(ticket)
+                    self._timeouts += 1
+                    self._cond.notify_all()
+                    raise WriteQueueTimeout(f"Timed out after {self._timeout:.0f}s waiting for the database write lock.")
+                self._cond.wait(remaining)
+            self._tickets.popleft()
+            self._owner = me
+            self._holds = 1
+            now = time.perf_counter()
+            self._held_since = now
+            waited = (now - started) * 1000.0
+            self._acquired += 1
+            self._wait_ms.append(waited)
+            self._total_wait_ms += waited
+            self._max_wait_ms = max(self._max_wait_ms, waited)
+            return waited
+
+    def release(self, owner: Optional[int] = None) -> None:
+        """Release one hold. `owner` is the thread that acquired it, when releasing from another thread."""
+        with self._cond:
+            if self._owner != (owner if owner is not None else threading.get_ident()):
+                return
+            self._holds -= 1
+            if self._holds > 0:
+                return
+            held = (time.perf_counter() - self._held_since) * 1000.0
+            self._total_hold_ms += held
+            self._max_hold_ms = max(self._max_hold_ms, held)
+            self._owner = None
+            self._cond.notify_all()
+
+    @contextmanager
+    def hold(self):
+        """Hold the queue for work that bypasses SQLAlchemy (e.g. raw executescript)."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            waits = sorted(self._wait_ms)
+            depth = len(self._tickets)
+            summary = {
+                "queue_depth": depth,
+                "max_queue_depth": self._max_depth,
+                "writer_active": self._owner is not None,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "lock_wait_ms": {
+                    "total": round(self._total_wait_ms, 1),
+                    "max": round(self._max_wait_ms, 1),
+                    "mean": round(self._total_wait_ms / self._acquired, 2) if self._acquired else None,
+                },
+                "lock_hold_ms": {
+                    "total": round(self._total_hold_ms, 1),
+                    "max": round(self._max_hold_ms, 1),
+                },
+            }
+        for pct in (50, 90, 99):
+            # Nearest-rank percentile over the recent waits.
+            rank = max(1, math.ceil(len(waits) * pct / 100))
+            summary["lock_wait_ms"][f"p{pct}"] = round(waits[rank - 1], 2) if waits else None
+        return summary
+
+
+write_queue = WriteQueue()
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect as sa_inspect, select
+
+from models import FinanceDailyRollup, InventoryItem, InventoryValueRollup, Invoice, Payment, Project, User
+
+# finance_daily_rollups and inventory_value_rollups hold the finance dashboard's figures
+# pre-aggregated, so /finances/stats reads a handful of buckets instead of joining payments to
+# invoices, projects and users. db_setup's session listeners rebuild the buckets a flush or bulk
+# statement touches (pulls included) in the same transaction: a payment, invoice, project or
+# user change rebuilds the whole days it feeds, an inventory item change its (organization, branch)
+# group. Rebuilding a day from its rows keeps the maintenance exact without tracking old buckets.
+DAILY_TABLE = FinanceDailyRollup.__tablename__
+INVENTORY_TABLE = InventoryValueRollup.__tablename__
+# Uuids per IN (...) lookup, well under SQLite's bound-parameter limit.
+RESOLVE_CHUNK = 500
+
+# Attributes whose change moves some day's figures.
+_PAYMENT_ATTRS = ("amount", "invoice_uuid", "created_at", "deleted_at")
+_INVOICE_DAY_ATTRS = ("amount", "issued_at", "deleted_at")
+# Attributes that decide which bucket an invoice and its payments land in.
+_INVOICE_ATTRIBUTION_ATTRS = ("project_uuid", "user_uuid")
+_PROJECT_ATTRIBUTION_ATTRS = ("organization_uuid", "branch_uuid", "user_uuid")
+_USER_ATTRIBUTION_ATTRS = ("organization_uuid", "branch_uuid")
+_ITEM_ATTRS = ("buy_price", "quantity_on_hand", "deleted_at", "organization_uuid", "branch_uuid")
+
+# Same attribution as the dashboard always used: the project's organization and branch, else the issuer's.
+_ATTRIBUTION = """
+    COALESCE(projects.organization_uuid, "user".organization_uuid) AS organization_uuid,
+    COALESCE(projects.branch_uuid, "user".branch_uuid) AS branch_uuid,
+    invoices.user_uuid AS issuer_uuid,
+    projects.user_uuid AS owner_uuid"""
+_INVOICE_JOINS = """
+    LEFT JOIN projects ON invoices.project_uuid = projects.uuid
+    LEFT JOIN "user" ON invoices.user_uuid = "user".uuid"""
+_DAILY_COLUMNS = (
+    "day, organization_uuid, branch_uuid, issuer_uuid, owner_uuid, "
+    "revenue, payment_count, invoiced, outstanding, invoice_count"
+)
+
+
+def _daily_select(payment_range: str = "", invoice_range: str = "") -> str:
+    return f"""
+SELECT day, organization_uuid, branch_uuid, issuer_uuid, owner_uuid,
+       ROUND(SUM(revenue), 2), SUM(payment_count), ROUND(SUM(invoiced), 2), ROUND(SUM(outstanding), 2), SUM(invoice_count)
+FROM (
+    SELECT date(payments.created_at) AS day, {_ATTRIBUTION},
+           COALESCE(payments.amount, 0) AS revenue, 1 AS payment_count, 0 AS invoiced, 0 AS outstanding, 0 AS invoice_count
+    FROM payments JOIN invoices ON payments.invoice_uuid = invoices.uuid {_INVOICE_JOINS}
+    WHERE payments.deleted_at IS NULL {payment_range}
+    UNION ALL
+    SELECT date(invoices.issued_at) AS day, {_ATTRIBUTION},
+           0, 0, COALESCE(invoices.amount, 0), COALESCE(invoices.remainder, 0), 1
+    FROM invoices {_INVOICE_JOINS}
+    WHERE invoices.issued_at IS NOT NULL AND invoices.deleted_at IS NULL {invoice_range}
+)
+GROUP BY day, organization_uuid, branch_uuid, issuer_uuid, owner_uuid
+"""
+
+
+# Day bounds are compared as text: stored datetimes sort after their own date ('2025-01-02 ...' > '2025-01-02').
+_DAILY_RANGE = _daily_select(
+    "AND payments.created_at >= ? AND payments.created_at < ?",
+    "AND invoices.issued_at >= ? AND invoices.issued_at < ?",
+)
+_DAILY_ALL = _daily_select()
+
+_INVENTORY_SELECT = """
+SELECT organization_uuid, branch_uuid, COALESCE(ROUND(SUM(buy_price * quantity_on_hand), 2), 0), COUNT(*)
+FROM inventory_items WHERE deleted_at IS NULL {where}
+GROUP BY organization_uuid, branch_uuid
+"""
+_INVENTORY_GROUP = _INVENTORY_SELECT.format(where="AND organization_uuid IS ? AND branch_uuid IS ?")
+_INVENTORY_ALL = _INVENTORY_SELECT.format(where="")
+_INVENTORY_COLUMNS = "organization_uuid, branch_uuid, value, item_count"
+
+
+def _day(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def _day_runs(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """Consecutive days collapsed into inclusive (first, last) runs, one rebuild statement each."""
+    runs = []
+    for day in sorted(set(days)):
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _chunks(values: Iterable[str]):
+    values = sorted({v for v in values if v})
+    for start in range(0, len(values), RESOLVE_CHUNK):
+        yield values[start:start + RESOLVE_CHUNK]
+
+
+# --- Rebuilding ---
+
+def refresh_days(connection, days: Iterable[date]) -> int:
+    """Rebuild the daily buckets of the given days from payments and invoices; returns the buckets written."""
+    written = 0
+    for first, last in _day_runs(d for d in days if d):
+        connection.exec_driver_sql(
+            f"DELETE FROM {DAILY_TABLE} WHERE day >= ? AND day <= ?", (first.isoformat(), last.isoformat())
+        )
+        lower, upper = first.isoformat(), (last + timedelta(days=1)).isoformat()
+        result = connection.exec_driver_sql(
+            f"INSERT INTO {DAILY_TABLE} ({_DAILY_COLUMNS}) {_DAILY_RANGE}", (lower, upper, lower, upper)
+        )
+        written += result.rowcount
+    return written
+
+
+def refresh_inventory_groups(connection, groups: Iterable[Tuple[Optional[str], Optional[str]]]) -> int:
+    """Rebuild the stock value of the given (organization_uuid, branch_uuid) groups."""
+    written = 0
+    for organization_uuid, branch_uuid in set(groups):
+        params = (organization_uuid, branch_uuid)
+        connection.exec_driver_sql(
+            f"DELETE FROM {INVENTORY_TABLE} WHERE organization_uuid IS ? AND branch_uuid IS ?", params
+        )
+        result = connection.exec_driver_sql(f"INSERT INTO {INVENTORY_TABLE} ({_INVENTORY_COLUMNS}) {_INVENTORY_GROUP}", params)
+        written += result.rowcount
+    return written
+
+
+def rebuild_all_rollups(connection) -> dict:
+    """Rebuild every bucket from scratch (backfill, or repair after drift)."""
+    connection.exec_driver_sql(f"DELETE FROM {DAILY_TABLE}")
+    days = connection.exec_driver_sql(f"INSERT INTO {DAILY_TABLE} ({_DAILY_COLUMNS}) {_DAILY_ALL}").rowcount
+    connection.exec_driver_sql(f"DELETE FROM {INVENTORY_TABLE}")
+    groups = connection.exec_driver_sql(f"INSERT INTO {INVENTORY_TABLE} ({_INVENTORY_COLUMNS}) {_INVENTORY_ALL}").rowcount
+    return {"daily_buckets": days, "inventory_groups": groups}
+
+
+def rollups_missing(connection) -> bool:
+    """
+    True when the rollup tables are empty although there is something to roll up: a database from
+    before them (create_all just added the tables) or one whose rollups were dropped.
+    """
+    def exists(sql: str) -> bool:
+        return connection.exec_driver_sql(f"SELECT EXISTS ({sql})").scalar() == 1
+
+    if exists(f"SELECT 1 FROM {DAILY_TABLE}") or exists(f"SELECT 1 FROM {INVENTORY_TABLE}"):
+        return False
+    return (
+        exists("SELECT 1 FROM payments WHERE deleted_at IS NULL")
+        or exists("SELECT 1 FROM invoices WHERE issued_at IS NOT NULL AND deleted_at IS NULL")
+        or exists("SELECT 1 FROM inventory_items WHERE deleted_at IS NULL")
+    )
+
+
+def create_rollup_tables(connection) -> bool:
+    """Create the rollup tables (and their indexes) if missing; returns True when any had to be created."""
+    created = False
+    for table in (FinanceDailyRollup.__table__, InventoryValueRollup.__table__):
+        if not sa_inspect(connection).has_table(table.name):
+            table.create(bind=connection)
+            created = True
+    return created
+
+
+# --- Tracking what a flush touches ---
+
+@dataclass
+class RollupChanges:
+    """
+    What a flush (or bulk statement) touched. Days known up front are kept as days; the rest are
+    resolved after the write, once new rows have their keys and moved rows their new values.
+    """
+    days: Set[date] = field(default_factory=set)
+    # Invoices whose issue day must be rebuilt (their remainder or amount changed).
+    invoices: Set[str] = field(default_factory=set)
+    # Invoices, projects and users whose attribution changed: every day their invoices feed.
+    invoice_footprints: Set[str] = field(default_factory=set)
+    project_footprints: Set[str] = field(default_factory=set)
+    user_footprints: Set[str] = field(default_factory=set)
+    # New rows get their uuid and created_at during the flush, so they are read afterwards.
+    new_payments: List[Payment] = field(default_factory=list)
+    # New invoices, projects and users: a pull can bring them after the rows that point at them.
+    new_parents: List[object] = field(default_factory=list)
+    inventory_groups: Set[Tuple[Optional[str], Optional[str]]] = field(default_factory=set)
+    inventory_items: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return any((
+            self.days, self.invoices, self.invoice_footprints, self.project_footprints,
+            self.user_footprints, self.new_payments, self.new_parents, self.inventory_groups, self.inventory_items,
+        ))
+
+    def merge(self, other: "RollupChanges") -> None:
+        self.days |= other.days
+        self.invoices |= other.invoices
+        self.invoice_footprints |= other.invoice_footprints
+        self.project_footprints |= other.project_footprints
+        self.user_footprints |= other.user_footprints
+        self.new_payments.extend(other.new_payments)
+        self.new_parents.extend(other.new_parents)
+        self.inventory_groups |= other.inventory_groups
+        self.inventory_items |= other.inventory_items
+
+
+def _changed(state, attrs) -> bool:
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _previous(state, attr) -> list:
+    return list(state.attrs[attr].history.deleted or ())
+
+
+def collect_rollup_changes(session) -> Optional[RollupChanges]:
+    """
+    The buckets this flush may change. Called from db_setup's before_flush listener, while
+    attribute history still shows the previous days and groups.
+    """
+    changes = RollupChanges()
+    for instance in session.new:
+        if isinstance(instance, Payment):
+            changes.new_payments.append(instance)
+            changes.invoices.add(instance.invoice_uuid)
+        elif isinstance(instance, (Invoice, Project, User)):
+            changes.new_parents.append(instance)
+        elif isinstance(instance, InventoryItem):
+            changes.inventory_groups.add((instance.organization_uuid, instance.branch_uuid))
+
+    for instance in session.dirty:
+        if isinstance(instance, Payment):
+            state = sa_inspect(instance)
+            if _changed(state, _PAYMENT_ATTRS):
+                changes.days.add(_day(instance.created_at))
+                changes.days.update(_day(value) for value in _previous(state, "created_at"))
+                changes.invoices.add(instance.invoice_uuid)
+                changes.invoices.update(_previous(state, "invoice_uuid"))
+        elif isinstance(instance, Invoice):
+            state = sa_inspect(instance)
+            if _changed(state, _INVOICE_DAY_ATTRS):
+                changes.days.add(_day(instance.issued_at))
+                changes.days.update(_day(value) for value in _previous(state, "issued_at"))
+            if _changed(state, _INVOICE_ATTRIBUTION_ATTRS):
+                changes.invoice_footprints.add(instance.uuid)
+        elif isinstance(instance, Project):
+            if _changed(sa_inspect(instance), _PROJECT_ATTRIBUTION_ATTRS):
+                changes.project_footprints.add(instance.uuid)
+        elif isinstance(instance, User):
+            if _changed(sa_inspect(instance), _USER_ATTRIBUTION_ATTRS):
+                changes.user_footprints.add(instance.uuid)
+        elif isinstance(instance, InventoryItem):
+            state = sa_inspect(instance)
+            if _changed(state, _ITEM_ATTRS):
+                organizations = {instance.organization_uuid, *_previous(state, "organization_uuid")}
+                branches = {instance.branch_uuid, *_previous(state, "branch_uuid")}
+                changes.inventory_groups.update((o, b) for o in organizations for b in branches)
+
+    for instance in session.deleted:
+        if isinstance(instance, Payment):
+            changes.days.add(_day(instance.created_at))
+            changes.invoices.add(instance.invoice_uuid)
+        elif isinstance(instance, Invoice):
+            # Payments left behind stop counting once their invoice is gone.
+            changes.days.add(_day(instance.issued_at))
+            changes.invoice_footprints.add(instance.uuid)
+        elif isinstance(instance, Project):
+            changes.project_footprints.add(instance.uuid)
+        elif isinstance(instance, User):
+            changes.user_footprints.add(instance.uuid)
+        elif isinstance(instance, InventoryItem):
+            changes.inventory_groups.add((instance.organization_uuid, instance.branch_uuid))
+
+    changes.days.discard(None)
+    changes.invoices.discard(None)
+    return changes or None
+
+
+def bulk_rollup_changes(session, model, statement) -> Optional[RollupChanges]:
+    """
+    What a bulk UPDATE/DELETE on `model` will touch, queried before it runs. Rows it matches are
+    also resolved again afterwards, so an UPDATE that moves them rebuilds both sides.
+    """
+    def matching(*columns):
+        query = select(*columns).distinct()
+        if statement.whereclause is not None:
+            query = query.where(statement.whereclause)
+        return session.execute(query).all()
+
+    changes = RollupChanges()
+    if model is Payment:
+        for created_at, invoice_uuid in matching(Payment.created_at, Payment.invoice_uuid):
+            changes.days.add(_day(created_at))
+            changes.invoice_footprints.add(invoice_uuid)
+    elif model is Invoice:
+        for issued_at, uuid in matching(Invoice.issued_at, Invoice.uuid):
+            changes.days.add(_day(issued_at))
+            changes.invoice_footprints.add(uuid)
+    elif model is Project:
+        changes.project_footprints.update(uuid for (uuid,) in matching(Project.uuid))
+    elif model is User:
+        changes.user_footprints.update(uuid for (uuid,) in matching(User.uuid))
+    elif model is InventoryItem:
+        for organization_uuid, branch_uuid, uuid in matching(
+            InventoryItem.organization_uuid, InventoryItem.branch_uuid, InventoryItem.uuid
+        ):
+            changes.inventory_groups.add((organization_uuid, branch_uuid))
+            changes.inventory_items.add(uuid)
+    changes.days.discard(None)
+    changes.invoice_footprints.discard(None)
+    return changes or None
+
+
+def _resolve_days(connection, changes: RollupChanges) -> Set[date]:
+    days = set(changes.days)
+    days.update(_day(payment.created_at) for payment in changes.new_payments)
+
+    footprints = set(changes.invoice_footprints)
+    projects, users = set(changes.project_footprints), set(changes.user_footprints)
+    for instance in changes.new_parents:
+        {Invoice: footprints, Project: projects, User: users}[type(instance)].add(instance.uuid)
+    for column, uuids in (("project_uuid", projects), ("user_uuid", users)):
+        for chunk in _chunks(uuids):
+            placeholders = ", ".join("?" for _ in chunk)
+            footprints.update(uuid for (uuid,) in connection.exec_driver_sql(
+                f"SELECT uuid FROM invoices WHERE {column} IN ({placeholders})", tuple(chunk)
+            ))
+
+    for chunk in _chunks(changes.invoices | footprints):
+        placeholders = ", ".join("?" for _ in chunk)
+        days.update(_day(value) for (value,) in connection.exec_driver_sql(
+            f"SELECT DISTINCT date(issued_at) FROM invoices WHERE uuid IN ({placeholders}) AND issued_at IS NOT NULL",
+            tuple(chunk),
+        ))
+    for chunk in _chunks(footprints):
+        placeholders = ", ".join("?" for _ in chunk)
+        days.update(_day(value) for (value,) in connection.exec_driver_sql(
+            f"SELECT DISTINCT date(created_at) FROM payments WHERE invoice_uuid IN ({placeholders})", tuple(chunk)
+        ))
+    days.discard(None)
+    return days
+
+
+def _resolve_inventory_groups(connection, changes: RollupChanges) -> Set[Tuple[Optional[str], Optional[str]]]:
+    groups = set(changes.inventory_groups)
+    for chunk in _chunks(changes.inventory_items):
+        placeholders = ", ".join("?" for _ in chunk)
+        groups.update(tuple(row) for row in connection.exec_driver_sql(
+            f"SELECT DISTINCT organization_uuid, branch_uuid FROM inventory_items WHERE uuid IN ({placeholders})",
+            tuple(chunk),
+        ))
+    return groups
+
+
+def apply_rollup_changes(connection, changes: RollupChanges) -> None:
+    """Rebuild the buckets `changes` touched; runs after the write, in its transaction."""
+    refresh_days(connection, _resolve_days(connection, changes))
+    refresh_inventory_groups(connection, _resolve_inventory_groups(connection, changes))
+
+
+# --- Verification ---
+
+_STORED_DAILY = f"SELECT {_DAILY_COLUMNS} FROM {DAILY_TABLE}"
+_STORED_INVENTORY = f"SELECT {_INVENTORY_COLUMNS} FROM {INVENTORY_TABLE}"
+
+
+def find_rollup_drift(connection) -> Tuple[List[str], List[Tuple[Optional[str], Optional[str]]]]:
+    """Days and inventory groups whose buckets disagree with a rebuild from the rows."""
+    days = sorted({day for (day, *_rest) in connection.exec_driver_sql(
+        f"SELECT * FROM ({_DAILY_ALL} EXCEPT {_STORED_DAILY}) UNION SELECT * FROM ({_STORED_DAILY} EXCEPT {_DAILY_ALL})"
+    )})
+    groups = sorted({(organization_uuid, branch_uuid) for (organization_uuid, branch_uuid, *_rest) in connection.exec_driver_sql(
+        f"SELECT * FROM ({_INVENTORY_ALL} EXCEPT {_STORED_INVENTORY}) "
+        f"UNION SELECT * FROM ({_STORED_INVENTORY} EXCEPT {_INVENTORY_ALL})"
+    )}, key=lambda group: (group[0] or "", group[1] or ""))
+    return days, groups
+
+
+def verify_finance_rollups(connection, repair: bool = True) -> dict:
+    """
+    Compare every bucket with a rebuild from payments, invoices and inventory items and report the
+    ones that had drifted (writes that bypassed the session). With repair=True they are rebuilt.
+    """
+    days, groups = find_rollup_drift(connection)
+    if repair:
+        refresh_days(connection, [_day(day) for day in days])
+        refresh_inventory_groups(connection, groups)
+    return {
+        "drifted_days": len(days),
+        "drifted_inventory_groups": len(groups),
+        "repaired": bool(days or groups) and repair,
+        "days": days[:20],
+    }
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from utils import inject_db_session, get_db
+from utils import inject_db_session, get_db, inject_read_db_session
 from finances.finances import (
     calculate_dashboard_stats,
     confirm_and_issue_invoice,
@@ -17,7 +17,7 @@ logger = logging.getLogger(__name__)
 finances_bp = Blueprint('finances_bp', __name__, url_prefix='/finances')
 
 @finances_bp.route('/stats', methods=['GET'])
-@inject_db_session
+@inject_read_db_session
 def get_stats(db):
     """
     Get Finance Dashboard statistics.
@@ -48,7 +48,7 @@ def confirm_invoice(db, invoice_uuid):
     return jsonify(result), status_code
 
 @finances_bp.route('/payments', methods=['GET'])
-@inject_db_session
+@inject_read_db_session
 def get_payments(db):
     """
     Get payment history with filtering.
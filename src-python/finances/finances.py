@@ -1,6 +1,6 @@
 from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
-from models import Invoice, Payment, InventoryItem, ProjectComponent, StockAdjustment, Project, User
+from models import Invoice, Payment, InventoryItem, ProjectComponent, StockAdjustment, Project, FinanceDailyRollup, InventoryValueRollup
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Optional
@@ -9,82 +9,58 @@ import json
 def calculate_dashboard_stats(db: Session, organization_uuid: Optional[str] = None, branch_uuid: Optional[str] = None, start_date: Optional[str] = None, end_date: Optional[str] = None, user_uuid: Optional[str] = None):
     """
     Calculate Finance Dashboard statistics with optional date filtering.
+    Reads the pre-aggregated buckets kept by finance_rollups; dates select whole days, both ends included.
     """
-    # Base filters for revenue and invoices
-    def apply_filters(query, model):
+    def apply_filters(query):
         if organization_uuid:
-            query = query.filter(func.coalesce(Project.organization_uuid, User.organization_uuid) == organization_uuid)
+            query = query.filter(FinanceDailyRollup.organization_uuid == organization_uuid)
         elif user_uuid:
-            query = query.filter(or_(Project.user_uuid == user_uuid, Invoice.user_uuid == user_uuid))
+            query = query.filter(or_(FinanceDailyRollup.owner_uuid == user_uuid, FinanceDailyRollup.issuer_uuid == user_uuid))
 
         if branch_uuid:
-            query = query.filter(func.coalesce(Project.branch_uuid, User.branch_uuid) == branch_uuid)
-
-        if model == Payment:
-            if start_date:
-                query = query.filter(Payment.created_at >= datetime.fromisoformat(start_date))
-            if end_date:
-                query = query.filter(Payment.created_at <= datetime.fromisoformat(end_date))
-        elif model == Invoice:
-            if start_date:
-                query = query.filter(Invoice.issued_at >= datetime.fromisoformat(start_date))
-            if end_date:
-                query = query.filter(Invoice.issued_at <= datetime.fromisoformat(end_date))
-        return query
-
-    # 1. Aggregate Total Revenue (Sum of all payments within range)
-    revenue_query = db.query(func.sum(Payment.amount)) \
-        .join(Invoice, Payment.invoice_uuid == Invoice.uuid) \
-        .outerjoin(Project, Invoice.project_uuid == Project.uuid) \
-        .outerjoin(User, Invoice.user_uuid == User.uuid) \
-        .filter(Payment.deleted_at.is_(None))
-
-    revenue_query = apply_filters(revenue_query, Payment)
-    total_revenue = revenue_query.scalar() or 0.0
+            query = query.filter(FinanceDailyRollup.branch_uuid == branch_uuid)
 
-    # 2. Total Invoices Amount (Sum of all invoices issued within range)
-    invoice_total_query = db.query(func.sum(Invoice.amount)) \
-        .outerjoin(Project, Invoice.project_uuid == Project.uuid) \
-        .outerjoin(User, Invoice.user_uuid == User.uuid) \
-        .filter(Invoice.issued_at.is_not(None), Invoice.deleted_at.is_(None))
-
-    invoice_total_query = apply_filters(invoice_total_query, Invoice)
-    total_invoice_amount = invoice_total_query.scalar() or 0.0
+        if start_date:
+            query = query.filter(FinanceDailyRollup.day >= datetime.fromisoformat(start_date).date())
+        if end_date:
+            query = query.filter(FinanceDailyRollup.day <= datetime.fromisoformat(end_date).date())
+        return query
 
-    outstanding_invoices = float(total_invoice_amount) - float(total_revenue)
+    # 1. Totals over the range: revenue by payment day, invoiced and outstanding by issue day
+    totals = apply_filters(db.query(
+        func.sum(FinanceDailyRollup.revenue),
+        func.sum(FinanceDailyRollup.invoiced),
+        func.sum(FinanceDailyRollup.outstanding),
+    )).one()
+    total_revenue, total_invoiced, outstanding_invoices = (float(value or 0.0) for value in totals)
 
-    # 3. Inventory Value (Asset Value: Sum of buy_price * quantity_on_hand)
-    inventory_query = db.query(func.sum(InventoryItem.buy_price * InventoryItem.quantity_on_hand)) \
-        .filter(InventoryItem.deleted_at.is_(None))
+    # 2. Inventory Value (Asset Value: Sum of buy_price * quantity_on_hand)
+    inventory_query = db.query(func.sum(InventoryValueRollup.value))
     if organization_uuid:
-        inventory_query = inventory_query.filter(InventoryItem.organization_uuid == organization_uuid)
+        inventory_query = inventory_query.filter(InventoryValueRollup.organization_uuid == organization_uuid)
     elif user_uuid:
         # Inventory items don't have user_uuid directly, but usually tied to Org or NULL for single user
         # We'll assume NULL org_uuid means it belongs to the standalone user's data
-        inventory_query = inventory_query.filter(InventoryItem.organization_uuid == None)
+        inventory_query = inventory_query.filter(InventoryValueRollup.organization_uuid == None)
 
     if branch_uuid:
-        inventory_query = inventory_query.filter(InventoryItem.branch_uuid == branch_uuid)
+        inventory_query = inventory_query.filter(InventoryValueRollup.branch_uuid == branch_uuid)
 
     inventory_value = inventory_query.scalar() or 0.0
 
-    # 4. Revenue Trend (Grouped by date)
-    # Using SQLite date function for trend
-    trend_query = db.query(
-        func.date(Payment.created_at).label('date'),
-        func.sum(Payment.amount).label('revenue')
-    ).join(Invoice, Payment.invoice_uuid == Invoice.uuid) \
-     .outerjoin(Project, Invoice.project_uuid == Project.uuid) \
-     .outerjoin(User, Invoice.user_uuid == User.uuid) \
-     .filter(Payment.deleted_at.is_(None))
-
-    trend_query = apply_filters(trend_query, Payment)
-    trend_results = trend_query.group_by(func.date(Payment.created_at)).order_by(func.date(Payment.created_at)).all()
+    # 3. Revenue Trend (days with at least one payment)
+    trend_results = apply_filters(db.query(
+        FinanceDailyRollup.day.label('date'),
+        func.sum(FinanceDailyRollup.revenue).label('revenue')
+    )).group_by(FinanceDailyRollup.day) \
+      .having(func.sum(FinanceDailyRollup.payment_count) > 0) \
+      .order_by(FinanceDailyRollup.day).all()
 
-    revenue_trend = [{"date": r.date, "revenue": float(r.revenue)} for r in trend_results]
+    revenue_trend = [{"date": r.date.isoformat(), "revenue": float(r.revenue)} for r in trend_results]
 
     return {
-        "total_revenue": float(total_revenue),
+        "total_revenue": total_revenue,
+        "total_invoiced": total_invoiced,
         "outstanding_invoices": float(max(0, outstanding_invoices)),
         "inventory_value": float(inventory_value),
         "revenue_trend": revenue_trend
@@ -314,13 +290,13 @@ def apply_payment_to_invoice(db: Session, invoice_uuid: str):
     """
     Update "Partial" vs "Paid" status transitions based on total payments.
     """
+    # Pending payment writes refresh the invoice's balance columns on flush (see invoice_balances).
+    db.flush()
     invoice = db.query(Invoice).filter(Invoice.uuid == invoice_uuid).first()
     if not invoice:
         raise ValueError("Invoice not found")
 
-    # Calculate total paid with Decimal-safe arithmetic
-    total_paid_raw = db.query(func.sum(Payment.amount)).filter(Payment.invoice_uuid == invoice_uuid).scalar()
-    total_paid = Decimal(str(total_paid_raw or 0)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    total_paid = Decimal(str(invoice.paid_amount or 0)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
     invoice_amount = Decimal(str(invoice.amount or 0)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
     if invoice.project_uuid:
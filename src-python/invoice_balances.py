@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect as sa_inspect, select
+from sqlalchemy.schema import CreateColumn
+
+from models import Invoice, Payment
+
+# Invoice.paid_amount, remainder and last_payment_at are a materialized view of the invoice's
+# live (not soft-deleted) payments. db_setup's session listeners refresh them in the same
+# transaction as every flush or bulk statement that writes payments, so readers (invoice list,
+# payment status transitions, dashboard) use the columns instead of summing payments.
+BALANCE_COLUMNS = ("paid_amount", "remainder", "last_payment_at")
+# Invoice uuids per UPDATE ... WHERE uuid IN (...), well under SQLite's bound-parameter limit.
+REFRESH_CHUNK = 500
+# Payment attributes that change some invoice's balance.
+_PAYMENT_ATTRS = ("amount", "invoice_uuid", "payment_date", "deleted_at")
+# Stored balances further than this from the payments count as drift (amounts have 2 decimals).
+DRIFT_TOLERANCE = 0.005
+
+_LIVE_PAYMENTS = "FROM payments WHERE payments.invoice_uuid = invoices.uuid AND payments.deleted_at IS NULL"
+_PAID = f"(SELECT ROUND(COALESCE(SUM(payments.amount), 0), 2) {_LIVE_PAYMENTS})"
+_LAST_PAYMENT = f"(SELECT MAX(COALESCE(payments.payment_date, payments.created_at)) {_LIVE_PAYMENTS})"
+# SET expressions see the old row, so remainder recomputes the sum instead of reading paid_amount.
+# updated_at is left alone: balances are local bookkeeping, not an edit to sync.
+_REFRESH = (
+    f"UPDATE invoices SET paid_amount = {_PAID}, "
+    f"remainder = ROUND(COALESCE(invoices.amount, 0) - {_PAID}, 2), "
+    f"last_payment_at = {_LAST_PAYMENT}"
+)
+
+
+# --- Schema ---
+
+def add_balance_columns(connection) -> bool:
+    """
+    create_all never alters an existing table: add the balance columns to an invoices table from
+    before them. Returns True when columns were added (their values then need a full refresh).
+    """
+    existing = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(invoices)")}
+    missing = [Invoice.__table__.c[name] for name in BALANCE_COLUMNS if name not in existing]
+    for column in missing:
+        ddl = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f"ALTER TABLE invoices ADD COLUMN {ddl}")
+    return bool(missing)
+
+
+# --- Refreshing ---
+
+def refresh_invoice_balances(connection, invoice_uuids: Iterable[str]) -> int:
+    """Recompute the balances of the given invoices from their payments; returns the rows updated."""
+    invoice_uuids = sorted({u for u in invoice_uuids if u})
+    updated = 0
+    for start in range(0, len(invoice_uuids), REFRESH_CHUNK):
+        chunk = invoice_uuids[start:start + REFRESH_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        result = connection.exec_driver_sql(f"{_REFRESH} WHERE invoices.uuid IN ({placeholders})", tuple(chunk))
+        updated += result.rowcount
+    return updated
+
+
+def refresh_all_invoice_balances(connection) -> int:
+    """Recompute every invoice's balance (backfill, or repair after drift)."""
+    return connection.exec_driver_sql(_REFRESH).rowcount
+
+
+def expire_invoice_balances(session, invoice_uuids: Set[str]) -> None:
+    """Balances were rewritten underneath the ORM; make loaded invoices read them again."""
+    for instance in list(session.identity_map.values()):
+        if isinstance(instance, Invoice) and instance.uuid in invoice_uuids:
+            session.expire(instance, BALANCE_COLUMNS)
+
+
+# --- Tracking what a flush touches ---
+
+def collect_balance_changes(session) -> Optional[Tuple[Set[str], List[Invoice]]]:
+    """
+    Invoices whose balance this flush may change: (uuids, new invoices). New invoices get their
+    uuid during the flush, so they are resolved afterwards. Called from db_setup's before_flush
+    listener, while attribute history still shows previous invoice_uuids.
+    """
+    uuids, new_invoices = set(), []
+    for instance in session.new:
+        if isinstance(instance, Payment):
+            uuids.add(instance.invoice_uuid)
+        elif isinstance(instance, Invoice):
+            new_invoices.append(instance)
+    for instance in session.dirty:
+        if isinstance(instance, Payment):
+            state = sa_inspect(instance)
+            if any(state.attrs[attr].history.has_changes() for attr in _PAYMENT_ATTRS):
+                uuids.add(instance.invoice_uuid)
+                # Moved to another invoice: the old one loses the amount.
+                uuids.update(state.attrs.invoice_uuid.history.deleted or ())
+        elif isinstance(instance, Invoice):
+            if sa_inspect(instance).attrs.amount.history.has_changes():
+                uuids.add(instance.uuid)
+    for instance in session.deleted:
+        if isinstance(instance, Payment):
+            uuids.add(instance.invoice_uuid)
+    uuids.discard(None)
+    if not (uuids or new_invoices):
+        return None
+    return uuids, new_invoices
+
+
+def bulk_payment_invoice_uuids(session, statement) -> Set[str]:
+    """Invoices whose payments a bulk UPDATE/DELETE on payments will touch (query before it runs)."""
+    query = select(Payment.invoice_uuid).distinct()
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    return {invoice_uuid for (invoice_uuid,) in session.execute(query) if invoice_uuid}
+
+
+# --- Verification ---
+
+_DRIFT = f"""
+SELECT invoices.uuid, invoices.invoice_id,
+       invoices.paid_amount, invoices.remainder, invoices.last_payment_at,
+       COALESCE(live.paid, 0), ROUND(COALESCE(invoices.amount, 0) - COALESCE(live.paid, 0), 2), live.last_payment_at
+FROM invoices
+LEFT JOIN (
+    SELECT invoice_uuid, ROUND(SUM(amount), 2) AS paid,
+           MAX(COALESCE(payment_date, created_at)) AS last_payment_at
+    FROM payments WHERE deleted_at IS NULL GROUP BY invoice_uuid
+) AS live ON live.invoice_uuid = invoices.uuid
+WHERE invoices.paid_amount IS NULL OR invoices.remainder IS NULL
+   OR ABS(invoices.paid_amount - COALESCE(live.paid, 0)) > {DRIFT_TOLERANCE}
+   OR ABS(invoices.remainder - (COALESCE(invoices.amount, 0) - COALESCE(live.paid, 0))) > {DRIFT_TOLERANCE}
+   OR invoices.last_payment_at IS NOT live.last_payment_at
+"""
+
+
+def find_balance_drift(connection) -> List[dict]:
+    """Invoices whose stored balance disagrees with their payments, with both versions."""
+    drift = []
+    for uuid, invoice_id, paid, remainder, last, expected_paid, expected_remainder, expected_last in connection.exec_driver_sql(_DRIFT):
+        drift.append({
+            "uuid": uuid,
+            "invoice_id": invoice_id,
+            "stored": {"paid_amount": paid, "remainder": remainder, "last_payment_at": last},
+            "expected": {"paid_amount": expected_paid, "remainder": expected_remainder, "last_payment_at": expected_last},
+        })
+    return drift
+
+
+def verify_invoice_balances(connection, repair: bool = True) -> dict:
+    """
+    Recompute every balance from the payments and report the invoices that had drifted
+    (writes that bypassed the session, e.g. raw SQL or an older app version). With repair=True
+    the drifted rows are refreshed.
+    """
+    drift = find_balance_drift(connection)
+    if drift and repair:
+        refresh_invoice_balances(connection, [row["uuid"] for row in drift])
+    return {"drifted": len(drift), "repaired": bool(drift) and repair, "invoices": drift[:20]}
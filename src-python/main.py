@@ -1,5 +1,6 @@
 # src-python/main.py
 import argparse
+import logging
 import os
 import signal
 import sys
@@ -31,12 +32,10 @@ if do_profile:
 # =================================================================
 # 1. WINDOWS PRODUCTION PATCH
 # =================================================================
-# Apply early on Windows before any Supabase/PostGREST call can parse a response.
-# The rebuild is harmless in dev and prevents Nuitka onefile response-model gaps.
-if sys.platform == "win32":
-    from pydantic_postgrest_bootstrap import apply_postgrest_pydantic_bootstrap
-    apply_postgrest_pydantic_bootstrap()
-    print("PYTHON: PostGREST/Pydantic bootstrap applied.")
+# The PostGREST/Pydantic bootstrap used to be applied here on Windows. It now runs in
+# supabase_client right before the Supabase clients are first built, which is still before any
+# response can be parsed, and keeps supabase/postgrest off the startup path until a sync or a
+# cloud call needs them.
 
 # =================================================================
 # 2. GATED COMPILATION SELF-TEST
@@ -94,6 +93,10 @@ from flask_cors import CORS
 from routes import all_blueprints
 from werkzeug.exceptions import HTTPException
 from db_setup import create_db_and_tables
+from db_maintenance import db_maintenance
+from query_metrics import query_metrics
+from request_metrics import request_metrics
+from sampling_profiler import sampling_profiler
 
 
 # --- Flask App Setup ---
@@ -108,6 +111,19 @@ def create_app():
     for bp in all_blueprints:
         app.register_blueprint(bp, url_prefix=bp.url_prefix)
 
+    # Background DB maintenance only runs while no request is in flight.
+    app.before_request(db_maintenance.request_started)
+    app.teardown_request(db_maintenance.request_finished)
+    # SQL statements and time per endpoint, for /system/metrics.
+    app.teardown_request(query_metrics.request_finished)
+    # Latency, response sizes, status codes and in-flight requests, for /system/info and /system/prometheus.
+    app.before_request(request_metrics.request_started)
+    app.after_request(request_metrics.response_ready)
+    app.teardown_request(request_metrics.request_finished)
+    # Route captures of the runtime profiler (/system/profiler) follow the threads serving the route.
+    app.before_request(sampling_profiler.request_started)
+    app.teardown_request(sampling_profiler.request_finished)
+
     return app
 
 app = create_app()
@@ -147,6 +163,8 @@ def shutdown():
     return "Shutting down", 200
 
 # --- Run the Flask app ---
+WAITRESS_THREADS = 12
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=5000)
@@ -180,10 +198,17 @@ if __name__ == "__main__":
         print("Serving for dev mode")
         # Only print BACKEND_READY in the main worker process, not the reloader parent
         if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            db_maintenance.start()
             print("BACKEND_READY")
         app.run(host="127.0.0.1", port=port, debug=True, use_reloader=True)
     else:
-        from waitress import serve
+        from waitress import create_server
         print("Serving for prod mode")
+        db_maintenance.start()
+        # What waitress.serve does, keeping the server so its thread pool can be watched.
+        logging.basicConfig()
+        server = create_server(app, host="127.0.0.1", port=port, threads=WAITRESS_THREADS)
+        request_metrics.watch_waitress(server.task_dispatcher, WAITRESS_THREADS)
         print("BACKEND_READY")
-        serve(app, host="127.0.0.1", port=port, threads=12)
+        server.print_listen("Serving on http://{}:{}")
+        server.run()
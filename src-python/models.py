@@ -1,11 +1,13 @@
 # src-python/models.py
 from datetime import datetime
-from sqlalchemy import JSON, CheckConstraint, Column, Numeric, Float, Integer, LargeBinary, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import JSON, CheckConstraint, Column, Index, Numeric, Float, Integer, String, Date, DateTime, Boolean, ForeignKey, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import uuid
 import os
 
+from blob_store import BlobStore, external_blob_column
+
 # --- 1. Define Base and Mixins ---
 
 # The base class that all your models will inherit from
@@ -59,6 +61,9 @@ INVENTORY_CATEGORY_BY_KEY = {entry["key"]: entry for entry in INVENTORY_CATEGORY
 INVENTORY_CATEGORY_BY_UUID = {entry["uuid"]: entry for entry in INVENTORY_CATEGORY_DEFINITIONS}
 INVENTORY_CATEGORY_UUIDS = tuple(entry["uuid"] for entry in INVENTORY_CATEGORY_DEFINITIONS)
 
+# Column.info marker for columns that exist only in the local database: sync neither pushes nor pulls them.
+LOCAL_ONLY = {"local_only": True}
+
 class TimestampDirtyMixin:
     """
     Mixin to add created_at, updated_at, and is_dirty columns to a model.
@@ -84,6 +89,10 @@ else:
 
 SQLITE_URL = f"sqlite:///{DB_FILE_PATH}"
 
+# Documents and images are kept out of the database file, in a content-addressed store next to it.
+BLOB_STORE_DIR = os.path.join(os.path.dirname(DB_FILE_PATH), 'blobs')
+blob_store = BlobStore(BLOB_STORE_DIR)
+
 # --- 3. Define Models ---
 
 class Organization(Base, TimestampDirtyMixin):
@@ -125,7 +134,7 @@ class User(Base, TimestampDirtyMixin):
     business_name = Column(String)
     account_type = Column(String, default="standard")
     location = Column(String)
-    business_logo = Column(LargeBinary)
+    business_logo, business_logo_info = external_blob_column(blob_store, 'business_logo')
     business_email = Column(String)
     status = Column(String)
     organization_uuid = Column(String, ForeignKey("organizations.uuid"), nullable=True)
@@ -247,6 +256,11 @@ class Invoice(Base, TimestampDirtyMixin):
     issued_at = Column(DateTime)
     invoice_details = Column(JSON)
     invoice_items = Column(JSON) # Snapshot of items sold
+    # Balance of the live payments, kept current by invoice_balances on every flush that touches
+    # them. Derived locally, so never synced (see LOCAL_ONLY).
+    paid_amount = Column(Numeric(precision=16, scale=2), nullable=False, default=0, server_default="0", info=LOCAL_ONLY)
+    remainder = Column(Numeric(precision=16, scale=2), info=LOCAL_ONLY)
+    last_payment_at = Column(DateTime, info=LOCAL_ONLY)
 
     __table_args__ = (
         CheckConstraint(status.in_(["paid","pending","partial"]), name="check_invoice_status"),
@@ -280,7 +294,7 @@ class SubscriptionPayment(Base, TimestampDirtyMixin):
     amount = Column(Numeric(precision=16, scale=2))
     payment_method = Column(String)
     trx_no = Column(String, nullable=True)
-    trx_screenshot = Column(LargeBinary, nullable=True)
+    trx_screenshot, trx_screenshot_info = external_blob_column(blob_store, 'trx_screenshot', nullable=True)
     status = Column(String)
 
     __table_args__ = (
@@ -318,7 +332,7 @@ class Document(Base, TimestampDirtyMixin):
     project_uuid = Column(String, ForeignKey("projects.uuid"))
     doc_type = Column(String)
     file_name = Column(String)
-    file_blob = Column(LargeBinary)
+    file_blob, file_blob_info = external_blob_column(blob_store, 'file_blob')
 
     __table_args__ = (
         CheckConstraint(doc_type.in_(["Invoice","Project Breakdown"]), name="check_document_type"),
@@ -372,6 +386,81 @@ class SyncState(Base, TimestampDirtyMixin):
     )
 
 
+class SyncLaneCursor(Base, TimestampDirtyMixin):
+    """Local-only pull cursor per sync lane, so one lane can sync on its own without skipping another lane's changes."""
+    __tablename__ = 'sync_lane_cursors'
+
+    sync_lane_cursor_id = Column(Integer, primary_key=True)
+    user_uuid = Column(String, ForeignKey("user.uuid"), nullable=False)
+    device_id = Column(String, nullable=False)
+    lane = Column(String, nullable=False)
+    last_cursor = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint(lane.in_(["fast","normal","bulk"]), name="check_sync_lane_cursor_lane"),
+    )
+
+
+class SyncDirtyColumns(Base, TimestampDirtyMixin):
+    """
+    Local-only: the columns edited on a row since it was last pushed, so push can send a delta.
+    A dirty row without an entry here is pushed in full (new rows, rows that failed a delta push).
+    """
+    __tablename__ = 'sync_dirty_columns'
+
+    sync_dirty_columns_id = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)
+    row_uuid = Column(String, nullable=False)
+    columns = Column(String, nullable=False)  # Comma-separated local column names
+
+    __table_args__ = (
+        UniqueConstraint("table_name", "row_uuid", name="uq_sync_dirty_columns_row"),
+    )
+
+
+class SyncRun(Base, TimestampDirtyMixin):
+    """Local-only telemetry: one row per /sync run. Never pushed to Supabase."""
+    __tablename__ = 'sync_runs'
+
+    sync_run_id = Column(Integer, primary_key=True)
+    user_uuid = Column(String, ForeignKey("user.uuid"))
+    status = Column(String)
+    lanes = Column(String)  # Comma-separated sync lanes the run covered
+    started_at = Column(DateTime)
+    duration_ms = Column(Float)
+    error = Column(String, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(status.in_(["success","failed"]), name="check_sync_run_status"),
+    )
+
+    table_metrics = relationship("SyncTableMetric", back_populates="sync_run", cascade="all, delete-orphan")
+
+
+class SyncTableMetric(Base, TimestampDirtyMixin):
+    """Local-only telemetry: what one table cost during one phase of a sync run."""
+    __tablename__ = 'sync_table_metrics'
+
+    sync_table_metric_id = Column(Integer, primary_key=True)
+    sync_run_uuid = Column(String, ForeignKey("sync_runs.uuid"), nullable=False)
+    table_name = Column(String, nullable=False)
+    phase = Column(String, nullable=False)
+    rows = Column(Integer, default=0)
+    bytes = Column(Integer, default=0)
+    rpc_ms = Column(Float, default=0.0)
+    merge_ms = Column(Float, default=0.0)
+    blob_upload_ms = Column(Float, default=0.0)
+    blob_uploads = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(phase.in_(["push","pull"]), name="check_sync_table_metric_phase"),
+    )
+
+    sync_run = relationship("SyncRun", foreign_keys=[sync_run_uuid], back_populates="table_metrics")
+
+
 class InventoryCategory(Base, TimestampDirtyMixin):
     __tablename__ = 'inventory_categories'
 
@@ -435,3 +524,88 @@ class ProjectComponent(Base, TimestampDirtyMixin):
 
     project = relationship("Project", back_populates="project_components")
     item = relationship("InventoryItem", back_populates="project_components")
+
+
+
+class FinanceDailyRollup(Base):
+    """
+    Local-only, derived: the finance dashboard's figures for one day and one attribution
+    (organization, branch, issuing user, project owner). Revenue counts payments by the day they
+    were recorded; invoiced and outstanding count issued invoices by their issue day.
+    finance_rollups rebuilds the days a flush touches, so rows carry no sync bookkeeping.
+    """
+    __tablename__ = 'finance_daily_rollups'
+
+    finance_daily_rollup_id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    organization_uuid = Column(String, nullable=True)
+    branch_uuid = Column(String, nullable=True)
+    issuer_uuid = Column(String, nullable=True)  # Invoice.user_uuid
+    owner_uuid = Column(String, nullable=True)  # Project.user_uuid
+    revenue = Column(Numeric(precision=16, scale=2), nullable=False, default=0)
+    payment_count = Column(Integer, nullable=False, default=0)
+    invoiced = Column(Numeric(precision=16, scale=2), nullable=False, default=0)
+    outstanding = Column(Numeric(precision=16, scale=2), nullable=False, default=0)
+    invoice_count = Column(Integer, nullable=False, default=0)
+
+
+class InventoryValueRollup(Base):
+    """Local-only, derived: current stock value (buy price x quantity on hand) per organization and branch."""
+    __tablename__ = 'inventory_value_rollups'
+
+    inventory_value_rollup_id = Column(Integer, primary_key=True)
+    organization_uuid = Column(String, nullable=True)
+    branch_uuid = Column(String, nullable=True)
+    value = Column(Numeric(precision=16, scale=2), nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+
+# --- 4. Secondary Indexes ---
+# Keep in step with the matching Alembic revision; create_db_and_tables also adds any
+# that an existing database is missing.
+
+# Owner lookups end in deleted_at, so "... AND deleted_at IS NULL" is answered by the same index.
+Index("ix_user_organization_branch", User.organization_uuid, User.branch_uuid)
+Index("ix_user_branch", User.branch_uuid)
+Index("ix_branches_organization", Branch.organization_uuid)
+Index("ix_application_settings_user", ApplicationSettings.user_uuid)
+Index("ix_authentications_user", Authentication.user_uuid)
+Index("ix_customers_user_deleted", Customer.user_uuid, Customer.deleted_at)
+Index("ix_customers_org_branch_deleted", Customer.organization_uuid, Customer.branch_uuid, Customer.deleted_at)
+Index("ix_projects_user_deleted", Project.user_uuid, Project.deleted_at)
+Index("ix_projects_org_branch_deleted", Project.organization_uuid, Project.branch_uuid, Project.deleted_at)
+Index("ix_projects_customer", Project.customer_uuid)
+Index("ix_projects_system_config", Project.system_config_uuid)
+Index("ix_invoices_user_deleted", Invoice.user_uuid, Invoice.deleted_at)
+Index("ix_payments_invoice", Payment.invoice_uuid)
+Index("ix_appliances_project", Appliance.project_uuid)
+Index("ix_documents_project", Document.project_uuid)
+Index("ix_project_components_project", ProjectComponent.project_uuid)
+Index("ix_project_components_item", ProjectComponent.item_uuid)
+Index("ix_subscriptions_user", Subscription.user_uuid)
+Index("ix_subscription_payments_subscription", SubscriptionPayment.subscription_uuid)
+Index("ix_inventory_items_user_deleted", InventoryItem.user_uuid, InventoryItem.deleted_at)
+Index("ix_inventory_items_org_branch_deleted", InventoryItem.organization_uuid, InventoryItem.branch_uuid, InventoryItem.deleted_at)
+Index("ix_inventory_items_category", InventoryItem.category_uuid)
+Index("ix_stock_adjustments_item", StockAdjustment.item_uuid)
+Index("ix_stock_adjustments_org_branch", StockAdjustment.organization_uuid, StockAdjustment.branch_uuid)
+Index("ix_stock_adjustments_user", StockAdjustment.user_uuid)
+Index("ix_sync_log_user", SyncLog.user_uuid)
+Index("ix_sync_state_user_device", SyncState.user_uuid, SyncState.device_id)
+Index("ix_sync_lane_cursors_user_device", SyncLaneCursor.user_uuid, SyncLaneCursor.device_id)
+Index("ix_sync_table_metrics_run", SyncTableMetric.sync_run_uuid)
+# Finance rollups rebuild whole days: payments by recording day, invoices by issue day.
+Index("ix_payments_created_at", Payment.created_at)
+Index("ix_invoices_issued_at", Invoice.issued_at)
+Index("ix_finance_daily_rollups_day", FinanceDailyRollup.day)
+Index("ix_finance_daily_rollups_org_day", FinanceDailyRollup.organization_uuid, FinanceDailyRollup.day)
+Index("ix_inventory_value_rollups_org_branch", InventoryValueRollup.organization_uuid, InventoryValueRollup.branch_uuid)
+
+# Push reads only dirty rows. Partial indexes stay as small as the unsynced backlog,
+# and match the "is_dirty = 1" that `Model.is_dirty == True` renders to on SQLite.
+for _model in (
+    Organization, Branch, User, ApplicationSettings, Authentication, Customer, SystemConfiguration,
+    Project, Appliance, Invoice, Payment, SubscriptionPayment, Subscription, Document, SyncLog,
+    InventoryItem, StockAdjustment, ProjectComponent,
+):
+    Index(f"ix_{_model.__tablename__}_dirty", _model.is_dirty, sqlite_where=_model.is_dirty == True)
+del _model
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import FrozenSet, Optional, Tuple
+
+from flask import jsonify
+from sqlalchemy import DateTime, and_, or_
+
+# Opt-in paging for list endpoints. Without `limit` a list endpoint answers exactly as before
+# (a bare JSON array); with it the answer is {"items": [...], "next": <cursor or null>} and
+# `after=<next>` fetches the following page. Pages are keyset-based: the cursor carries the
+# sort key of the last row sent, so a page costs the same at row 10 and row 100000, and rows
+# inserted meanwhile neither shift nor repeat later pages.
+MAX_PAGE_SIZE = 500
+# Always sent, whatever `fields` asks for: rows must stay identifiable.
+ALWAYS_FIELDS = frozenset({"uuid"})
+
+
+@dataclass(frozen=True)
+class KeysetOrder:
+    """
+    Sort of a list endpoint: one or more columns, the last of which must be unique
+    (the primary key) so that ties never straddle a page boundary.
+    """
+    columns: Tuple[object, ...]
+    descending: bool = False
+
+    def order_by(self):
+        return [column.desc() if self.descending else column.asc() for column in self.columns]
+
+    def key_of(self, row) -> tuple:
+        return tuple(getattr(row, column.key) for column in self.columns)
+
+    def after(self, key: tuple):
+        """Rows strictly past `key` in this order: (a, b) > (x, y) spelled out so SQLite can use an index."""
+        clauses = []
+        for position, column in enumerate(self.columns):
+            equal = [c == v for c, v in zip(self.columns[:position], key[:position])]
+            beyond = column < key[position] if self.descending else column > key[position]
+            clauses.append(and_(*equal, beyond))
+        return or_(*clauses)
+
+    def encode(self, key: tuple) -> str:
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+        return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple:
+        """Inverse of encode; raises ValueError on anything it did not produce."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError("malformed cursor") from e
+        if not isinstance(values, list) or len(values) != len(self.columns):
+            raise ValueError("malformed cursor")
+        key = []
+        for column, value in zip(self.columns, values):
+            if value is None:
+                raise ValueError("malformed cursor")
+            if isinstance(column.type, DateTime):
+                try:
+                    value = datetime.fromisoformat(value)
+                except TypeError as e:
+                    raise ValueError("malformed cursor") from e
+            key.append(value)
+        return tuple(key)
+
+
+@dataclass(frozen=True)
+class PageRequest:
+    limit: Optional[int] = None
+    after: Optional[tuple] = None
+    fields: Optional[FrozenSet[str]] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None
+
+    def wants(self, key: str) -> bool:
+        """Whether `key` survives the projection; lets routes skip extra work for fields nobody asked for."""
+        return self.fields is None or key in self.fields
+
+    def project(self, payload: dict) -> dict:
+        if self.fields is None:
+            return payload
+        return {key: value for key, value in payload.items() if key in self.fields}
+
+
+def parse_page_request(args, order: KeysetOrder):
+    """
+    Reads `limit`, `after` and `fields` (comma-separated) from the query string.
+    Returns (page, error_response).
+    """
+    limit = args.get("limit")
+    after = args.get("after")
+    fields = args.get("fields")
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return None, (jsonify({"error": "limit must be an integer"}), 400)
+        limit = min(MAX_PAGE_SIZE, max(1, limit))
+    elif after:
+        return None, (jsonify({"error": "after requires limit"}), 400)
+
+    if after:
+        try:
+            after = order.decode(after)
+        except ValueError:
+            return None, (jsonify({"error": "Invalid cursor"}), 400)
+    else:
+        after = None
+
+    if fields is not None:
+        fields = frozenset(f.strip() for f in fields.split(",") if f.strip()) | ALWAYS_FIELDS
+
+    return PageRequest(limit=limit, after=after, fields=fields), None
+
+
+def fetch_page(query, page: PageRequest, order: KeysetOrder):
+    """
+    Orders `query` and, when paging, runs it for one page only.
+    Returns (rows, next_cursor); next_cursor is None on the last page and when not paging.
+    """
+    query = query.order_by(*order.order_by())
+    if not page.paginated:
+        return query.all(), None
+    if page.after is not None:
+        query = query.filter(order.after(page.after))
+    # One extra row tells whether another page follows.
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, order.encode(order.key_of(rows[-1]))
+
+
+def page_response(page: PageRequest, items, next_cursor: Optional[str]):
+    """The list response for `page`: `items` (already serialized dicts) projected onto its fields."""
+    items = [page.project(item) for item in items]
+    if not page.paginated:
+        return jsonify(items)
+    return jsonify({"items": items, "next": next_cursor})
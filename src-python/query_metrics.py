@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional
+
+from flask import g, has_request_context, request
+
+# Statements slower than this land in the slow-statement log (SSC_SLOW_QUERY_MS overrides).
+SLOW_QUERY_MS = float(os.environ.get("SSC_SLOW_QUERY_MS", "100"))
+# Slow statements kept; the oldest drop out first.
+SLOW_QUERY_LOG_SIZE = 100
+# Statement text is cut to this many characters in the slow log.
+STATEMENT_PREVIEW_CHARS = 500
+# Statements run outside a request (sync workers, maintenance, startup) are filed under this key.
+BACKGROUND = "(background)"
+
+# Quoted literals inlined into statement text ('...' strings, X'..' blobs); they may hold customer data.
+_STRING_LITERAL = re.compile(r"[xX]?'(?:[^']|'')*'")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def redact_statement(statement: str) -> str:
+    statement = _STRING_LITERAL.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    if len(statement) > STATEMENT_PREVIEW_CHARS:
+        statement = statement[:STATEMENT_PREVIEW_CHARS] + "..."
+    return statement
+
+
+def redact_parameters(parameters, executemany: bool):
+    """The shape of the parameters without their values: type names, and the row count of an executemany."""
+    def shape(params):
+        if isinstance(params, dict):
+            return {key: _type_name(value) for key, value in params.items()}
+        if isinstance(params, (list, tuple)):
+            return [_type_name(value) for value in params]
+        return _type_name(params)
+
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": shape(rows[0]) if rows else None}
+    return shape(parameters)
+
+
+def _type_name(value) -> Optional[str]:
+    return None if value is None else type(value).__name__
+
+
+def _current_endpoint() -> str:
+    rule = request.url_rule
+    return f"{request.method} {rule.rule if rule is not None else '(unmatched)'}"
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "statements", "db_ms", "max_statements", "max_db_ms", "slow")
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.db_ms = 0.0
+        self.max_statements = 0
+        self.max_db_ms = 0.0
+        self.slow = 0
+
+    def as_dict(self) -> dict:
+        summary = {
+            "requests": self.requests,
+            "statements": self.statements,
+            "db_ms": round(self.db_ms, 1),
+            "slow_statements": self.slow,
+        }
+        if self.requests:
+            summary["per_request"] = {
+                "statements_mean": round(self.statements / self.requests, 1),
+                "statements_max": self.max_statements,
+                "db_ms_mean": round(self.db_ms / self.requests, 2),
+                "db_ms_max": round(self.max_db_ms, 1),
+            }
+        return summary
+
+
+class QueryMetrics:
+    """
+    Statement counts and SQLite time per Flask endpoint, fed by db_setup's cursor-execute
+    listeners. A request's statements are tallied on flask.g and folded into its endpoint when
+    the request ends, so the per-request maximums show the screen that hammers the database.
+    Time is measured around the cursor call only; waiting for the write queue is reported by
+    write_queue.stats().
+    """
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, slow_log_size: int = SLOW_QUERY_LOG_SIZE):
+        self._lock = threading.Lock()
+        self._slow_ms = slow_ms
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._slow: Deque[dict] = deque(maxlen=slow_log_size)
+        self._since = datetime.now(timezone.utc)
+
+    def statement_finished(self, statement: str, parameters, executemany: bool, elapsed_ms: float) -> None:
+        slow = elapsed_ms >= self._slow_ms
+        in_request = has_request_context()
+        if in_request:
+            tally = g.setdefault("query_metrics", {"statements": 0, "db_ms": 0.0, "slow": 0})
+            tally["statements"] += 1
+            tally["db_ms"] += elapsed_ms
+            tally["slow"] += slow
+            if not slow:
+                return
+
+        endpoint = _current_endpoint() if in_request else BACKGROUND
+        entry = None
+        if slow:
+            entry = {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "endpoint": endpoint,
+                "ms": round(elapsed_ms, 1),
+                "statement": redact_statement(statement),
+                "parameters": redact_parameters(parameters, executemany),
+            }
+        with self._lock:
+            if entry is not None:
+                self._slow.append(entry)
+            if not in_request:
+                # No request to fold into: background statements are counted one by one.
+                stats = self._endpoints.setdefault(BACKGROUND, _EndpointStats())
+                stats.statements += 1
+                stats.db_ms += elapsed_ms
+                stats.slow += slow
+
+    def request_finished(self, exc=None) -> None:
+        """teardown_request hook: fold the request's tally into its endpoint."""
+        tally = g.pop("query_metrics", None)
+        endpoint = _current_endpoint()
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, _EndpointStats())
+            stats.requests += 1
+            if tally:
+                stats.statements += tally["statements"]
+                stats.db_ms += tally["db_ms"]
+                stats.slow += tally["slow"]
+                stats.max_statements = max(stats.max_statements, tally["statements"])
+                stats.max_db_ms = max(stats.max_db_ms, tally["db_ms"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = sorted(self._endpoints.items(), key=lambda item: item[1].db_ms, reverse=True)
+            return {
+                "since": self._since.isoformat(),
+                "slow_threshold_ms": self._slow_ms,
+                # Busiest first, by total database time.
+                "endpoints": [{"endpoint": endpoint, **stats.as_dict()} for endpoint, stats in endpoints],
+                # Newest first.
+                "slow_statements": list(reversed(self._slow)),
+            }
+
+
+query_metrics = QueryMetrics()
@@ -1,27 +1,12 @@
 from flask import Blueprint, request, jsonify
 from utils import get_db
-from models import Project, ProjectComponent, InventoryItem, User, Authentication
+from models import Project, ProjectComponent, InventoryItem
 from recommender.recommender import generate_recommendations
 from serializer import model_to_dict
+from authz import get_current_auth_user
 
 recommender_bp = Blueprint('recommender_bp', __name__, url_prefix='/recommendations')
 
-def _get_current_user(db):
-    auth_record = (
-        db.query(Authentication)
-        .filter(Authentication.is_logged_in)
-        .order_by(Authentication.last_active.desc())
-        .first()
-    )
-    if not auth_record:
-        return None, (jsonify({"error": "No authenticated user found. Please log in."}), 401)
-
-    current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-    if not current_user:
-        return None, (jsonify({"error": "Authenticated user not found in user table."}), 404)
-
-    return current_user, None
-
 def _get_recommender_scope(user):
     if user.organization_uuid:
         return {
@@ -45,7 +30,7 @@ def recommend_components(project_uuid):
         return jsonify({"error": "Missing BLE results in payload"}), 400
 
     with get_db() as db:
-        current_user, error_response = _get_current_user(db)
+        current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         scope = _get_recommender_scope(current_user)
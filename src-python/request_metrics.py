@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from flask import g, request
+
+from sync_telemetry import PERCENTILES, percentile
+
+# Histogram upper bounds, Prometheus style (each bucket counts everything at or below its bound).
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESPONSE_SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Recent latencies kept per route for the exact percentiles of the JSON summary.
+LATENCY_SAMPLES = 256
+# Routes listed in the JSON summary, slowest (by total time) first.
+SUMMARY_ROUTES = 20
+
+
+def _route() -> str:
+    rule = request.url_rule
+    return f"{request.method} {rule.rule if rule is not None else '(unmatched)'}"
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot: above every bound (+Inf only)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        buckets, running = [], 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            buckets.append((repr(float(bound)), running))
+        buckets.append(("+Inf", self.count))
+        return buckets
+
+
+class _RouteStats:
+    __slots__ = ("latency", "sizes", "statuses", "recent_ms", "max_ms")
+
+    def __init__(self):
+        self.latency = _Histogram(LATENCY_BUCKETS_SECONDS)
+        self.sizes = _Histogram(RESPONSE_SIZE_BUCKETS_BYTES)
+        self.statuses: Dict[int, int] = {}
+        self.recent_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.max_ms = 0.0
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status >= 400)
+
+
+class RequestMetrics:
+    """
+    Per-route latency and response-size histograms, status counts and in-flight requests,
+    recorded by Flask hooks (see main.create_app). When served by waitress, the task
+    dispatcher is watched too: busy handler threads and requests queued for a free one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _RouteStats] = {}
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._started = time.time()
+        self._dispatcher = None
+        self._threads: Optional[int] = None
+
+    def watch_waitress(self, dispatcher, threads: int) -> None:
+        """Report the saturation of waitress's handler threads (server.task_dispatcher)."""
+        self._dispatcher = dispatcher
+        self._threads = threads
+
+    # --- Flask hooks ---
+
+    def request_started(self) -> None:
+        g.request_metrics_started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+    def response_ready(self, response):
+        """after_request hook: the status and size are known here; latency runs up to this point."""
+        started = g.get("request_metrics_started")
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        # Streamed bodies (file downloads) are not buffered to be measured; their header counts.
+        size = response.content_length if response.is_streamed else response.calculate_content_length()
+        route = _route()
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = _RouteStats()
+            stats.latency.observe(elapsed)
+            if size is not None:
+                stats.sizes.observe(size)
+            stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+            stats.recent_ms.append(elapsed * 1000.0)
+            stats.max_ms = max(stats.max_ms, elapsed * 1000.0)
+        return response
+
+    def request_finished(self, exc=None) -> None:
+        if g.pop("request_metrics_started", None) is None:
+            return
+        with self._lock:
+            self._in_flight -= 1
+
+    # --- Reporting ---
+
+    def _threads_snapshot(self) -> Optional[dict]:
+        dispatcher = self._dispatcher
+        if dispatcher is None:
+            return None
+        # Plain reads of waitress's counters (idle threads leave active_count while they wait):
+        # a snapshot, not a synchronized view.
+        return {"configured": self._threads, "busy": dispatcher.active_count, "queued": len(dispatcher.queue)}
+
+    def summary(self) -> dict:
+        """JSON snapshot for /system/info: totals, thread saturation and the slowest routes."""
+        with self._lock:
+            routes = sorted(self._routes.items(), key=lambda item: item[1].latency.sum, reverse=True)
+            total = sum(stats.latency.count for _, stats in routes)
+            errors = sum(stats.errors for _, stats in routes)
+            top = []
+            for route, stats in routes[:SUMMARY_ROUTES]:
+                recent = sorted(stats.recent_ms)
+                latency = {f"p{p}": round(percentile(recent, p), 1) for p in PERCENTILES} if recent else {}
+                latency["max"] = round(stats.max_ms, 1)
+                top.append({
+                    "route": route,
+                    "requests": stats.latency.count,
+                    "errors": stats.errors,
+                    "latency_ms": latency,
+                    "mean_response_bytes": round(stats.sizes.sum / stats.sizes.count) if stats.sizes.count else None,
+                })
+            in_flight, max_in_flight = self._in_flight, self._max_in_flight
+        return {
+            "uptime_seconds": round(time.time() - self._started, 1),
+            "requests": total,
+            "errors": errors,
+            "in_flight": in_flight,
+            "max_in_flight": max_in_flight,
+            "threads": self._threads_snapshot(),
+            "routes": top,
+        }
+
+    def prometheus(self, sql_endpoints: List[dict] = ()) -> str:
+        """Prometheus text exposition (format 0.0.4) of the request metrics, plus the SQL totals per route."""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(**values) -> str:
+            escaped = (f'{key}="{_escape(str(value))}"' for key, value in values.items())
+            return "{" + ",".join(escaped) + "}"
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+            in_flight, max_in_flight = self._in_flight, self._max_in_flight
+
+            metric("ssc_http_request_duration_seconds", "histogram", "Request latency by route.")
+            for route, stats in routes:
+                for bound, count in stats.latency.cumulative():
+                    lines.append(f"ssc_http_request_duration_seconds_bucket{labels(route=route, le=bound)} {count}")
+                lines.append(f"ssc_http_request_duration_seconds_sum{labels(route=route)} {stats.latency.sum:.6f}")
+                lines.append(f"ssc_http_request_duration_seconds_count{labels(route=route)} {stats.latency.count}")
+
+            metric("ssc_http_response_size_bytes", "histogram", "Response body size by route.")
+            for route, stats in routes:
+                for bound, count in stats.sizes.cumulative():
+                    lines.append(f"ssc_http_response_size_bytes_bucket{labels(route=route, le=bound)} {count}")
+                lines.append(f"ssc_http_response_size_bytes_sum{labels(route=route)} {stats.sizes.sum:.0f}")
+                lines.append(f"ssc_http_response_size_bytes_count{labels(route=route)} {stats.sizes.count}")
+
+            metric("ssc_http_responses_total", "counter", "Responses by route and status code.")
+            for route, stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f"ssc_http_responses_total{labels(route=route, status=status)} {count}")
+
+        metric("ssc_http_requests_in_flight", "gauge", "Requests being handled right now.")
+        lines.append(f"ssc_http_requests_in_flight {in_flight}")
+        metric("ssc_http_requests_in_flight_max", "gauge", "Most requests handled at once since start.")
+        lines.append(f"ssc_http_requests_in_flight_max {max_in_flight}")
+
+        threads = self._threads_snapshot()
+        if threads is not None:
+            metric("ssc_waitress_threads", "gauge", "Configured waitress handler threads.")
+            lines.append(f"ssc_waitress_threads {threads['configured']}")
+            metric("ssc_waitress_threads_busy", "gauge", "Waitress handler threads serving a request.")
+            lines.append(f"ssc_waitress_threads_busy {threads['busy']}")
+            metric("ssc_waitress_queue_depth", "gauge", "Requests waiting for a free waitress thread.")
+            lines.append(f"ssc_waitress_queue_depth {threads['queued']}")
+
+        if sql_endpoints:
+            metric("ssc_sql_statements_total", "counter", "SQL statements run, by route.")
+            for entry in sql_endpoints:
+                lines.append(f"ssc_sql_statements_total{labels(route=entry['endpoint'])} {entry['statements']}")
+            metric("ssc_sql_seconds_total", "counter", "Time spent in SQLite, by route.")
+            for entry in sql_endpoints:
+                lines.append(f"ssc_sql_seconds_total{labels(route=entry['endpoint'])} {entry['db_ms'] / 1000.0:.6f}")
+
+        metric("ssc_uptime_seconds", "gauge", "Seconds since the sidecar started.")
+        lines.append(f"ssc_uptime_seconds {time.time() - self._started:.1f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+request_metrics = RequestMetrics()
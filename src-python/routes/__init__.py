@@ -22,6 +22,8 @@ from .organization import organization_bp
 from .branch import branch_bp
 from .inventory import inventory_bp
 from .export import export_bp
+from .blob import blob_bp
+from .search import search_bp
 from finances import finances_bp
 from reporting.api import reporting_bp
 from ble import ble_bp
@@ -46,6 +48,8 @@ all_blueprints = [
     branch_bp,
     inventory_bp,
     export_bp,
+    blob_bp,
+    search_bp,
     finances_bp,
     reporting_bp,
     ble_bp,
@@ -6,9 +6,10 @@ import psutil
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from utils import get_db, get_by_id_or_uuid
-from models import ApplicationSettings, Authentication, User
+from models import ApplicationSettings
 from schemas import ApplicationSettingsCreate, ApplicationSettingsUpdate
 from serializer import model_to_dict
+from authz import get_current_auth_user
 
 application_settings_bp = Blueprint('application_settings_bp', __name__, url_prefix='/application_settings')
 
@@ -132,18 +133,9 @@ def update_application_settings(item_id):
 @application_settings_bp.route('/', methods=['GET'])
 def get_all_application_settings():
     with get_db() as db:
-        auth_record = (
-        db.query(Authentication)
-        .filter(Authentication.is_logged_in == True)
-        .order_by(Authentication.last_active.desc())
-        .first()
-        )
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found in user table."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         items = db.query(ApplicationSettings).filter(ApplicationSettings.user_uuid == current_user.uuid).all()
         return jsonify([model_to_dict(i) for i in items])
@@ -9,7 +9,8 @@ from utils import (
     require_internet,
     get_server_time_or_none,
     is_jwt_expired_offline,
-    check_session_validity
+    check_session_validity,
+    invalidate_session_validity
 )
 from models import Authentication, User, Subscription
 from schemas import AuthenticationUpdate
@@ -75,6 +76,8 @@ def login_user():
 
             # [NEW] If online, verify cloud session validity to enforce single-session policy
             if get_server_time_or_none():
+                 # A login must see the current cloud state, not a cached answer
+                 invalidate_session_validity(user.uuid)
                  if not check_session_validity(user.uuid, machine_id):
                      # FIX A: Added synchronize_session=False here to prevent local cache poisoning
                      db.query(Authentication).filter_by(user_uuid=user.uuid).update(
@@ -112,6 +115,7 @@ def login_user():
             db.add(new_auth_entry)
             db.commit()
             db.refresh(new_auth_entry)
+            invalidate_session_validity(user.uuid)
 
             # Build and return response
             user_data = model_to_dict(user)
@@ -185,6 +189,7 @@ def handle_online_login(db, email, password, local_user):
             db.add(new_auth_entry)
             db.commit()
             db.refresh(new_auth_entry)
+            invalidate_session_validity(local_user.uuid)
 
             # Build and return response
             user_data = model_to_dict(local_user)
@@ -325,6 +330,7 @@ def handle_online_login(db, email, password, local_user):
         db.commit()
         db.refresh(user_instance)
         db.refresh(new_auth_entry)
+        invalidate_session_validity(user_uuid)
 
         user_data = model_to_dict(user_instance)
         auth_data = model_to_dict(new_auth_entry)
@@ -345,6 +351,7 @@ def log_out_other_sessions(db):
             synchronize_session=False # High performance, bypasses loading objects into memory
         )
     db.commit()
+    invalidate_session_validity()
 
     if updated == 0:
         return jsonify({"message": "No other active sessions"}), 200
@@ -361,6 +368,8 @@ def logout_user():
         return jsonify({"error": "Bad request"}), 400
 
     with get_db() as db:
+        auth = db.query(Authentication.user_uuid).filter(Authentication.auth_id == auth_id).first()
+
         # 2. Perform an efficient bulk update on all logged-in rows for this user
         updated_count = db.query(Authentication).filter(
             Authentication.auth_id == auth_id,
@@ -376,6 +385,8 @@ def logout_user():
 
         # 3. Commit the changes to the database
         db.commit()
+        if auth:
+            invalidate_session_validity(auth.user_uuid)
 
         # 4. Handle response based on whether active sessions actually existed
         if updated_count == 0:
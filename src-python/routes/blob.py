@@ -0,0 +1,84 @@
+import io
+
+from flask import Blueprint, jsonify, send_file
+from sqlalchemy import inspect
+
+from blob_store import BlobMissing, ExternalBlob
+from models import Base, Document, blob_store
+from utils import get_read_db, get_by_id_or_uuid
+
+blob_bp = Blueprint('blob_bp', __name__, url_prefix='/blobs')
+
+# Leading bytes of the formats the app stores; anything else is served as octet-stream.
+_MAGIC_TYPES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+)
+
+
+def _blob_models():
+    """table name -> (model, names of its blob columns)."""
+    models_by_table = {}
+    for mapper in Base.registry.mappers:
+        names = {column.key for column in mapper.columns if isinstance(column.type, ExternalBlob)}
+        if names:
+            models_by_table[mapper.local_table.name] = (mapper.class_, names)
+    return models_by_table
+
+
+BLOB_MODELS = _blob_models()
+
+
+def _sniff_mimetype(head: bytes) -> str:
+    for magic, mimetype in _MAGIC_TYPES:
+        if head.startswith(magic):
+            return mimetype
+    return "application/octet-stream"
+
+
+@blob_bp.route('/<string:table>/<string:item_id>/<string:column>', methods=['GET'])
+def get_blob(table, item_id, column):
+    """
+    Raw bytes of a blob column (e.g. /blobs/documents/<uuid>/file_blob), for lazy-loaded
+    previews. Sends Content-Length and the content hash as ETag, answers If-None-Match
+    with 304 and serves single byte ranges (206) for Range requests.
+    """
+    model, columns = BLOB_MODELS.get(table, (None, ()))
+    if column not in columns:
+        return jsonify({"error": "Not found"}), 404
+
+    (pk,) = inspect(model).primary_key
+    with get_read_db() as db:
+        item = get_by_id_or_uuid(db, model, pk, model.uuid, item_id)
+        info = getattr(item, f"{column}_info", None) if item else None
+        if not info:
+            return jsonify({"error": "Not found"}), 404
+        download_name = item.file_name if isinstance(item, Document) else None
+
+    digest = info["sha256"]
+    path = blob_store.path_for(digest)
+    try:
+        with blob_store.open(digest) as mapped:
+            mimetype = _sniff_mimetype(mapped[:16])
+    except BlobMissing:
+        # Rows the startup migration hasn't externalized yet are served from the database.
+        with get_read_db() as db:
+            data = getattr(get_by_id_or_uuid(db, model, pk, model.uuid, item_id), column, None)
+        if not isinstance(data, (bytes, bytearray)):
+            return jsonify({"error": "Not found"}), 404
+        path, mimetype = io.BytesIO(data), _sniff_mimetype(bytes(data[:16]))
+
+    # The URL names a row, not its content, so clients must revalidate (cheap with the ETag).
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        download_name=download_name,
+        etag=digest,
+        conditional=True,
+        max_age=0,
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from utils import get_db, get_by_id_or_uuid
-from models import Branch, Organization, User, Customer, Project, InventoryItem, Authentication
+from models import Branch, Organization, User, Customer, Project, InventoryItem
 from schemas import BranchCreate, BranchUpdate
 from serializer import model_to_dict
+from authz import get_current_auth_user
 from datetime import datetime
 
 branch_bp = Blueprint('branch_bp', __name__, url_prefix='/branches')
@@ -18,19 +19,9 @@ def create_branch():
         return jsonify({"errors": e.errors()}), 400
 
     with get_db() as db:
-        # Resolve current user from active session
-        auth_record = (
-            db.query(Authentication)
-            .filter(Authentication.is_logged_in == True)
-            .order_by(Authentication.last_active.desc())
-            .first()
-        )
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         if current_user.role != 'admin':
             return jsonify({"error": "Admin privileges required."}), 403
@@ -98,18 +89,9 @@ def update_branch(item_id):
 @branch_bp.route('/', methods=['GET'])
 def get_all_branch():
     with get_db() as db:
-        auth_record = (
-                db.query(Authentication)
-                .filter(Authentication.is_logged_in == True)
-                .order_by(Authentication.last_active.desc())
-                .first()
-            )
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         if current_user.role != 'admin':
             return jsonify({"error": "Admin privileges required."}), 403
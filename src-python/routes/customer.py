@@ -1,15 +1,20 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
-from utils import get_db, get_by_id_or_uuid
+from utils import get_db, get_by_id_or_uuid, get_read_db
 from models import Customer, Project
 from schemas import CustomerCreate, CustomerUpdate
 from serializer import model_to_dict
 from sqlalchemy import func
 from datetime import datetime
 from authz import get_current_user
+from pagination import KeysetOrder, fetch_page, page_response, parse_page_request
 
 customer_bp = Blueprint('customer_bp', __name__, url_prefix='/customers')
 
+CUSTOMER_LIST_ORDER = KeysetOrder((Customer.customer_id,))
+# Customer uuids per IN (...) list, well under SQLite's bound-parameter limit.
+_AGGREGATE_CHUNK = 500
+
 
 def _can_view_customer(ctx, customer: Customer) -> tuple[bool, str]:
     if not ctx.org_uuid:
@@ -40,14 +45,27 @@ def _can_mutate_customer(ctx, customer: Customer) -> bool:
         return customer.branch_uuid == ctx.branch_uuid
     return customer.user_uuid == ctx.user_uuid
 
-def get_customer_with_stats(db, customer):
-    customer_dict = model_to_dict(customer)
-    # Fetch project counts grouped by status for this specific customer
-    stats = db.query(Project.status, func.count(Project.project_id))\
-              .filter(Project.customer_uuid == customer.uuid)\
-              .filter(Project.deleted_at.is_(None))\
-              .group_by(Project.status).all()
-    customer_dict['project_stats'] = {status: count for status, count in stats}
+def _project_stats(db, customer_uuids) -> dict:
+    """customer uuid -> {project status: count}, in one grouped query per chunk (customers without projects are absent)."""
+    customer_uuids = list(customer_uuids)
+    stats = {}
+    for start in range(0, len(customer_uuids), _AGGREGATE_CHUNK):
+        rows = db.query(Project.customer_uuid, Project.status, func.count(Project.project_id))\
+                 .filter(Project.customer_uuid.in_(customer_uuids[start:start + _AGGREGATE_CHUNK]))\
+                 .filter(Project.deleted_at.is_(None))\
+                 .group_by(Project.customer_uuid, Project.status).all()
+        for customer_uuid, status, count in rows:
+            stats.setdefault(customer_uuid, {})[status] = count
+    return stats
+
+def get_customer_with_stats(db, customer, fields=None, project_stats=None):
+    """`project_stats` is a `_project_stats` result covering `customer`, for callers serializing many at once."""
+    customer_dict = model_to_dict(customer, fields=fields)
+    if fields is not None and 'project_stats' not in fields:
+        return customer_dict
+    if project_stats is None:
+        project_stats = _project_stats(db, [customer.uuid])
+    customer_dict['project_stats'] = project_stats.get(customer.uuid, {})
     return customer_dict
 
 @customer_bp.route('/', methods=['POST'])
@@ -112,22 +130,29 @@ def update_customer(item_id):
 
 @customer_bp.route('/', methods=['GET'])
 def get_all_customer():
-    with get_db() as db:
+    """Oldest first. Opt-in paging and projection via `limit`, `after` and `fields` (see pagination.py)."""
+    page, error_response = parse_page_request(request.args, CUSTOMER_LIST_ORDER)
+    if error_response:
+        return error_response
+
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
 
-        items = db.query(Customer).filter(Customer.deleted_at.is_(None), Customer.user_uuid == ctx.user_uuid).all()
+        query = db.query(Customer).filter(Customer.deleted_at.is_(None), Customer.user_uuid == ctx.user_uuid)
+        items, next_cursor = fetch_page(query, page, CUSTOMER_LIST_ORDER)
+        project_stats = _project_stats(db, [i.uuid for i in items]) if page.wants('project_stats') else {}
         results = []
         for i in items:
-            payload = get_customer_with_stats(db, i)
+            payload = get_customer_with_stats(db, i, fields=page.fields, project_stats=project_stats)
             payload["access"] = {"mode": "full"}
             results.append(payload)
-        return jsonify(results)
+        return page_response(page, results, next_cursor)
 
 @customer_bp.route('/<string:item_id>', methods=['GET'])
 def get_customer(item_id):
-    with get_db() as db:
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
-from utils import get_db
-from models import InventoryCategory, InventoryItem, StockAdjustment, ProjectComponent, User, Authentication, Branch
+from sqlalchemy.orm import contains_eager
+from utils import get_db, get_read_db
+from models import InventoryCategory, InventoryItem, StockAdjustment, ProjectComponent, Branch
 from inventory_categories import (
     canonical_inventory_categories,
     canonical_inventory_category_uuids,
@@ -12,25 +13,14 @@ from schemas import (
     StockAdjustmentCreate, ProjectComponentCreate
 )
 from serializer import model_to_dict
+from authz import get_current_auth_user
+from pagination import KeysetOrder, fetch_page, page_response, parse_page_request
 import logging
 
 inventory_bp = Blueprint('inventory_bp', __name__, url_prefix='/inventory')
 
-def _get_current_user(db):
-    auth_record = (
-        db.query(Authentication)
-        .filter(Authentication.is_logged_in == True)
-        .order_by(Authentication.last_active.desc())
-        .first()
-    )
-    if not auth_record:
-        return None, (jsonify({"error": "No authenticated user found. Please log in."}), 401)
-
-    current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-    if not current_user:
-        return None, (jsonify({"error": "Authenticated user not found in user table."}), 404)
-
-    return current_user, None
+ITEM_LIST_ORDER = KeysetOrder((InventoryItem.inventory_item_id,))
+ADJUSTMENT_LIST_ORDER = KeysetOrder((StockAdjustment.created_at, StockAdjustment.stock_adjustment_id), descending=True)
 
 def _get_inventory_scope(user):
     if user.organization_uuid:
@@ -79,7 +69,7 @@ def update_categories():
 @inventory_bp.route('/categories', methods=['GET'])
 def get_categories():
     with get_db() as db:
-        _current_user, error_response = _get_current_user(db)
+        _current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         ensure_inventory_categories(db)
@@ -99,7 +89,7 @@ def get_categories():
 @inventory_bp.route('/categories/<string:uuid>', methods=['GET'])
 def get_category(uuid):
     with get_db() as db:
-        _current_user, error_response = _get_current_user(db)
+        _current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         ensure_inventory_categories(db)
@@ -136,7 +126,7 @@ def validate_specs(category, specs):
 def create_item():
     with get_db() as db:
         try:
-            current_user, error_response = _get_current_user(db)
+            current_user, error_response = get_current_auth_user(db)
             if error_response:
                 return error_response
             scope = _get_inventory_scope(current_user)
@@ -189,20 +179,25 @@ def create_item():
 
 @inventory_bp.route('/items', methods=['GET'])
 def get_items():
-    with get_db() as db:
-        current_user, error_response = _get_current_user(db)
+    """Oldest first. Opt-in paging and projection via `limit`, `after` and `fields` (see pagination.py)."""
+    page, error_response = parse_page_request(request.args, ITEM_LIST_ORDER)
+    if error_response:
+        return error_response
+
+    with get_read_db() as db:
+        current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         scope = _get_inventory_scope(current_user)
 
-        items = _apply_item_scope(db.query(InventoryItem), scope).all()
+        items, next_cursor = fetch_page(_apply_item_scope(db.query(InventoryItem), scope), page, ITEM_LIST_ORDER)
 
-        return jsonify([model_to_dict(i) for i in items])
+        return page_response(page, [model_to_dict(i, fields=page.fields) for i in items], next_cursor)
 
 @inventory_bp.route('/items/<string:uuid>', methods=['GET'])
 def get_item(uuid):
-    with get_db() as db:
-        current_user, error_response = _get_current_user(db)
+    with get_read_db() as db:
+        current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         scope = _get_inventory_scope(current_user)
@@ -216,7 +211,7 @@ def get_item(uuid):
 def update_item(uuid):
     with get_db() as db:
         try:
-            current_user, error_response = _get_current_user(db)
+            current_user, error_response = get_current_auth_user(db)
             if error_response:
                 return error_response
             scope = _get_inventory_scope(current_user)
@@ -262,7 +257,7 @@ def update_item(uuid):
 def delete_item(uuid):
     with get_db() as db:
         try:
-            current_user, error_response = _get_current_user(db)
+            current_user, error_response = get_current_auth_user(db)
             if error_response:
                 return error_response
             scope = _get_inventory_scope(current_user)
@@ -286,7 +281,7 @@ def create_adjustment():
     with get_db() as db:
         try:
             # 1. Authenticate and verify user context first
-            current_user, error_response = _get_current_user(db)
+            current_user, error_response = get_current_auth_user(db)
             if error_response:
                 return error_response
 
@@ -349,8 +344,8 @@ def create_adjustment():
 
 @inventory_bp.route('/items/<string:item_uuid>/adjustments', methods=['GET'])
 def get_item_adjustments(item_uuid):
-    with get_db() as db:
-        current_user, error_response = _get_current_user(db)
+    with get_read_db() as db:
+        current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         scope = _get_inventory_scope(current_user)
@@ -365,15 +360,25 @@ def get_item_adjustments(item_uuid):
 @inventory_bp.route('/adjustments/history', methods=['GET'])
 def get_adjustments_history():
     """
-    Get global stock adjustment history.
+    Get global stock adjustment history, newest first.
+    Opt-in paging and projection via `limit`, `after` and `fields` (see pagination.py).
     """
-    with get_db() as db:
-        current_user, error_response = _get_current_user(db)
+    page, error_response = parse_page_request(request.args, ADJUSTMENT_LIST_ORDER)
+    if error_response:
+        return error_response
+
+    with get_read_db() as db:
+        current_user, error_response = get_current_auth_user(db)
         if error_response:
             return error_response
         scope = _get_inventory_scope(current_user)
 
-        query = db.query(StockAdjustment).join(InventoryItem, StockAdjustment.item_uuid == InventoryItem.uuid)
+        query = (
+            db.query(StockAdjustment)
+            .join(InventoryItem, StockAdjustment.item_uuid == InventoryItem.uuid)
+            # The joined item is the one serialized below; don't lazy-load it again per row.
+            .options(contains_eager(StockAdjustment.item))
+        )
         query = query.filter(StockAdjustment.deleted_at == None, InventoryItem.deleted_at == None)
 
         if scope["org_uuid"]:
@@ -383,17 +388,17 @@ def get_adjustments_history():
         else:
             query = query.filter(StockAdjustment.user_uuid == scope["user_uuid"])
 
-        adjustments = query.order_by(StockAdjustment.created_at.desc()).all()
+        adjustments, next_cursor = fetch_page(query, page, ADJUSTMENT_LIST_ORDER)
 
         results = []
         for adj in adjustments:
-            d = model_to_dict(adj)
+            d = model_to_dict(adj, fields=page.fields)
             if adj.item:
                 d['item_name'] = adj.item.name
                 d['item_sku'] = adj.item.sku
             results.append(d)
 
-        return jsonify(results)
+        return page_response(page, results, next_cursor)
 
 
 # --- Project Components ---
@@ -428,7 +433,7 @@ def add_project_component():
 
 @inventory_bp.route('/projects/<string:project_uuid>/components', methods=['GET'])
 def get_project_components(project_uuid):
-    with get_db() as db:
+    with get_read_db() as db:
         # We need to eager load the item and category to make the slots work
         components = db.query(ProjectComponent).filter(ProjectComponent.project_uuid == project_uuid).all()
         # include_relationships=True will include the 'item' relationship
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from sqlalchemy import and_, func
+from sqlalchemy.orm import selectinload
 from datetime import datetime
 from typing import Optional
-from utils import get_db
+from utils import get_db, get_read_db
 from models import Invoice, Project, Payment, User, Customer
 from finances.finances import reverse_stock_deduction
 from schemas import InvoiceCreate, InvoiceUpdate
@@ -14,10 +15,13 @@ from authz import (
     get_current_user,
     invoice_access_flags,
 )
+from pagination import KeysetOrder, fetch_page, page_response, parse_page_request
 import logging
 
 invoice_bp = Blueprint('invoice_bp', __name__, url_prefix='/invoices')
 
+INVOICE_LIST_ORDER = KeysetOrder((Invoice.created_at, Invoice.invoice_id), descending=True)
+
 def _get_invoice_scope(user: User):
     if user.organization_uuid:
         if user.role == 'admin':
@@ -136,7 +140,12 @@ def update_invoice(uuid):
 
 @invoice_bp.route('/', methods=['GET'])
 def get_all_invoices():
-    with get_db() as db:
+    """Newest first. Opt-in paging and projection via `limit`, `after` and `fields` (see pagination.py)."""
+    page, error_response = parse_page_request(request.args, INVOICE_LIST_ORDER)
+    if error_response:
+        return error_response
+
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
@@ -149,6 +158,11 @@ def get_all_invoices():
         # Use outerjoin to include invoices without projects
         query = (
                 db.query(Invoice)
+                # Issuer, project and its customer are read for every row below.
+                .options(
+                    selectinload(Invoice.user),
+                    selectinload(Invoice.project).selectinload(Project.customer),
+                )
                 .outerjoin(
                     Project,
                     and_(
@@ -170,7 +184,7 @@ def get_all_invoices():
         if status:
             query = query.filter(Invoice.status == status)
 
-        items = query.order_by(Invoice.created_at.desc()).all()
+        items, next_cursor = fetch_page(query, page, INVOICE_LIST_ORDER)
 
         independent_customer_uuids = {
             (i.invoice_details or {}).get("customer_uuid")
@@ -188,7 +202,7 @@ def get_all_invoices():
 
         results = []
         for i in items:
-            d = model_to_dict(i)
+            d = model_to_dict(i, fields=page.fields)
             d["issued_by_username"] = i.user.username if i.user else None
             d["access"] = invoice_access_flags(ctx, i)
             if i.project and i.project.customer:
@@ -199,15 +213,9 @@ def get_all_invoices():
                 if cust:
                     d["customer_name"] = cust.full_name
 
-            # Add Payment Stats
-            paid = (
-                db.query(func.sum(Payment.amount))
-                .filter(Payment.invoice_uuid == i.uuid, Payment.deleted_at.is_(None))
-                .scalar()
-                or 0.0
-            )
-            d['paid_amount'] = float(paid)
-            d['remainder'] = float((float(i.amount if i.amount else 0.0)) - float(paid))
+            # Payment stats, materialized on the invoice (see invoice_balances)
+            d['paid_amount'] = float(i.paid_amount or 0.0)
+            d['remainder'] = float(i.remainder if i.remainder is not None else (i.amount or 0.0))
 
             # Extract Due Date from JSON
             if i.invoice_details and 'due_date' in i.invoice_details:
@@ -215,11 +223,11 @@ def get_all_invoices():
 
             results.append(d)
 
-        return jsonify(results)
+        return page_response(page, results, next_cursor)
 
 @invoice_bp.route('/<string:uuid>', methods=['GET'])
 def get_invoice(uuid):
-    with get_db() as db:
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
@@ -241,7 +249,7 @@ def get_invoice(uuid):
 
 @invoice_bp.route('/project/<string:project_uuid>', methods=['GET'])
 def get_invoice_by_project(project_uuid):
-    with get_db() as db:
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from utils import get_db, get_by_id_or_uuid
-from models import Authentication, Organization, User
+from models import Organization
 from schemas import OrganizationCreate, OrganizationUpdate
 from serializer import model_to_dict
+from authz import get_current_auth_user
 
 organization_bp = Blueprint('organization_bp', __name__, url_prefix='/organizations')
 
@@ -49,19 +50,9 @@ def update_organization(item_id):
 @organization_bp.route('/', methods=['GET'])
 def get_all_organization():
     with get_db() as db:
-        auth_record = (
-        db.query(Authentication)
-        .filter(Authentication.is_logged_in == True)
-        .order_by(Authentication.last_active.desc())
-        .first()
-        )
-
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found in user table."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         if not current_user.organization_uuid:
             return jsonify({"error": "Not allowed."}), 403
@@ -3,14 +3,17 @@ from pydantic import ValidationError
 from sqlalchemy.orm import joinedload
 from sqlalchemy import or_
 from datetime import datetime
-from utils import get_db, get_by_id_or_uuid
-from models import Project, Customer, User, Authentication, Invoice
+from utils import get_db, get_by_id_or_uuid, get_read_db
+from models import Project, Customer, Invoice
 from schemas import ProjectCreate, ProjectUpdate, ProjectWithCustomerCreate, ProjectDetailsUpdate, ProjectStatusUpdate
 from serializer import model_to_dict
-from authz import get_current_user
+from authz import get_current_user, get_current_auth_user
+from pagination import KeysetOrder, fetch_page, page_response, parse_page_request
 
 project_bp = Blueprint('project_bp', __name__, url_prefix='/projects')
 
+PROJECT_LIST_ORDER = KeysetOrder((Project.created_at, Project.project_id), descending=True)
+
 
 def _get_project_invoice(db, project_uuid: str) -> Invoice | None:
     # Invoice.project_uuid is unique, so at most one.
@@ -56,16 +59,30 @@ def _can_mutate_project(ctx, project: Project) -> bool:
         return project.branch_uuid == ctx.branch_uuid
     return project.user_uuid == ctx.user_uuid
 
+def _apply_project_visibility(q, ctx):
+    """List visibility; branch peer projects are included only once their invoice is issued."""
+    q = q.outerjoin(Invoice, Invoice.project_uuid == Project.uuid)
+
+    if ctx.org_uuid:
+        q = q.filter(Project.organization_uuid == ctx.org_uuid)
+
+        if ctx.is_admin:
+            # Same-branch: full; other branches: only issued-invoice projects.
+            return q.filter(
+                or_(Project.branch_uuid == ctx.branch_uuid, Invoice.issued_at.isnot(None))
+            )
+        # Employee: branch-only, include others only if invoice is issued.
+        return q.filter(Project.branch_uuid == ctx.branch_uuid).filter(
+            or_(Project.user_uuid == ctx.user_uuid, Invoice.issued_at.isnot(None))
+        )
+    return q.filter(Project.user_uuid == ctx.user_uuid)
+
 @project_bp.route('/create_with_customer', methods=['POST'])
 def create_project_with_customer():
     with get_db() as db:
-        auth_record = db.query(Authentication).filter(Authentication.is_logged_in == True).order_by(Authentication.last_active.desc()).first()
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found in user table."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         try:
             data = ProjectWithCustomerCreate(**request.json)
@@ -208,38 +225,26 @@ def update_project(item_id):
 
 @project_bp.route('/', methods=['GET'])
 def get_all_project():
-    with get_db() as db:
+    """Newest first. Opt-in paging and projection via `limit`, `after` and `fields` (see pagination.py)."""
+    page, error_response = parse_page_request(request.args, PROJECT_LIST_ORDER)
+    if error_response:
+        return error_response
+
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
 
-        # Build query to include branch peer projects only when invoice is issued.
-        q = (
+        q = _apply_project_visibility(
             db.query(Project)
-            .options(joinedload(Project.customer), joinedload(Project.user), joinedload(Project.invoices))
-            .outerjoin(Invoice, Invoice.project_uuid == Project.uuid)
+            .options(joinedload(Project.customer), joinedload(Project.user), joinedload(Project.invoices)),
+            ctx,
         )
 
-        if ctx.org_uuid:
-            q = q.filter(Project.organization_uuid == ctx.org_uuid)
-
-            if ctx.is_admin:
-                # Same-branch: full; other branches: only issued-invoice projects.
-                q = q.filter(
-                    or_(Project.branch_uuid == ctx.branch_uuid, Invoice.issued_at.isnot(None))
-                )
-            else:
-                # Employee: branch-only, include others only if invoice is issued.
-                q = q.filter(Project.branch_uuid == ctx.branch_uuid).filter(
-                    or_(Project.user_uuid == ctx.user_uuid, Invoice.issued_at.isnot(None))
-                )
-        else:
-            q = q.filter(Project.user_uuid == ctx.user_uuid)
-
-        items = q.order_by(Project.created_at.desc()).all()
+        items, next_cursor = fetch_page(q, page, PROJECT_LIST_ORDER)
         results = []
         for p in items:
-            project_dict = model_to_dict(p)
+            project_dict = model_to_dict(p, fields=page.fields)
             if p.customer:
                 project_dict['customer'] = model_to_dict(p.customer)
             else:
@@ -262,11 +267,11 @@ def get_all_project():
             project_dict["access"] = {"mode": mode}
             project_dict["owner_username"] = p.user.username if getattr(p, "user", None) else None
             results.append(project_dict)
-        return jsonify(results)
+        return page_response(page, results, next_cursor)
 
 @project_bp.route('/uuid/<string:uuid>', methods=['GET'])
 def get_project_by_uuid(uuid):
-    with get_db() as db:
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
@@ -289,7 +294,7 @@ def get_project_by_uuid(uuid):
 
 @project_bp.route('/<string:item_id>', methods=['GET'])
 def get_project(item_id):
-    with get_db() as db:
+    with get_read_db() as db:
         ctx, error_response = get_current_user(db)
         if error_response:
             return error_response
@@ -517,13 +522,9 @@ def patch_project_status(project_id_or_uuid):
 @project_bp.route('/quick-calc-id', methods=['POST'])
 def get_or_create_quick_calc_project_id():
     with get_db() as db:
-        auth_record = db.query(Authentication).filter(Authentication.is_logged_in == True).order_by(Authentication.last_active.desc()).first()
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found in user table."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         # Define a unique identifier for the quick calc customer and project
         quick_calc_customer_name = "QuickCalcCustomer"
@@ -575,13 +576,9 @@ def get_or_create_quick_calc_project_id():
 @project_bp.route('/quick-calc-init', methods=['POST'])
 def get_or_create_quick_calc_project():
     with get_db() as db:
-        auth_record = db.query(Authentication).filter(Authentication.is_logged_in == True).order_by(Authentication.last_active.desc()).first()
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found in user table."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         # Define a unique identifier for the quick calc customer and project
         quick_calc_customer_name = "QuickCalcCustomer"
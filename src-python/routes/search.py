@@ -0,0 +1,94 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import and_
+from sqlalchemy.orm import joinedload
+
+from authz import get_current_user, apply_invoice_visibility_filter
+from models import Customer, InventoryItem, Invoice, Project, User
+from search_index import SEARCH_SOURCES, SOURCES_BY_KIND, search_scoped
+from utils import get_read_db
+from .inventory import _apply_item_scope
+from .invoice import _apply_invoice_scope, _get_invoice_scope
+from .project import _apply_project_visibility
+
+search_bp = Blueprint('search_bp', __name__, url_prefix='/search')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+# Each kind: the scope its list endpoint applies, and how a hit is shown.
+
+def _scoped_customers(db, ctx):
+    return db.query(Customer).filter(Customer.deleted_at.is_(None), Customer.user_uuid == ctx.user_uuid)
+
+def _scoped_projects(db, ctx):
+    return _apply_project_visibility(
+        db.query(Project).options(joinedload(Project.customer)).filter(Project.deleted_at.is_(None)),
+        ctx,
+    )
+
+def _scoped_invoices(db, ctx):
+    query = (
+        db.query(Invoice)
+        .outerjoin(Project, and_(Invoice.project_uuid == Project.uuid, Project.deleted_at.is_(None)))
+        .outerjoin(User, Invoice.user_uuid == User.uuid)
+        .filter(Invoice.deleted_at.is_(None))
+    )
+    return apply_invoice_visibility_filter(_apply_invoice_scope(query, _get_invoice_scope(ctx.user)), ctx)
+
+def _scoped_inventory(db, ctx):
+    return _apply_item_scope(db.query(InventoryItem), ctx.scope)
+
+SCOPED_QUERIES = {
+    "customers": _scoped_customers,
+    "projects": _scoped_projects,
+    "invoices": _scoped_invoices,
+    "inventory": _scoped_inventory,
+}
+
+def _hit(kind, record):
+    if kind == "customers":
+        title, subtitle = record.full_name, record.phone_number or record.email
+    elif kind == "projects":
+        title, subtitle = record.project_location, record.customer.full_name if record.customer else None
+    elif kind == "invoices":
+        title, subtitle = f"#{record.invoice_id}", record.status
+    else:
+        title, subtitle = record.name, " ".join(filter(None, (record.sku, record.brand, record.model))) or None
+    return {"type": kind, "uuid": record.uuid, "title": title, "subtitle": subtitle}
+
+
+@search_bp.route('/', methods=['GET'], strict_slashes=False)
+def search():
+    """
+    Ranked full-text search over customers, projects, invoices and inventory items visible
+    to the current user. `q` matches word prefixes (Arabic spelling variants and diacritics
+    are ignored), `types` narrows the kinds (comma-separated) and `limit` caps the hits.
+    """
+    query = (request.args.get('q') or '').strip()
+    kinds = [k.strip() for k in (request.args.get('types') or '').split(',') if k.strip()] or [s.kind for s in SEARCH_SOURCES]
+    unknown = [k for k in kinds if k not in SOURCES_BY_KIND]
+    if unknown:
+        return jsonify({"error": f"Unknown search type(s): {', '.join(unknown)}"}), 400
+    try:
+        limit = min(MAX_LIMIT, max(1, int(request.args.get('limit', DEFAULT_LIMIT))))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    if not query:
+        return jsonify({"query": query, "results": []})
+
+    with get_read_db() as db:
+        ctx, error_response = get_current_user(db)
+        if error_response:
+            return error_response
+
+        ranked = []
+        for kind in kinds:
+            for record, rank in search_scoped(SCOPED_QUERIES[kind](db, ctx), query, kind, limit):
+                ranked.append((rank, _hit(kind, record)))
+
+        # bm25: lower is better.
+        ranked.sort(key=lambda item: item[0])
+        results = [dict(hit, rank=round(rank, 4)) for rank, hit in ranked[:limit]]
+        return jsonify({"query": query, "results": results})
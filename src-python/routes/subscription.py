@@ -9,7 +9,6 @@ from supabase_client import get_service_role_client
 from .sync_log import sync_table, SYNC_CONFIG, _map_cloud_to_local, _build_sync_scope # Import sync helpers + reverse mapper
 import time # Import time for delays
 import json # Import json for parsing
-from postgrest.exceptions import APIError # Import APIError for specific handling
 from utils import get_server_time_or_none
 from sqlalchemy import or_
 
@@ -256,6 +255,7 @@ def activate_license():
     data = request.get_json() or {}
     user_uuid = data.get('p_user_uuid')
     print(f"Activating license for user_uuid={user_uuid}")
+    from postgrest.exceptions import APIError  # Deferred with the Supabase client (see supabase_client)
     try:
         service_client = get_service_role_client()
         response = service_client.rpc('activate_license', {
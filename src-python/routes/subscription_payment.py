@@ -14,7 +14,6 @@ import logging
 logger = logging.getLogger(__name__)
 
 from supabase_client import get_service_role_client
-from postgrest.exceptions import APIError
 
 subscription_payment_bp = Blueprint('subscription_payment_bp', __name__, url_prefix='/subscription_payments')
 
@@ -125,6 +124,7 @@ def create_subscription_payment():
         db.refresh(new_item)
 
         # 3. Call Remote RPC (Unification)
+        from postgrest.exceptions import APIError  # Deferred with the Supabase client (see supabase_client)
         try:
             service_client = get_service_role_client()
             rpc_params = {
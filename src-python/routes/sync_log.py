@@ -1,22 +1,39 @@
 # src-python/routes/sync_log.py
+import asyncio
 import mimetypes
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import Session
-from supabase import Client
-from utils import get_db, check_session_validity
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, selectinload
+from utils import get_db, check_session_validity, get_read_db
+from db_setup import track_sync_deltas
 import models
-from auth_schemas import IsRegistration
-from sqlalchemy import LargeBinary
+from auth_schemas import SyncRequest
+from sqlalchemy import DateTime, LargeBinary, Numeric
+from blob_store import ExternalBlob
 from decimal import Decimal
-from supabase_client import get_user_client, get_service_role_client, get_anon_client
+from supabase_client import get_user_client, get_service_role_client
 from serializer import model_to_dict
+from server_clock import server_clock
+from cloud_io import PULL_PREFETCH_TABLES, cloud_io, pipeline_enabled
+from sync_telemetry import SyncTelemetry, payload_bytes, summarize_runs
 from sqlalchemy import or_, and_
-from .inventory import _get_current_user
+from authz import get_current_auth_user
+from pagination import KeysetOrder, fetch_page, page_response, parse_page_request
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 sync_log_bp = Blueprint('sync_log_bp', __name__, url_prefix='/sync_logs')
 
+SYNC_LOG_LIST_ORDER = KeysetOrder((models.SyncLog.sync_id,))
+
 # --- Heartbeat Check ---
 
 def heart_beat(db: Session, user_uuid: str):
@@ -25,17 +42,13 @@ def heart_beat(db: Session, user_uuid: str):
     Returns True if tampering is detected and flagged, False otherwise.
     """
     try:
-        # 1. Get remote DB time
-        supabase = get_anon_client()
-        res = supabase.rpc("get_server_utc").execute()
+        # 1. Get remote DB time (tracked against the monotonic clock, so local clock changes still show up)
+        server_dt = server_clock.server_now()
 
-        if not hasattr(res, 'data') or not res.data:
+        if server_dt is None:
             print("Warning: Could not retrieve server time for heartbeat check.")
             return False # Fail safe, don't lock out user if server time is unavailable
 
-        server_time_str = res.data
-        server_dt = datetime.fromisoformat(server_time_str).replace(tzinfo=timezone.utc)
-
         # 2. Get local system time as timezone-aware (UTC)
         local_dt = datetime.now(timezone.utc)
 
@@ -67,6 +80,20 @@ def heart_beat(db: Session, user_uuid: str):
         return False # Fail safe
 
 # --- BLOB UPLOAD ---
+
+# While a pipelined push is building payloads, uploads are queued here instead of sent inline.
+_blob_upload_queue = threading.local()
+
+@contextmanager
+def _deferred_blob_uploads():
+    """Collect the uploads requested by push mappers so they can run concurrently later."""
+    pending = []
+    _blob_upload_queue.pending = pending
+    try:
+        yield pending
+    finally:
+        _blob_upload_queue.pending = None
+
 def upload_blob(blob_data: bytes, bucket_name: str, destination_path: str, use_service_client: bool = False):
     if use_service_client:
         supabase = get_service_role_client()
@@ -75,6 +102,11 @@ def upload_blob(blob_data: bytes, bucket_name: str, destination_path: str, use_s
     try:
         content_type, _ = mimetypes.guess_type(destination_path)
         content_type = content_type or 'application/octet-stream'
+        pending = getattr(_blob_upload_queue, 'pending', None)
+        if pending is not None:
+            # The public URL is derived locally, so the payload can be built before the upload runs.
+            pending.append((blob_data, bucket_name, destination_path, content_type))
+            return supabase.storage.from_(bucket_name).get_public_url(destination_path)
         supabase.storage.from_(bucket_name).upload(
             file=blob_data,
             path=destination_path,
@@ -85,6 +117,105 @@ def upload_blob(blob_data: bytes, bucket_name: str, destination_path: str, use_s
         print(e)
         raise Exception(f"Upload to {bucket_name}/{destination_path} failed: {e}")
 
+# --- MAPPER PLANS (compiled once per model) ---
+
+# Local *_uuid foreign keys are exposed as *_id columns in Supabase.
+PUSH_FK_RENAMES = {'user_uuid': 'user_id', 'customer_uuid': 'customer_id', 'project_uuid': 'project_id', 'system_config_uuid': 'system_config_id', 'invoice_uuid': 'invoice_id', 'subscription_uuid': 'subscription_id', 'organization_uuid': 'organization_id', 'branch_uuid': 'branch_id', 'category_uuid': 'category_id', 'item_uuid': 'item_id'}
+PULL_FK_RENAMES = {remote: local for local, remote in PUSH_FK_RENAMES.items()}
+
+# Columns emitted by map_common_fields; generic_mapper never overwrites them.
+COMMON_PUSH_COLUMNS = frozenset({'uuid', 'created_at', 'updated_at', 'deleted_at', 'is_dirty'})
+
+# Payload keys a custom mapper emits under a different name than the column it reads.
+PUSH_KEY_ALIASES = {
+    models.Invoice: {'invoice_id': 'invoice_no'},
+    models.Document: {'file_blob': 'file_path'},
+}
+# Sent with every delta: the row identity, and updated_at for last-writer-wins on the server.
+DELTA_PUSH_BASE_KEYS = frozenset({'id', 'updated_at', 'is_dirty'})
+
+def delta_push_enabled() -> bool:
+    """Delta payloads can be switched off (SSC_SYNC_DELTA_PUSH=0) to always push whole rows."""
+    return os.getenv("SSC_SYNC_DELTA_PUSH", "1").strip().lower() not in ("0", "false", "no", "off")
+
+@dataclass(frozen=True)
+class MapperPlan:
+    """
+    Per-model push/pull layout resolved from the table metadata.
+    push_columns: (attribute, remote key, converter) for every non-common, non-PK, synced column.
+    pull_columns: remote key -> (local column, converter); keys absent from it are dropped.
+    push_keys: local column -> the payload key it is pushed under, for delta payloads.
+    """
+    model: type
+    push_columns: Tuple[Tuple[str, str, Optional[Callable]], ...]
+    pull_columns: Dict[str, Tuple[str, Optional[Callable]]]
+    blob_columns: frozenset
+    push_keys: Dict[str, str]
+
+def _decimal_to_float(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+def _parse_cloud_datetime(value):
+    """Parse ISO strings from Supabase; anything unparseable is passed through unchanged."""
+    if not isinstance(value, str):
+        return value
+    try:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return value
+
+def _compile_mapper_plan(model_class) -> MapperPlan:
+    table = model_class.__table__
+    pk_cols = {c.name for c in table.primary_key.columns}
+    blob_cols = frozenset(c.name for c in table.columns if isinstance(c.type, (LargeBinary, ExternalBlob)))
+
+    push_columns = []
+    pull_converters = {}
+    for col in table.columns:
+        if col.info.get("local_only"):
+            continue
+        is_datetime = isinstance(col.type, DateTime)
+        if col.name not in COMMON_PUSH_COLUMNS and col.name not in pk_cols:
+            if is_datetime:
+                push_converter = _to_iso
+            elif isinstance(col.type, Numeric):
+                push_converter = _decimal_to_float
+            else:
+                push_converter = None
+            push_columns.append((col.name, PUSH_FK_RENAMES.get(col.name, col.name), push_converter))
+        if col.name not in blob_cols:
+            pull_converters[col.name] = _parse_cloud_datetime if is_datetime else None
+
+    pull_columns = {name: (name, converter) for name, converter in pull_converters.items()}
+    # Remote FK names always win over a same-named local column (e.g. invoices.invoice_id).
+    for remote_key, local_key in PULL_FK_RENAMES.items():
+        pull_columns.pop(remote_key, None)
+        if local_key in pull_converters:
+            pull_columns[remote_key] = (local_key, pull_converters[local_key])
+    pull_columns['id'] = ('uuid', None)
+
+    push_keys = {name: name for name in ('created_at', 'deleted_at')}
+    push_keys.update((attr, remote_key) for attr, remote_key, _ in push_columns)
+    push_keys.update(PUSH_KEY_ALIASES.get(model_class, {}))
+
+    return MapperPlan(
+        model=model_class,
+        push_columns=tuple(push_columns),
+        pull_columns=pull_columns,
+        blob_columns=blob_cols,
+        push_keys=push_keys,
+    )
+
+_MAPPER_PLANS: Dict[type, MapperPlan] = {}
+
+def get_mapper_plan(model_class) -> MapperPlan:
+    plan = _MAPPER_PLANS.get(model_class)
+    if plan is None:
+        plan = _MAPPER_PLANS[model_class] = _compile_mapper_plan(model_class)
+    return plan
+
 # --- DATA MAPPERS (PUSH: Local Model -> Supabase Payload) ---
 
 def _to_iso(dt):
@@ -160,22 +291,11 @@ def map_invoice_to_payload(record: models.Invoice):
     return payload
 
 def generic_mapper(record):
+    plan = get_mapper_plan(type(record))
     payload = map_common_fields(record)
-    local_columns = [c.name for c in record.__table__.columns]
-    model_pk_cols = [c.name for c in record.__table__.primary_key.columns]
-    for col in local_columns:
-        if col not in payload and col not in model_pk_cols and col != 'uuid':
-            value = getattr(record, col)
-            if isinstance(value, datetime):
-                payload[col] = _to_iso(value)
-            elif isinstance(value, Decimal):
-                payload[col] = float(value)
-            else:
-                payload[col] = value
-    fk_mappings = {'user_uuid': 'user_id', 'customer_uuid': 'customer_id', 'project_uuid': 'project_id', 'system_config_uuid': 'system_config_id', 'invoice_uuid': 'invoice_id', 'subscription_uuid': 'subscription_id', 'organization_uuid': 'organization_id', 'branch_uuid': 'branch_id', 'category_uuid': 'category_id', 'item_uuid': 'item_id'}
-    for local_fk, remote_fk in fk_mappings.items():
-        if local_fk in payload:
-            payload[remote_fk] = payload.pop(local_fk)
+    for attr, remote_key, converter in plan.push_columns:
+        value = getattr(record, attr)
+        payload[remote_key] = converter(value) if converter else value
     return payload
 
 # --- DATA MAPPERS (PULL: Supabase Payload -> Local Model) ---
@@ -184,39 +304,17 @@ def _map_cloud_to_local(payload: dict, model_class) -> dict:
     """
     Generic reverse mapper to convert a JSON payload from Supabase to a dictionary
     of attributes for a local SQLAlchemy model.
+    Blob columns are never pulled from the cloud for now.
     """
-    fk_mappings = {'user_id': 'user_uuid', 'customer_id': 'customer_uuid', 'project_id': 'project_uuid', 'system_config_id': 'system_config_uuid', 'invoice_id': 'invoice_uuid', 'subscription_id': 'subscription_uuid', 'organization_id': 'organization_uuid', 'branch_id': 'branch_uuid', 'category_id': 'category_uuid', 'item_id': 'item_uuid'}
-    local_columns = {c.name for c in model_class.__table__.columns}
+    pull_columns = get_mapper_plan(model_class).pull_columns
     mapped_payload = {}
     for key, value in payload.items():
-        if key == 'id':
-            local_key = 'uuid'
-        elif key in fk_mappings:
-            local_key = fk_mappings[key]
-        else:
-            local_key = key
-
-        if local_key not in local_columns:
+        entry = pull_columns.get(key)
+        if entry is None:
             continue
-
-        if isinstance(value, str):
-            try:
-                if value.endswith('Z'):
-                    value = value[:-1] + '+00:00'
-                value = datetime.fromisoformat(value)
-            except (ValueError, TypeError):
-                pass
-
-        mapped_payload[local_key] = value
-
-    final_payload = dict(mapped_payload)
-
-    # Do not process blobs pulled from the cloud for now.
-    blob_cols = {col.name for col in model_class.__table__.columns if isinstance(col.type, LargeBinary)}
-    for col in blob_cols:
-        final_payload.pop(col, None)
-
-    return final_payload
+        local_key, converter = entry
+        mapped_payload[local_key] = converter(value) if converter else value
+    return mapped_payload
 
 def _map_cloud_to_local_invoice(payload: dict, model_class) -> dict:
     """
@@ -230,27 +328,76 @@ def _map_cloud_to_local_invoice(payload: dict, model_class) -> dict:
 
 # --- SYNC CONFIGURATION ---
 
+# Sync lanes, in the order a full sync runs them:
+#   fast   - identity, licensing and settings rows; small, and must propagate first
+#   normal - business rows
+#   bulk   - blob-carrying tables; run last, in small batches with throttled uploads
+SYNC_LANES = ("fast", "normal", "bulk")
+BULK_LANE_BATCH_ROWS = 50
+
 SYNC_CONFIG = [
-    {"model": models.Organization, "table_name": "organizations", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Branch, "table_name": "branches", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.User, "table_name": "users", "mapper": map_user_to_payload, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Authentication, "table_name": "authentications", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Customer, "table_name": "customers", "mapper": map_customer_to_payload, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.SystemConfiguration, "table_name": "system_configurations", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Project, "table_name": "projects", "mapper": map_project_to_payload, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.InventoryItem, "table_name": "inventory_items", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.StockAdjustment, "table_name": "stock_adjustments", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.ProjectComponent, "table_name": "project_components", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Appliance, "table_name": "appliances", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Subscription, "table_name": "subscriptions", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Invoice, "table_name": "invoices", "mapper": map_invoice_to_payload, "reverse_mapper": _map_cloud_to_local_invoice},
-    {"model": models.Payment, "table_name": "payments", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.SubscriptionPayment, "table_name": "subscription_payments", "mapper": map_subscription_payment_to_payload, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.Document, "table_name": "documents", "mapper": map_document_to_payload, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.ApplicationSettings, "table_name": "application_settings", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
-    {"model": models.SyncLog, "table_name": "sync_logs", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local}
+    {"lane": "fast", "model": models.Organization, "table_name": "organizations", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "fast", "model": models.Branch, "table_name": "branches", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "fast", "model": models.User, "table_name": "users", "mapper": map_user_to_payload, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "fast", "model": models.Authentication, "table_name": "authentications", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.Customer, "table_name": "customers", "mapper": map_customer_to_payload, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.SystemConfiguration, "table_name": "system_configurations", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.Project, "table_name": "projects", "mapper": map_project_to_payload, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.InventoryItem, "table_name": "inventory_items", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.StockAdjustment, "table_name": "stock_adjustments", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.ProjectComponent, "table_name": "project_components", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.Appliance, "table_name": "appliances", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "fast", "model": models.Subscription, "table_name": "subscriptions", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.Invoice, "table_name": "invoices", "mapper": map_invoice_to_payload, "reverse_mapper": _map_cloud_to_local_invoice},
+    {"lane": "normal", "model": models.Payment, "table_name": "payments", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "bulk", "model": models.SubscriptionPayment, "table_name": "subscription_payments", "mapper": map_subscription_payment_to_payload, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "bulk", "model": models.Document, "table_name": "documents", "mapper": map_document_to_payload, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "fast", "model": models.ApplicationSettings, "table_name": "application_settings", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local},
+    {"lane": "normal", "model": models.SyncLog, "table_name": "sync_logs", "mapper": generic_mapper, "reverse_mapper": _map_cloud_to_local}
 ]
 
+# Compile every synced model's plan at import so the first sync doesn't pay for it.
+for _config in SYNC_CONFIG:
+    get_mapper_plan(_config["model"])
+# Only pushed models have their edited columns recorded for the delta push.
+track_sync_deltas(config["model"] for config in SYNC_CONFIG)
+
+def _compute_push_waves(configs: list) -> list:
+    """
+    Group SYNC_CONFIG into waves that can be pushed concurrently.
+    A table lands one wave after the latest earlier table it references by foreign key,
+    so every parent is confirmed in the cloud before its children are sent.
+    """
+    wave_by_table = {}
+    waves = []
+    for config in configs:
+        table = config["model"].__table__
+        parents = {fk.column.table.name for fk in table.foreign_keys} - {table.name}
+        wave = max((wave_by_table[p] + 1 for p in parents if p in wave_by_table), default=0)
+        wave_by_table[table.name] = wave
+        while len(waves) <= wave:
+            waves.append([])
+        waves[wave].append(config)
+    return waves
+
+def normalize_lanes(lanes=None) -> tuple:
+    """Validate requested lanes and return them in priority order; None/empty means every lane."""
+    if not lanes:
+        return SYNC_LANES
+    unknown = set(lanes) - set(SYNC_LANES)
+    if unknown:
+        raise ValueError(f"Unknown sync lane(s): {', '.join(sorted(unknown))}")
+    return tuple(lane for lane in SYNC_LANES if lane in lanes)
+
+def _configs_for_lanes(lanes=None) -> list:
+    """SYNC_CONFIG entries for the given lanes, lane by lane, in config order within a lane."""
+    return [config for lane in normalize_lanes(lanes) for config in SYNC_CONFIG if config["lane"] == lane]
+
+# Earlier lanes are pushed first, so each lane only has to order its own tables.
+PUSH_WAVES_BY_LANE = {lane: _compute_push_waves(_configs_for_lanes((lane,))) for lane in SYNC_LANES}
+
+_LANE_LOCKS = {lane: threading.Lock() for lane in SYNC_LANES}
+
 # --- CORE SYNC LOGIC ---
 
 def _get_hq_branch_uuid(db: Session, organization_uuid: str) -> Optional[str]:
@@ -272,17 +419,116 @@ def _build_sync_scope(db: Session, user: models.User) -> dict:
     role = (user.role or "").lower()
     org_uuid = getattr(user, "organization_uuid", None)
     branch_uuid = getattr(user, "branch_uuid", None)
-    return {
+    scope = {
         "role": role,
         "user_uuid": user.uuid,
         "organization_uuid": org_uuid,
         "branch_uuid": branch_uuid,
         "hq_branch_uuid": _get_hq_branch_uuid(db, org_uuid),
     }
+    scope["sets"] = _materialize_scope_sets(db, scope)
+    return scope
+
+# SQLite caps bound parameters per statement; scope sets are matched in IN () chunks below it.
+_SCOPE_SET_CHUNK = 500
+
+def _chunks(values, size: int = _SCOPE_SET_CHUNK):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _materialize_scope_sets(db: Session, scope: dict) -> dict:
+    """
+    Resolve the project/system-config/user/invoice/subscription UUIDs visible to this scope,
+    once per sync run. Every query is limited to the scope, so no table is read whole;
+    per-table filters then match against these sets instead of re-running the scope subqueries.
+    """
+    role = scope["role"]
+    user_uuid = scope["user_uuid"]
+    org_uuid = scope["organization_uuid"]
+    branch_uuid = scope["branch_uuid"]
+
+    projects_q = db.query(models.Project.uuid, models.Project.system_config_uuid)
+    users_q = db.query(models.User.uuid)
+    if role == "admin":
+        has_scope = bool(org_uuid)
+        projects_q = projects_q.filter(models.Project.organization_uuid == org_uuid)
+        users_q = users_q.filter(models.User.organization_uuid == org_uuid)
+    elif role == "employee":
+        has_scope = bool(org_uuid and branch_uuid)
+        projects_q = projects_q.filter(
+            models.Project.organization_uuid == org_uuid,
+            models.Project.branch_uuid == branch_uuid,
+        )
+        users_q = users_q.filter(
+            models.User.organization_uuid == org_uuid,
+            models.User.branch_uuid == branch_uuid,
+        )
+    else:
+        has_scope = True
+        projects_q = projects_q.filter(models.Project.user_uuid == user_uuid)
+        users_q = users_q.filter(models.User.uuid == user_uuid)
+
+    if not has_scope:
+        empty = frozenset()
+        return {"project_uuids": empty, "system_config_uuids": empty, "user_uuids": empty, "invoice_uuids": empty, "subscription_uuids": empty}
+
+    project_rows = projects_q.all()
+    project_uuids = frozenset(row[0] for row in project_rows)
+    system_config_uuids = frozenset(row[1] for row in project_rows if row[1])
+    user_uuids = frozenset(row[0] for row in users_q.all())
+
+    invoice_uuids = set()
+    if role in ("admin", "employee"):
+        # Invoices usually belong to a project, but "independent invoices" can have a NULL project_uuid;
+        # those are visible when issued by a user inside the scope.
+        for chunk in _chunks(project_uuids):
+            invoice_uuids.update(
+                row[0] for row in db.query(models.Invoice.uuid).filter(models.Invoice.project_uuid.in_(chunk)).all()
+            )
+        for chunk in _chunks(user_uuids):
+            invoice_uuids.update(
+                row[0]
+                for row in db.query(models.Invoice.uuid)
+                .filter(models.Invoice.project_uuid.is_(None), models.Invoice.user_uuid.in_(chunk))
+                .all()
+            )
+    else:
+        invoice_uuids.update(
+            row[0] for row in db.query(models.Invoice.uuid).filter(models.Invoice.user_uuid == user_uuid).all()
+        )
+
+    subscription_uuids = set()
+    for chunk in _chunks(user_uuids):
+        subscription_uuids.update(
+            row[0] for row in db.query(models.Subscription.uuid).filter(models.Subscription.user_uuid.in_(chunk)).all()
+        )
+
+    return {
+        "project_uuids": project_uuids,
+        "system_config_uuids": system_config_uuids,
+        "user_uuids": user_uuids,
+        "invoice_uuids": frozenset(invoice_uuids),
+        "subscription_uuids": frozenset(subscription_uuids),
+    }
+
+# Child tables scoped through a parent: model -> (local column, materialized set name).
+_SCOPE_MEMBERSHIP = {
+    models.SystemConfiguration: ("uuid", "system_config_uuids"),
+    models.Appliance: ("project_uuid", "project_uuids"),
+    models.Document: ("project_uuid", "project_uuids"),
+    models.ProjectComponent: ("project_uuid", "project_uuids"),
+    models.Invoice: ("uuid", "invoice_uuids"),
+    models.Payment: ("invoice_uuid", "invoice_uuids"),
+    models.Subscription: ("user_uuid", "user_uuids"),
+    models.SubscriptionPayment: ("subscription_uuid", "subscription_uuids"),
+}
 
 def _scope_query_for_model(db: Session, model, scope: dict):
     """
-    Return a SQLAlchemy query filtered to only records within the allowed scope.
+    Return (query, membership) for records within the allowed scope.
+    The query carries the direct column filters; membership is either None or a
+    (column, allowed_uuids) pair from the scope's materialized sets that rows must also satisfy.
     """
     role = scope["role"]
     user_uuid = scope["user_uuid"]
@@ -291,76 +537,38 @@ def _scope_query_for_model(db: Session, model, scope: dict):
 
     q = db.query(model)
 
-    def scoped_projects_query():
-        # Projects are the main scoping pivot for many child tables.
-        base = db.query(models.Project.uuid)
-        if role == "admin":
-            return base.filter(models.Project.organization_uuid == org_uuid) if org_uuid else base.filter(False)
-        if role == "employee":
-            return base.filter(
-                models.Project.organization_uuid == org_uuid,
-                models.Project.branch_uuid == branch_uuid,
-            ) if (org_uuid and branch_uuid) else base.filter(False)
-        # user
-        return base.filter(models.Project.user_uuid == user_uuid)
+    def membership(model_key=None):
+        column, set_name = _SCOPE_MEMBERSHIP[model_key or model]
+        return column, scope["sets"][set_name]
 
     # Always keep Authentication strictly per-user to avoid RLS violations.
     if model is models.Authentication:
-        return q.filter(models.Authentication.user_uuid == user_uuid)
+        return q.filter(models.Authentication.user_uuid == user_uuid), None
     if model is models.ApplicationSettings:
-        return q.filter(models.ApplicationSettings.user_uuid == user_uuid)
+        return q.filter(models.ApplicationSettings.user_uuid == user_uuid), None
     if model is models.SyncLog:
-        return q.filter(models.SyncLog.user_uuid == user_uuid)
+        return q.filter(models.SyncLog.user_uuid == user_uuid), None
 
     # Admin: allow org-wide records; employee: branch-only; user: primarily per-user, with org/branch for tables that don't have user_uuid.
     if role == "admin":
         if model is models.Organization:
-            return q.filter(models.Organization.uuid == org_uuid) if org_uuid else q.filter(False)
+            return (q.filter(models.Organization.uuid == org_uuid) if org_uuid else q.filter(False)), None
         if model is models.Branch:
-            return q.filter(models.Branch.organization_uuid == org_uuid) if org_uuid else q.filter(False)
+            return (q.filter(models.Branch.organization_uuid == org_uuid) if org_uuid else q.filter(False)), None
         if hasattr(model, "organization_uuid") and org_uuid:
             q = q.filter(getattr(model, "organization_uuid") == org_uuid)
-        # Child tables that don't carry org/branch directly must be scoped via Projects/Users.
-        if model is models.SystemConfiguration:
-            return q.filter(models.SystemConfiguration.uuid.in_(scoped_projects_query().with_entities(models.Project.system_config_uuid)))
-        if model is models.Appliance:
-            return q.filter(models.Appliance.project_uuid.in_(scoped_projects_query()))
-        if model is models.Document:
-            return q.filter(models.Document.project_uuid.in_(scoped_projects_query()))
-        if model is models.Invoice:
-            # Invoices usually belong to a project, but "independent invoices" can have a NULL project_uuid.
-            # For admin, include independent invoices created by users in the admin's organization.
-            if not org_uuid:
-                return q.filter(False)
-            org_user_uuids = db.query(models.User.uuid).filter(models.User.organization_uuid == org_uuid)
-            return q.filter(
-                or_(
-                    models.Invoice.project_uuid.in_(scoped_projects_query()),
-                    and_(models.Invoice.project_uuid.is_(None), models.Invoice.user_uuid.in_(org_user_uuids)),
-                )
-            )
-        if model is models.Payment:
-            if not org_uuid:
-                return q.filter(False)
-            org_user_uuids = db.query(models.User.uuid).filter(models.User.organization_uuid == org_uuid)
-            invoice_scope = db.query(models.Invoice.uuid).filter(
-                or_(
-                    models.Invoice.project_uuid.in_(scoped_projects_query()),
-                    and_(models.Invoice.project_uuid.is_(None), models.Invoice.user_uuid.in_(org_user_uuids)),
-                )
-            )
-            return q.filter(models.Payment.invoice_uuid.in_(invoice_scope))
-        if model is models.ProjectComponent:
-            return q.filter(models.ProjectComponent.project_uuid.in_(scoped_projects_query()))
-        return q
+        # Child tables that don't carry org/branch directly are scoped via Projects/Users.
+        if model in (models.SystemConfiguration, models.Appliance, models.Document, models.ProjectComponent, models.Invoice, models.Payment):
+            return q, membership()
+        return q, None
 
     if role == "employee":
         # Employees: strict branch-only, and no CRUD on branches table itself.
         if model is models.Branch:
-            return q.filter(False)
+            return q.filter(False), None
         if model is models.Organization:
             # Allow reading/updating their organization only if user needs it; still scoped.
-            return q.filter(models.Organization.uuid == org_uuid) if org_uuid else q.filter(False)
+            return (q.filter(models.Organization.uuid == org_uuid) if org_uuid else q.filter(False)), None
 
         if hasattr(model, "organization_uuid") and org_uuid:
             q = q.filter(getattr(model, "organization_uuid") == org_uuid)
@@ -368,149 +576,257 @@ def _scope_query_for_model(db: Session, model, scope: dict):
             q = q.filter(getattr(model, "branch_uuid") == branch_uuid)
 
         # Tables without branch_uuid need parent-based scoping.
-        if model is models.Payment:
-            if not (org_uuid and branch_uuid):
-                return q.filter(False)
-            branch_user_uuids = db.query(models.User.uuid).filter(
-                models.User.organization_uuid == org_uuid,
-                models.User.branch_uuid == branch_uuid,
-            )
-            invoice_scope = db.query(models.Invoice.uuid).filter(
-                or_(
-                    models.Invoice.project_uuid.in_(scoped_projects_query()),
-                    and_(models.Invoice.project_uuid.is_(None), models.Invoice.user_uuid.in_(branch_user_uuids)),
-                )
-            )
-            return q.filter(models.Payment.invoice_uuid.in_(invoice_scope))
-        if model is models.Invoice:
-            # "Independent invoices" (NULL project_uuid) are visible within the employee's branch.
-            if not (org_uuid and branch_uuid):
-                return q.filter(False)
-            branch_user_uuids = db.query(models.User.uuid).filter(
-                models.User.organization_uuid == org_uuid,
-                models.User.branch_uuid == branch_uuid,
-            )
-            return q.filter(
-                or_(
-                    models.Invoice.project_uuid.in_(scoped_projects_query()),
-                    and_(models.Invoice.project_uuid.is_(None), models.Invoice.user_uuid.in_(branch_user_uuids)),
-                )
-            )
-        if model is models.Appliance:
-            return q.filter(models.Appliance.project_uuid.in_(scoped_projects_query()))
-        if model is models.Document:
-            return q.filter(models.Document.project_uuid.in_(scoped_projects_query()))
-        if model is models.SystemConfiguration:
-            return q.filter(
-                models.SystemConfiguration.uuid.in_(
-                    scoped_projects_query().with_entities(models.Project.system_config_uuid)
-                )
-            )
-        if model is models.ProjectComponent:
-            return q.filter(models.ProjectComponent.project_uuid.in_(scoped_projects_query()))
-        if model is models.Subscription:
-            # Employee can sync subscriptions for users in their branch/org.
-            return q.filter(
-                models.Subscription.user_uuid.in_(
-                    db.query(models.User.uuid).filter(
-                        models.User.organization_uuid == org_uuid,
-                        models.User.branch_uuid == branch_uuid,
-                    )
-                )
-            )
-        if model is models.SubscriptionPayment:
-            return q.filter(
-                models.SubscriptionPayment.subscription_uuid.in_(
-                    db.query(models.Subscription.uuid).filter(
-                        models.Subscription.user_uuid.in_(
-                            db.query(models.User.uuid).filter(
-                                models.User.organization_uuid == org_uuid,
-                                models.User.branch_uuid == branch_uuid,
-                            )
-                        )
-                    )
-                )
-            )
-        # Default: if it doesn't have enough scope columns, safest is exclude.
-        return q
+        # Employees can sync subscriptions (and their payments) for users in their branch/org.
+        if model in _SCOPE_MEMBERSHIP:
+            return q, membership()
+        return q, None
 
     # role == "user" (or fallback)
     if model is models.Organization:
-        return q.filter(models.Organization.uuid == org_uuid) if org_uuid else q.filter(False)
+        return (q.filter(models.Organization.uuid == org_uuid) if org_uuid else q.filter(False)), None
     if model is models.Branch:
-        return q.filter(models.Branch.uuid == branch_uuid) if branch_uuid else q.filter(False)
+        return (q.filter(models.Branch.uuid == branch_uuid) if branch_uuid else q.filter(False)), None
 
     if hasattr(model, "user_uuid"):
-        return q.filter(getattr(model, "user_uuid") == user_uuid)
+        return q.filter(getattr(model, "user_uuid") == user_uuid), None
 
     if hasattr(model, "organization_uuid") and org_uuid:
         q = q.filter(getattr(model, "organization_uuid") == org_uuid)
     if hasattr(model, "branch_uuid") and branch_uuid:
         q = q.filter(getattr(model, "branch_uuid") == branch_uuid)
-    if model is models.SystemConfiguration:
-        return q.filter(models.SystemConfiguration.uuid.in_(scoped_projects_query().with_entities(models.Project.system_config_uuid)))
-    if model is models.Appliance:
-        return q.filter(models.Appliance.project_uuid.in_(scoped_projects_query()))
-    if model is models.Document:
-        return q.filter(models.Document.project_uuid.in_(scoped_projects_query()))
-    if model is models.Invoice:
-        return q.filter(models.Invoice.user_uuid == user_uuid)
-    if model is models.Payment:
-        return q.filter(models.Payment.invoice_uuid.in_(db.query(models.Invoice.uuid).filter(models.Invoice.user_uuid == user_uuid)))
-    if model is models.ProjectComponent:
-        return q.filter(models.ProjectComponent.project_uuid.in_(scoped_projects_query()))
-    return q
-
-def sync_table(db: Session, supabase: Client, model, table_name: str, mapper, scope: dict, dirty_only=True):
+    if model in (models.SystemConfiguration, models.Appliance, models.Document, models.Payment, models.ProjectComponent):
+        return q, membership()
+    return q, None
+
+def _scoped_records(db: Session, model, scope: dict, dirty_only: bool = True) -> list:
+    query, membership = _scope_query_for_model(db, model, scope)
     if dirty_only:
-        records = _scope_query_for_model(db, model, scope).filter(model.is_dirty == True).all()
-    else:
-        records = _scope_query_for_model(db, model, scope).all()
+        query = query.filter(model.is_dirty == True)
+    if membership is None:
+        return query.all()
+    column, allowed = membership
+    records = []
+    for chunk in _chunks(allowed):
+        records.extend(query.filter(getattr(model, column).in_(chunk)).all())
+    return records
+
+# --- DELTA PUSH ---
+
+_DIRTY_COLUMNS_QUERY_CHUNK = 500
+
+def _load_dirty_columns(db: Session, records: list) -> Dict[str, frozenset]:
+    """Edited columns per row uuid, for the rows that have a delta recorded (see db_setup)."""
+    if not records:
+        return {}
+    table_name = records[0].__table__.name
+    uuids = [rec.uuid for rec in records]
+    deltas = {}
+    for start in range(0, len(uuids), _DIRTY_COLUMNS_QUERY_CHUNK):
+        rows = (
+            db.query(models.SyncDirtyColumns.row_uuid, models.SyncDirtyColumns.columns)
+            .filter(
+                models.SyncDirtyColumns.table_name == table_name,
+                models.SyncDirtyColumns.row_uuid.in_(uuids[start:start + _DIRTY_COLUMNS_QUERY_CHUNK]),
+            )
+            .all()
+        )
+        deltas.update((row_uuid, frozenset(columns.split(','))) for row_uuid, columns in rows)
+    return deltas
+
+def _clear_dirty_columns(db: Session, records: list, uuids) -> None:
+    uuids = [str(u) for u in uuids]
+    if not records or not uuids:
+        return
+    table_name = records[0].__table__.name
+    for start in range(0, len(uuids), _DIRTY_COLUMNS_QUERY_CHUNK):
+        db.query(models.SyncDirtyColumns).filter(
+            models.SyncDirtyColumns.table_name == table_name,
+            models.SyncDirtyColumns.row_uuid.in_(uuids[start:start + _DIRTY_COLUMNS_QUERY_CHUNK]),
+        ).delete(synchronize_session=False)
+
+def _delta_payload(plan: MapperPlan, payload: dict, columns: frozenset) -> dict:
+    keys = DELTA_PUSH_BASE_KEYS | {plan.push_keys.get(column, column) for column in columns}
+    return {key: value for key, value in payload.items() if key in keys}
+
+def _build_push_payloads(db: Session, model, mapper, records: list, dirty_only: bool = True):
+    """
+    Map records for sync_apply_and_pull, trimming rows with recorded edits down to those columns.
+    Blob uploads are collected while mapping (so their cost can be measured on its own) and
+    skipped for delta rows whose blob did not change. Returns (payloads, uploads).
+    """
+    plan = get_mapper_plan(model)
+    deltas = _load_dirty_columns(db, records) if dirty_only and delta_push_enabled() else {}
+    payloads = []
+    with _deferred_blob_uploads() as uploads:
+        for rec in records:
+            mark = len(uploads)
+            payload = mapper(rec)
+            columns = deltas.get(rec.uuid)
+            if columns is not None:
+                payload = _delta_payload(plan, payload, columns)
+                if not columns & plan.blob_columns:
+                    del uploads[mark:]
+            payloads.append(payload)
+    return payloads, uploads
+
+def sync_table(db: Session, supabase: "Client", model, table_name: str, mapper, scope: dict, dirty_only=True, telemetry: Optional[SyncTelemetry] = None):
+    records = _scoped_records(db, model, scope, dirty_only=dirty_only)
     if not records:
         return
 
-    payloads = [mapper(rec) for rec in records]
+    payloads, uploads = _build_push_payloads(db, model, mapper, records, dirty_only=dirty_only)
+    metric = telemetry.table("push", table_name) if telemetry else None
 
     try:
+        started = time.perf_counter()
+        for blob_data, bucket_name, destination_path, _ in uploads:
+            upload_blob(blob_data, bucket_name, destination_path)
+        if metric:
+            metric.blob_upload_ms += (time.perf_counter() - started) * 1000.0
+            metric.blob_uploads += len(uploads)
+
         # supabase = get_user_client(auth_entry=auth_entry)
         # Note: The push RPC is currently named 'sync_apply_and_pull'
+        started = time.perf_counter()
         response = supabase.rpc("sync_apply_and_pull", {"p_table_name": table_name, "p_records": payloads}).execute()
+        if metric:
+            metric.rpc_ms += (time.perf_counter() - started) * 1000.0
+            metric.rows += len(records)
+            metric.bytes += payload_bytes(payloads)
         if hasattr(response, 'error') and response.error:
             raise Exception(f"Supabase RPC error for {table_name}: {response.error.message}")
 
         if hasattr(response, 'data'):
-            data = response.data
-            confirmed_ids = set(str(x) for x in (data.get('confirmed_ids') or []))
-            failures = data.get('failures') or []
-
-            confirmed_count = 0
-            for record in records:
-                if str(record.uuid) in confirmed_ids:
-                    record.is_dirty = False
-                    confirmed_count += 1
-
-            if failures:
-                print(f"Errors during push for {table_name}: {failures}")
-                # We raise if any record failed to ensure atomicity/visibility of sync issues
-                first_failure = failures[0]
-                raise Exception(
-                    f"Push for {table_name} failed for {len(failures)} records. "
-                    f"First error: {first_failure.get('error')} (ID: {first_failure.get('id')})"
-                )
-
-            if confirmed_count != len(records):
-                db.rollback()
-                raise Exception(
-                    f"Push for {table_name} only confirmed {confirmed_count}/{len(records)} records without explicit failure reports."
-                )
-
-            db.commit()
-            print(f"Successfully pushed and confirmed {confirmed_count}/{len(records)} records to {table_name}.")
+            started = time.perf_counter()
+            _apply_push_result(db, table_name, records, response.data)
+            if metric:
+                metric.merge_ms += (time.perf_counter() - started) * 1000.0
     except Exception as e:
         db.rollback()
+        if telemetry:
+            telemetry.record_failure("push", table_name, e)
         raise Exception(f"Failed to push table {table_name}: {str(e)}")
 
-def push_to_supabase(db: Session, dirty_only: bool = True, auth_record: models.Authentication = None):
+def _apply_push_result(db: Session, table_name: str, records: list, data: dict):
+    """Clear is_dirty on the records the cloud confirmed and commit, or raise on any failure."""
+    confirmed_ids = set(str(x) for x in (data.get('confirmed_ids') or []))
+    failures = data.get('failures') or []
+
+    confirmed_count = 0
+    for record in records:
+        if str(record.uuid) in confirmed_ids:
+            record.is_dirty = False
+            confirmed_count += 1
+
+    if failures:
+        print(f"Errors during push for {table_name}: {failures}")
+        # Failed rows go out whole next time: a delta can't create a row the cloud doesn't have.
+        db.rollback()
+        _clear_dirty_columns(db, records, [f.get('id') for f in failures if f.get('id')])
+        db.commit()
+        # We raise if any record failed to ensure atomicity/visibility of sync issues
+        first_failure = failures[0]
+        raise Exception(
+            f"Push for {table_name} failed for {len(failures)} records. "
+            f"First error: {first_failure.get('error')} (ID: {first_failure.get('id')})"
+        )
+
+    if confirmed_count != len(records):
+        db.rollback()
+        raise Exception(
+            f"Push for {table_name} only confirmed {confirmed_count}/{len(records)} records without explicit failure reports."
+        )
+
+    _clear_dirty_columns(db, records, confirmed_ids)
+    db.commit()
+    print(f"Successfully pushed and confirmed {confirmed_count}/{len(records)} records to {table_name}.")
+
+async def _upload_blob_async(blob_data: bytes, bucket_name: str, destination_path: str, content_type: str, throttle: bool = False):
+    try:
+        await cloud_io.upload(blob_data, bucket_name, destination_path, content_type, throttle=throttle)
+    except Exception as e:
+        print(e)
+        raise Exception(f"Upload to {bucket_name}/{destination_path} failed: {e}")
+
+async def _push_table_async(table_name: str, payloads: list, uploads: list, jwt: Optional[str], throttle: bool = False):
+    """Returns (rpc data, blob upload wall time in ms, rpc stats)."""
+    upload_ms = 0.0
+    # Blobs must be in storage before the rows that point at them are confirmed.
+    if uploads:
+        started = time.perf_counter()
+        await asyncio.gather(*(_upload_blob_async(*upload, throttle=throttle) for upload in uploads))
+        upload_ms = (time.perf_counter() - started) * 1000.0
+    stats = {}
+    data = await cloud_io.rpc("sync_apply_and_pull", {"p_table_name": table_name, "p_records": payloads}, jwt=jwt, stats=stats)
+    return data, upload_ms, stats
+
+async def _push_wave_async(prepared: list, jwt: Optional[str], throttle: bool = False):
+    return await asyncio.gather(
+        *(_push_table_async(table_name, payloads, uploads, jwt, throttle) for table_name, _, payloads, uploads in prepared),
+        return_exceptions=True,
+    )
+
+def _push_pipelined(db: Session, jwt: Optional[str], scope: dict, dirty_only: bool = True, telemetry: Optional[SyncTelemetry] = None, lanes=None):
+    """
+    Push the given lanes wave by wave on the cloud I/O loop: within a wave, blob uploads and
+    table RPCs overlap. Records are read and confirmed on this thread, because the
+    session is not thread-safe. The bulk lane goes in small sequential batches with
+    throttled uploads, so it never holds many blobs in memory and progress is kept if it stops.
+    """
+    for lane in normalize_lanes(lanes):
+        for wave in PUSH_WAVES_BY_LANE[lane]:
+            pending = []
+            for config in wave:
+                print(f"Pushing dirty records for table: {config['table_name']}...")
+                records = _scoped_records(db, config["model"], scope, dirty_only=dirty_only)
+                if records:
+                    pending.append((config, records))
+            if not pending:
+                continue
+            if lane != "bulk":
+                _push_batch(db, pending, jwt, telemetry, dirty_only=dirty_only)
+                continue
+            for config, records in pending:
+                for start in range(0, len(records), BULK_LANE_BATCH_ROWS):
+                    _push_batch(db, [(config, records[start:start + BULK_LANE_BATCH_ROWS])], jwt, telemetry, throttle=True, dirty_only=dirty_only)
+
+def _push_batch(db: Session, pending: list, jwt: Optional[str], telemetry: Optional[SyncTelemetry] = None, throttle: bool = False, dirty_only: bool = True):
+    """Map, send and confirm one group of (config, records) concurrently."""
+    prepared = []
+    for config, records in pending:
+        payloads, uploads = _build_push_payloads(db, config["model"], config["mapper"], records, dirty_only=dirty_only)
+        prepared.append((config["table_name"], records, payloads, uploads))
+
+    results = cloud_io.run(_push_wave_async(prepared, jwt, throttle))
+
+    # Confirm every table that succeeded, then surface the first failure in config order.
+    first_error = None
+    for (table_name, records, _, uploads), result in zip(prepared, results):
+        try:
+            if isinstance(result, BaseException):
+                raise result
+            data, upload_ms, stats = result
+            metric = telemetry.table("push", table_name) if telemetry else None
+            if metric:
+                metric.rows += len(records)
+                metric.bytes += stats.get("bytes_sent", 0)
+                metric.rpc_ms += stats.get("elapsed_ms", 0.0)
+                metric.blob_upload_ms += upload_ms
+                metric.blob_uploads += len(uploads)
+            started = time.perf_counter()
+            _apply_push_result(db, table_name, records, data)
+            if metric:
+                metric.merge_ms += (time.perf_counter() - started) * 1000.0
+        except Exception as e:
+            db.rollback()
+            if telemetry:
+                telemetry.record_failure("push", table_name, e)
+            if first_error is None:
+                first_error = Exception(f"Failed to push table {table_name}: {str(e)}")
+    if first_error:
+        raise first_error
+
+def push_to_supabase(db: Session, dirty_only: bool = True, auth_record: models.Authentication = None, telemetry: Optional[SyncTelemetry] = None, lanes=None):
     if not auth_record:
         auth_record = (
             db.query(models.Authentication)
@@ -529,13 +845,17 @@ def push_to_supabase(db: Session, dirty_only: bool = True, auth_record: models.A
 
     scope = _build_sync_scope(db, user)
 
+    if pipeline_enabled():
+        _push_pipelined(db, auth_record.current_jwt, scope, dirty_only=dirty_only, telemetry=telemetry, lanes=lanes)
+        return
+
     supabase = get_user_client(auth_entry=auth_record)
 
-    for config in SYNC_CONFIG:
+    for config in _configs_for_lanes(lanes):
         table_name = config["table_name"]
         print(f"Pushing dirty records for table: {table_name}...")
         # Re-raise exceptions from sync_table to ensure atomicity of the overall sync
-        sync_table(db, supabase, config["model"], table_name, config["mapper"], scope=scope, dirty_only=dirty_only)
+        sync_table(db, supabase, config["model"], table_name, config["mapper"], scope=scope, dirty_only=dirty_only, telemetry=telemetry)
 
 def _get_local_cursor(db: Session, user_uuid: str, device_id: str) -> Optional[datetime]:
     row = (
@@ -584,7 +904,46 @@ def _get_last_sync_cursor(db: Session, user_uuid: str, device_id: str, supabase)
     # Default for initial sync: Jan 1, 2000 UTC.
     return datetime(2000, 1, 1, tzinfo=timezone.utc)
 
-def pull_from_supabase(db: Session, auth_record: models.Authentication = None):
+def _get_lane_cursors(db: Session, user_uuid: str, device_id: str) -> Dict[str, datetime]:
+    rows = (
+        db.query(models.SyncLaneCursor)
+        .filter(models.SyncLaneCursor.user_uuid == user_uuid, models.SyncLaneCursor.device_id == device_id)
+        .all()
+    )
+    # Stored as naive UTC in SQLite; treat as UTC.
+    return {row.lane: row.last_cursor.replace(tzinfo=timezone.utc) for row in rows if row.last_cursor}
+
+def _set_lane_cursors(db: Session, user_uuid: str, device_id: str, lanes: tuple, cursor_utc: datetime):
+    cursor_naive = cursor_utc.astimezone(timezone.utc).replace(tzinfo=None)
+    rows = {
+        row.lane: row
+        for row in db.query(models.SyncLaneCursor)
+        .filter(models.SyncLaneCursor.user_uuid == user_uuid, models.SyncLaneCursor.device_id == device_id)
+        .all()
+    }
+    for lane in lanes:
+        row = rows.get(lane)
+        if row:
+            row.last_cursor = cursor_naive
+            row.updated_at = datetime.utcnow()
+            row.is_dirty = False
+        else:
+            db.add(models.SyncLaneCursor(user_uuid=user_uuid, device_id=device_id, lane=lane, last_cursor=cursor_naive, is_dirty=False))
+    db.commit()
+
+# SQLite caps bound parameters per statement; stay well below the legacy 999 limit.
+_UUID_LOOKUP_CHUNK = 500
+
+def _load_existing_by_uuid(db: Session, model_class, uuids: list) -> dict:
+    existing = {}
+    for start in range(0, len(uuids), _UUID_LOOKUP_CHUNK):
+        chunk = uuids[start:start + _UUID_LOOKUP_CHUNK]
+        for row in db.query(model_class).filter(model_class.uuid.in_(chunk)).all():
+            existing[row.uuid] = row
+    return existing
+
+def pull_from_supabase(db: Session, auth_record: models.Authentication = None, telemetry: Optional[SyncTelemetry] = None, lanes=None):
+    lanes = normalize_lanes(lanes)
     if not auth_record:
         auth_record = (
             db.query(models.Authentication)
@@ -605,58 +964,104 @@ def pull_from_supabase(db: Session, auth_record: models.Authentication = None):
     from utils import get_device_id
     device_id = get_device_id()
     last_cursor = _get_last_sync_cursor(db, user_uuid, device_id, supabase)
-
-    # Use a server-issued high-water mark to bound the pull window.
-    server_time_res = supabase.rpc("get_server_utc").execute()
-    if hasattr(server_time_res, 'error') and server_time_res.error:
-        raise Exception(f"Failed to retrieve server time: {server_time_res.error.message}")
-    high_water_mark = _coerce_timestamptz(getattr(server_time_res, 'data', None))
+    # A lane may have been pulled on its own since the last all-lane cursor; start it from there.
+    lane_cursors = _get_lane_cursors(db, user_uuid, device_id)
+    since_iso = {lane: max(last_cursor, lane_cursors.get(lane, last_cursor)).astimezone(timezone.utc).isoformat() for lane in lanes}
+    configs = [config for config in _configs_for_lanes(lanes) if config.get("reverse_mapper")]
+
+    # Use a server-derived high-water mark to bound the pull window.
+    # server_now() never runs ahead of the real server clock, so no rows can fall past the window.
+    high_water_mark = server_clock.server_now()
     if not high_water_mark:
-        raise Exception("Failed to parse server time for high-water mark.")
+        raise Exception("Failed to retrieve server time for high-water mark.")
 
-    last_cursor_iso = last_cursor.astimezone(timezone.utc).isoformat()
     high_water_iso = high_water_mark.astimezone(timezone.utc).isoformat()
-    print(f"\n--- Starting Pull Operation (window: ({last_cursor_iso}, {high_water_iso}]) ---")
+    for lane in lanes:
+        print(f"\n--- Starting Pull Operation for {lane} lane (window: ({since_iso[lane]}, {high_water_iso}]) ---")
+
+    # Lanes merge in priority order; within a lane, tables keep the reverse config order.
+    ordered = [config for lane in lanes for config in reversed(configs) if config["lane"] == lane]
+
+    # Every table is pulled over the same window, so the fetches are independent: keep the next
+    # PULL_PREFETCH_TABLES tables fetching on the cloud I/O loop while the current one merges.
+    # The window is bounded so a large org never holds every table's rows in memory at once.
+    prefetched = {}
+    prefetch_stats = {}
+    pipelined = pipeline_enabled()
+
+    def prefetch(index):
+        if not pipelined or index >= len(ordered):
+            return
+        config = ordered[index]
+        prefetch_stats[config["table_name"]] = {}
+        prefetched[config["table_name"]] = cloud_io.submit(cloud_io.rpc(
+            "pull_changes",
+            {
+                "p_table_name": config["table_name"],
+                "p_last_sync_timestamp": since_iso[config["lane"]],
+                "p_high_water_mark": high_water_iso,
+            },
+            jwt=auth_record.current_jwt,
+            stats=prefetch_stats[config["table_name"]],
+        ))
+
+    for index in range(PULL_PREFETCH_TABLES):
+        prefetch(index)
     try:
         # Set a flag on the session to indicate that a pull sync is active.
         # The SQLAlchemy event listener will check this flag.
         setattr(db, 'is_pull_sync_active', True)
 
-        for config in reversed(SYNC_CONFIG):
+        for index, config in enumerate(ordered):
             table_name = config["table_name"]
             model_class = config["model"]
-            reverse_mapper = config.get("reverse_mapper")
-            if not reverse_mapper:
-                print(f" -> No reverse mapper for {table_name}, skipping pull.")
-                continue
+            reverse_mapper = config["reverse_mapper"]
             try:
                 print(f"Pulling changes for '{table_name}'...")
-                response = supabase.rpc(
-                    "pull_changes",
-                    {
-                        "p_table_name": table_name,
-                        "p_last_sync_timestamp": last_cursor_iso,
-                        "p_high_water_mark": high_water_iso,
-                    },
-                ).execute()
-                if hasattr(response, 'error') and response.error:
-                    raise Exception(f"Supabase RPC error for {table_name}: {response.error.message}")
-
-                records_from_supabase = response.data
+                metric = telemetry.table("pull", table_name) if telemetry else None
+                if table_name in prefetched:
+                    future = prefetched.pop(table_name)
+                    prefetch(index + PULL_PREFETCH_TABLES)
+                    records_from_supabase = future.result()
+                    stats = prefetch_stats.pop(table_name)
+                    if metric:
+                        metric.rpc_ms += stats.get("elapsed_ms", 0.0)
+                        metric.bytes += stats.get("bytes_received", 0)
+                else:
+                    started = time.perf_counter()
+                    response = supabase.rpc(
+                        "pull_changes",
+                        {
+                            "p_table_name": table_name,
+                            "p_last_sync_timestamp": since_iso[config["lane"]],
+                            "p_high_water_mark": high_water_iso,
+                        },
+                    ).execute()
+                    if hasattr(response, 'error') and response.error:
+                        raise Exception(f"Supabase RPC error for {table_name}: {response.error.message}")
+
+                    records_from_supabase = response.data
+                    if metric:
+                        metric.rpc_ms += (time.perf_counter() - started) * 1000.0
+                        metric.bytes += payload_bytes(records_from_supabase)
                 if not records_from_supabase:
                     print(f" -> No new records found for {table_name}.")
                     continue
 
                 print(f" -> Received {len(records_from_supabase)} records from {table_name}. Merging...")
+                merge_started = time.perf_counter()
+                # 1. Convert cloud payloads to dictionaries of local attributes
+                payload_dicts = []
                 for record_data in records_from_supabase:
-                    # 1. Convert cloud payload to a dictionary of local attributes
                     payload_dict = reverse_mapper(record_data, model_class)
-                    record_uuid = payload_dict.get('uuid')
-                    if not record_uuid:
-                        continue
+                    if payload_dict.get('uuid'):
+                        payload_dicts.append(payload_dict)
+
+                # 2. Load all existing local records for this page in a few IN queries
+                existing_by_uuid = _load_existing_by_uuid(db, model_class, [p['uuid'] for p in payload_dicts])
 
-                    # 2. Query for existing local record by UUID
-                    existing_record = db.query(model_class).filter_by(uuid=record_uuid).first()
+                for payload_dict in payload_dicts:
+                    existing_record = existing_by_uuid.get(payload_dict['uuid'])
 
                     if existing_record:
                         incoming_updated_at = payload_dict.get("updated_at")
@@ -683,21 +1088,35 @@ def pull_from_supabase(db: Session, auth_record: models.Authentication = None):
                         db.add(new_instance)
 
                 db.commit()
+                if metric:
+                    metric.rows += len(records_from_supabase)
+                    metric.merge_ms += (time.perf_counter() - merge_started) * 1000.0
                 print(f"    - Successfully merged {len(records_from_supabase)} records for {table_name}.")
             except Exception as e:
                 db.rollback()
+                if telemetry:
+                    telemetry.record_failure("pull", table_name, e)
                 print(f"Error pulling table {table_name}: {str(e)}")
                 raise
 
-        # Only advance the cursor if the full pull succeeded.
-        _set_local_cursor(db, user_uuid, device_id, high_water_mark)
-        try:
-            supabase.rpc("set_sync_cursor", {"p_device_id": device_id, "p_cursor": high_water_iso}).execute()
-        except Exception:
-            pass
+        # Only advance cursors if the full pull succeeded.
+        _set_lane_cursors(db, user_uuid, device_id, lanes, high_water_mark)
+        # The device cursor is the oldest lane cursor: everything before it is in every lane.
+        lane_cursors = _get_lane_cursors(db, user_uuid, device_id)
+        if all(lane in lane_cursors for lane in SYNC_LANES):
+            device_cursor = min(lane_cursors.values())
+            if device_cursor > last_cursor:
+                _set_local_cursor(db, user_uuid, device_id, device_cursor)
+                try:
+                    supabase.rpc("set_sync_cursor", {"p_device_id": device_id, "p_cursor": device_cursor.isoformat()}).execute()
+                except Exception:
+                    pass
     finally:
         # Always ensure the flag is reset, even if an error occurs
         setattr(db, 'is_pull_sync_active', False)
+        # Don't leave fetches running for a pull that has already failed.
+        for future in prefetched.values():
+            future.cancel()
 
 def _create_and_push_final_sync_log(db: Session, sync_start_time: datetime, auth_record: models.Authentication = None):
     print("\n--- Finalizing sync operation ---")
@@ -736,7 +1155,7 @@ def _create_and_push_final_sync_log(db: Session, sync_start_time: datetime, auth
     db.add(sync_log_entry)
     db.commit()
 
-    current_user, error_response = _get_current_user(db)
+    current_user, error_response = get_current_auth_user(db)
     if error_response:
         return error_response
 
@@ -777,8 +1196,15 @@ def sync():
     raw_payload = request.get_json(silent=True)
     if not isinstance(raw_payload, dict):
         raw_payload = {}
-    payload = IsRegistration(**raw_payload)
+    try:
+        payload = SyncRequest(**raw_payload)
+    except ValidationError as e:
+        return jsonify({"status": "failed", "error": "Invalid sync request.", "errors": e.errors()}), 400
     registration = payload.registration
+    try:
+        lanes = normalize_lanes(payload.lanes)
+    except ValueError as e:
+        return jsonify({"status": "failed", "error": str(e)}), 400
 
     with get_db() as db:
         # Load the specific logged-in authentication row
@@ -826,7 +1252,7 @@ def sync():
                 # heart_beat has now flagged the user.
                 # Push this change to the server immediately.
                 print("Tampering detected. Pushing lock status to server.")
-                push_to_supabase(db, auth_record=auth) # This will push the subscription.tampered=True change
+                push_to_supabase(db, auth_record=auth, lanes=("fast",)) # This will push the subscription.tampered=True change
                 return jsonify({"status": "tamper_detected", "message": "Time discrepancy detected. Account is being locked."}), 403
         except Exception as e:
             return jsonify({"status": "failed", "error": f"Heartbeat check failed: {e}"}), 500
@@ -848,34 +1274,80 @@ def sync():
                 return jsonify({"status": "failed", "error": f"Session validation failed: {e}"}), 401
 
         # If all checks pass, proceed with normal sync
+        telemetry = SyncTelemetry(lanes)
         try:
-            push_to_supabase(db, auth_record=auth)
-            pull_from_supabase(db, auth_record=auth)
+            # Lanes run in priority order. Each lane has its own lock, so a fast-lane sync
+            # never queues behind a bulk upload that another request is still running.
+            for lane in lanes:
+                with _LANE_LOCKS[lane]:
+                    push_to_supabase(db, auth_record=auth, telemetry=telemetry, lanes=(lane,))
+                    pull_from_supabase(db, auth_record=auth, telemetry=telemetry, lanes=(lane,))
             # Enforce subscription/user status after pulling fresh cloud data.
             # This also covers flows where the UI doesn't fetch /subscriptions immediately after login.
-            try:
-                from .subscription import _enforce_cloud_and_refresh_local
-                _enforce_cloud_and_refresh_local(user_uuid)
-            except Exception as e:
-                print(f"Warning: Post-sync subscription enforcement failed for user_uuid={user_uuid}: {e}")
+            if "fast" in lanes:
+                try:
+                    from .subscription import _enforce_cloud_and_refresh_local
+                    _enforce_cloud_and_refresh_local(user_uuid)
+                except Exception as e:
+                    print(f"Warning: Post-sync subscription enforcement failed for user_uuid={user_uuid}: {e}")
             _create_and_push_final_sync_log(db, start_time, auth_record=auth)
 
-            end_time = datetime.now(timezone.utc)
-            # duration = (end_time - start_time).total_seconds()
-            print(f"Synchronization process finished successfully in {(end_time - start_time).total_seconds():.2f} seconds.")
+            duration = telemetry.duration_seconds()
+            print(f"Synchronization process finished successfully in {duration:.2f} seconds.")
+            _persist_sync_telemetry(db, telemetry, user_uuid, "success")
 
-            return jsonify({"status": "ok", "duration_seconds": 0}), 200
+            return jsonify({"status": "ok", "duration_seconds": round(duration, 3)}), 200
         except Exception as e:
-            end_time = datetime.now(timezone.utc)
-            # duration = (end_time - start_time).total_seconds()
-            print(f"Synchronization process failed after {(end_time - start_time).total_seconds():.2f} seconds.")
-            return jsonify({"status": "failed", "error": str(e), "duration_seconds": 0}), 500
+            duration = telemetry.duration_seconds()
+            print(f"Synchronization process failed after {duration:.2f} seconds.")
+            _persist_sync_telemetry(db, telemetry, user_uuid, "failed", error=str(e))
+            return jsonify({"status": "failed", "error": str(e), "duration_seconds": round(duration, 3)}), 500
+
+def _persist_sync_telemetry(db: Session, telemetry: SyncTelemetry, user_uuid: str, status: str, error: str = None):
+    # Telemetry must never turn a finished sync into a failed one.
+    try:
+        db.rollback()
+        telemetry.persist(db, user_uuid, status, error=error)
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: Failed to store sync telemetry: {e}")
 
 @sync_log_bp.route('/', methods=['GET'])
 def get_all_logs():
-    with get_db() as db:
-        items = db.query(models.SyncLog).all()
-        return jsonify([model_to_dict(i) for i in items])
+    """Oldest first. Opt-in paging and projection via `limit`, `after` and `fields` (see pagination.py)."""
+    page, error_response = parse_page_request(request.args, SYNC_LOG_LIST_ORDER)
+    if error_response:
+        return error_response
+
+    with get_read_db() as db:
+        items, next_cursor = fetch_page(db.query(models.SyncLog), page, SYNC_LOG_LIST_ORDER)
+        return page_response(page, [model_to_dict(i, fields=page.fields) for i in items], next_cursor)
+
+@sync_log_bp.route('/metrics', methods=['GET'])
+def get_sync_metrics():
+    """Percentiles of whole-run and per-table sync cost over the most recent runs (?runs=N, default 50)."""
+    runs_limit = request.args.get('runs', default=50, type=int)
+    runs_limit = max(1, min(runs_limit or 50, 500))
+    with get_read_db() as db:
+        runs = (
+            db.query(models.SyncRun)
+            .options(selectinload(models.SyncRun.table_metrics))
+            .order_by(models.SyncRun.sync_run_id.desc())
+            .limit(runs_limit)
+            .all()
+        )
+        summary = summarize_runs(runs)
+        summary["recent"] = [
+            {
+                "uuid": run.uuid,
+                "status": run.status,
+                "started_at": run.started_at.isoformat() if run.started_at else None,
+                "duration_ms": run.duration_ms,
+                "error": run.error,
+            }
+            for run in runs[:10]
+        ]
+        return jsonify(summary), 200
 
 @sync_log_bp.route('/push', methods=['POST'])
 def push():
@@ -1,15 +1,28 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request
 from pathlib import Path
 import json
 import os
 
 from utils import get_db
 import models
+from db_setup import read_engine
+from db_write_queue import write_queue
+from db_maintenance import db_maintenance
+from query_metrics import query_metrics
+from request_metrics import request_metrics
+from sampling_profiler import DEFAULT_INTERVAL_MS, MAX_CAPTURE_SECONDS, sampling_profiler
 from typing import Optional
 
 
 system_info_bp = Blueprint("system_info_bp", __name__, url_prefix="/system")
 
+# Peers allowed to scrape /system/prometheus and to drive /system/profiler.
+LOCAL_ADDRESSES = frozenset({"127.0.0.1", "::1"})
+
+
+def _is_local_request() -> bool:
+    return request.remote_addr in LOCAL_ADDRESSES
+
 
 def _read_json_file(path: Path):
     try:
@@ -69,7 +82,94 @@ def get_system_info():
                     "app_version": _get_app_version(),
                     "local_db_size_bytes": _get_local_db_size_bytes(),
                     "last_sync_utc": _get_last_sync_utc(db),
+                    "performance": request_metrics.summary(),
                 }
             ),
             200,
         )
+
+
+@system_info_bp.route("/db", methods=["GET"])
+def get_db_stats():
+    """Write queue depth and lock waits, read pool usage and the last maintenance run."""
+    pool = read_engine.pool
+    return (
+        jsonify(
+            {
+                "write_queue": write_queue.stats(),
+                "read_pool": {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    "overflow": max(0, pool.overflow()),
+                },
+                "maintenance": db_maintenance.status(),
+            }
+        ),
+        200,
+    )
+
+
+@system_info_bp.route("/metrics", methods=["GET"])
+def get_query_metrics():
+    """SQL statements and database time per endpoint, and the most recent slow statements (values redacted)."""
+    return jsonify(query_metrics.stats()), 200
+
+
+@system_info_bp.route("/prometheus", methods=["GET"])
+def get_prometheus_metrics():
+    """Request and SQL metrics in Prometheus text format; answered to local scrapers only."""
+    if not _is_local_request():
+        return jsonify({"error": "Metrics are only served to localhost"}), 403
+    body = request_metrics.prometheus(query_metrics.stats()["endpoints"])
+    return Response(body, mimetype="text/plain; version=0.0.4; charset=utf-8"), 200
+
+
+@system_info_bp.route("/profiler", methods=["GET"])
+def get_profiler_status():
+    """The running capture, if any, and the files written by the last one."""
+    if not _is_local_request():
+        return jsonify({"error": "The profiler is only available from localhost"}), 403
+    return jsonify(sampling_profiler.status()), 200
+
+
+@system_info_bp.route("/profiler/start", methods=["POST"])
+def start_profiler():
+    """
+    Start a sampling capture. JSON body (all optional):
+    - route: "METHOD /rule" as listed by /system/metrics; profiles only the next `requests` of it
+    - requests: how many requests of `route` to profile (default 1)
+    - interval_ms: time between samples (default 5)
+    - seconds: stop and write the files after this long at the latest (default and cap 600)
+    - include_idle: sessions only; also keep samples of threads parked waiting for work
+    """
+    if not _is_local_request():
+        return jsonify({"error": "The profiler is only available from localhost"}), 403
+    data = request.get_json(silent=True) or {}
+    try:
+        interval_ms = float(data.get("interval_ms", DEFAULT_INTERVAL_MS))
+        seconds = float(data.get("seconds", MAX_CAPTURE_SECONDS))
+        if data.get("route"):
+            running = sampling_profiler.start_route(
+                str(data["route"]), int(data.get("requests", 1)), interval_ms=interval_ms, seconds=seconds
+            )
+        else:
+            running = sampling_profiler.start_session(
+                interval_ms=interval_ms, seconds=seconds, include_idle=bool(data.get("include_idle", False))
+            )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify(running), 201
+
+
+@system_info_bp.route("/profiler/stop", methods=["POST"])
+def stop_profiler():
+    """Stop the running capture and return the paths of its pstats and collapsed-stack files."""
+    if not _is_local_request():
+        return jsonify({"error": "The profiler is only available from localhost"}), 403
+    result = sampling_profiler.stop()
+    if result is None:
+        return jsonify({"error": "No capture is running"}), 409
+    return jsonify(result), 200
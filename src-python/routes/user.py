@@ -5,6 +5,7 @@ from models import User, Authentication, ApplicationSettings, Subscription, Subs
 from schemas import UserUpdate
 from auth_schemas import RegistrationPayload
 from serializer import model_to_dict
+from authz import get_current_auth_user
 from routes.sync_log import map_user_to_payload
 import base64
 import uuid
@@ -526,19 +527,9 @@ def create_employee():
     data = request.json
 
     with get_db() as db:
-        # Resolve current user from active session
-        auth_record = (
-            db.query(Authentication)
-            .filter(Authentication.is_logged_in == True)
-            .order_by(Authentication.last_active.desc())
-            .first()
-        )
-        if not auth_record:
-            return jsonify({"error": "No authenticated user found. Please log in."}), 401
-
-        current_user = db.query(User).filter(User.uuid == auth_record.user_uuid).first()
-        if not current_user:
-            return jsonify({"error": "Authenticated user not found in user table."}), 404
+        current_user, error_response = get_current_auth_user(db)
+        if error_response:
+            return error_response
 
         if current_user.status in ['trial', 'grace', 'expired']:
             return jsonify({"error": f"Action restricted for {current_user.status} accounts. Please renew your subscription."}), 403
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from flask import g, request
+
+import models
+
+# Default and smallest time between two samples.
+DEFAULT_INTERVAL_MS = 5.0
+MIN_INTERVAL_MS = 1.0
+# A capture left running stops itself (and writes its files) after this long.
+MAX_CAPTURE_SECONDS = 600
+# Captures are written to <DB dir>/profiles.
+PROFILE_DIR_NAME = "profiles"
+
+# Frames from these files are the application; a sample with none of them is a thread parked
+# in waitress or the stdlib waiting for work. main.py only holds the server loop.
+_APP_ROOT = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_APP_EXCLUDED = frozenset({os.path.join(_APP_ROOT, "main.py")})
+_UNSAFE_LABEL = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# (filename, first line, function name): the key pstats uses for a function.
+FuncKey = Tuple[str, int, str]
+
+
+def _current_route() -> str:
+    rule = request.url_rule
+    return f"{request.method} {rule.rule if rule is not None else '(unmatched)'}"
+
+
+def _is_app_frame(filename: str) -> bool:
+    return filename.startswith(_APP_ROOT) and filename not in _APP_EXCLUDED
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler for the running sidecar. A daemon thread reads every thread's
+    Python stack (sys._current_frames) at a fixed interval; nothing is hooked into the profiled
+    code, so a capture can run against a busy machine.
+
+    Two kinds of capture, one at a time:
+    - a session (start/stop) samples every thread doing application work, e.g. a sync or a report;
+    - a route capture samples only the threads serving the next N requests of one route.
+
+    When a capture ends its samples are written to <DB dir>/profiles as a collapsed-stack file
+    (one "frame;frame;frame count" line per stack, for flamegraph.pl or speedscope) and a pstats
+    file (pstats.Stats / snakeviz). Times in the pstats file are sampled estimates and its call
+    counts are sample counts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._capture: Optional[dict] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last: Optional[dict] = None
+
+    # --- Control ---
+
+    def start_session(self, interval_ms: float = DEFAULT_INTERVAL_MS, seconds: float = MAX_CAPTURE_SECONDS,
+                      include_idle: bool = False) -> dict:
+        return self._start({
+            "mode": "session",
+            "label": "session",
+            "include_idle": include_idle,
+        }, interval_ms, seconds)
+
+    def start_route(self, route: str, requests: int, interval_ms: float = DEFAULT_INTERVAL_MS,
+                    seconds: float = MAX_CAPTURE_SECONDS) -> dict:
+        """Profile the next `requests` requests of `route` ("METHOD /rule", as in /system/metrics)."""
+        if requests < 1:
+            raise ValueError("requests must be at least 1")
+        return self._start({
+            "mode": "route",
+            "label": route,
+            "route": route,
+            "requests": requests,
+            "claimed": 0,
+            "completed": 0,
+            "watched": set(),
+        }, interval_ms, seconds)
+
+    def stop(self) -> Optional[dict]:
+        """End the running capture and write its files; returns their summary, or None if idle."""
+        with self._lock:
+            capture = self._capture
+            if capture is None:
+                return None
+        self._stop.set()
+        self._thread.join()
+        return self._last
+
+    def status(self) -> dict:
+        with self._lock:
+            capture = self._capture
+            running = None
+            if capture is not None:
+                running = {
+                    "mode": capture["mode"],
+                    "label": capture["label"],
+                    "interval_ms": capture["interval"] * 1000.0,
+                    "started_at": capture["started_at"].isoformat(),
+                    "samples": capture["samples"],
+                }
+                if capture["mode"] == "route":
+                    running["requests"] = capture["requests"]
+                    running["completed"] = capture["completed"]
+            return {"running": running, "last": self._last, "directory": self.directory()}
+
+    @staticmethod
+    def directory() -> str:
+        return os.path.join(os.path.dirname(models.DB_FILE_PATH), PROFILE_DIR_NAME)
+
+    def _start(self, capture: dict, interval_ms: float, seconds: float) -> dict:
+        interval_ms = max(MIN_INTERVAL_MS, float(interval_ms))
+        seconds = min(MAX_CAPTURE_SECONDS, float(seconds))
+        if seconds <= 0:
+            raise ValueError("seconds must be positive")
+        with self._lock:
+            if self._capture is not None:
+                raise RuntimeError(f"A {self._capture['mode']} capture is already running.")
+            capture.update(
+                interval=interval_ms / 1000.0,
+                deadline=time.monotonic() + seconds,
+                started_at=datetime.now(timezone.utc),
+                samples=0,
+                stacks={},
+            )
+            self._capture = capture
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(capture,), name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return self.status()["running"]
+
+    # --- Flask hooks (route captures) ---
+
+    def request_started(self) -> None:
+        capture = self._capture
+        if capture is None or capture["mode"] != "route":
+            return
+        route = _current_route()
+        with self._lock:
+            if self._capture is not capture or route != capture["route"] or capture["claimed"] >= capture["requests"]:
+                return
+            capture["claimed"] += 1
+            capture["watched"].add(threading.get_ident())
+        g.sampling_profiler_capture = capture
+
+    def request_finished(self, exc=None) -> None:
+        capture = g.pop("sampling_profiler_capture", None)
+        if capture is None:
+            return
+        with self._lock:
+            capture["watched"].discard(threading.get_ident())
+            capture["completed"] += 1
+            if capture["completed"] >= capture["requests"] and self._capture is capture:
+                # The sampler thread writes the files; this request does not wait for them.
+                self._stop.set()
+
+    # --- Sampling ---
+
+    def _run(self, capture: dict) -> None:
+        own = threading.get_ident()
+        names = {}
+        last = time.perf_counter()
+        try:
+            while not self._stop.wait(capture["interval"]):
+                now = time.perf_counter()
+                # Weight each sample by the real time since the previous one: under load the
+                # sampler wakes late and each sample then stands for more time.
+                weight, last = now - last, now
+                if time.monotonic() >= capture["deadline"]:
+                    break
+                if capture["mode"] == "route":
+                    with self._lock:
+                        watched: Optional[Set[int]] = set(capture["watched"])
+                    if not watched:
+                        continue
+                else:
+                    watched = None
+                frames = sys._current_frames()
+                for ident, frame in frames.items():
+                    if ident == own or (watched is not None and ident not in watched):
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                        frame = frame.f_back
+                    if watched is None and not capture["include_idle"] and not any(_is_app_frame(key[0]) for key in stack):
+                        continue
+                    if ident not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    stack.reverse()
+                    key = (names.get(ident, str(ident)), tuple(stack))
+                    entry = capture["stacks"].get(key)
+                    if entry is None:
+                        capture["stacks"][key] = [1, weight]
+                    else:
+                        entry[0] += 1
+                        entry[1] += weight
+                    capture["samples"] += 1
+                del frames
+        finally:
+            result = self._write(capture)
+            with self._lock:
+                self._last = result
+                self._capture = None
+
+    # --- Output ---
+
+    def _write(self, capture: dict) -> dict:
+        directory = self.directory()
+        os.makedirs(directory, exist_ok=True)
+        stamp = capture["started_at"].strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(directory, f"{stamp}-{_UNSAFE_LABEL.sub('_', capture['label']).strip('_')}")
+        collapsed_path, pstats_path = base + ".collapsed", base + ".prof"
+
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for line in _collapsed_lines(capture["stacks"]):
+                f.write(line + "\n")
+        with open(pstats_path, "wb") as f:
+            marshal.dump(_pstats_table(capture["stacks"]), f)
+
+        result = {
+            "mode": capture["mode"],
+            "label": capture["label"],
+            "started_at": capture["started_at"].isoformat(),
+            "seconds": round((datetime.now(timezone.utc) - capture["started_at"]).total_seconds(), 1),
+            "samples": capture["samples"],
+            "collapsed": collapsed_path,
+            "pstats": pstats_path,
+        }
+        if capture["mode"] == "route":
+            result["requests"] = capture["completed"]
+        return result
+
+
+def _frame_label(key: FuncKey) -> str:
+    filename, line, name = key
+    # Semicolons separate frames in the collapsed format.
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def _collapsed_lines(stacks: Dict[Tuple[str, tuple], List]) -> List[str]:
+    """Brendan Gregg's collapsed format, rooted at the thread name so request and sync threads stay apart."""
+    lines = []
+    for (thread_name, stack), (count, _) in stacks.items():
+        frames = [thread_name.replace(";", ":")] + [_frame_label(key) for key in stack]
+        lines.append(f"{';'.join(frames)} {count}")
+    lines.sort()
+    return lines
+
+
+def _pstats_table(stacks: Dict[Tuple[str, tuple], List]) -> dict:
+    """
+    The table pstats.Stats loads from a file: {func: (cc, nc, tt, ct, callers)}. Own time (tt) is
+    charged to the innermost frame of each sample, cumulative time (ct) once to every function on
+    the stack, and callers count the samples in which each caller sat directly above the callee.
+    """
+    own: Dict[FuncKey, float] = {}
+    cumulative: Dict[FuncKey, float] = {}
+    hits: Dict[FuncKey, int] = {}
+    callers: Dict[FuncKey, Dict[FuncKey, int]] = {}
+    for (_, stack), (count, seconds) in stacks.items():
+        if not stack:
+            continue
+        leaf = stack[-1]
+        own[leaf] = own.get(leaf, 0.0) + seconds
+        for key in set(stack):
+            cumulative[key] = cumulative.get(key, 0.0) + seconds
+            hits[key] = hits.get(key, 0) + count
+        for caller, callee in set(zip(stack, stack[1:])):
+            edges = callers.setdefault(callee, {})
+            edges[caller] = edges.get(caller, 0) + count
+    return {
+        key: (hits[key], hits[key], own.get(key, 0.0), cumulative[key], callers.get(key, {}))
+        for key in cumulative
+    }
+
+
+sampling_profiler = SamplingProfiler()
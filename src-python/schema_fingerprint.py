@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Iterable, Optional
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+# One-row table holding the fingerprint of the schema the database was last set up for.
+# db_setup.create_db_and_tables compares it with the running code's fingerprint and skips
+# create_all, the _ensure_* steps and category seeding when they match. It lives outside the
+# models (like the FTS search index) so it is not part of what it fingerprints.
+FINGERPRINT_TABLE = "local_schema_fingerprint"
+# Bump when a startup step changes what it creates or backfills outside the models' DDL
+# (the FTS search index table and its backfill, balance columns, rollups, blob externalization),
+# so databases set up by an older build run the steps again. The index has no triggers; the
+# session listeners in db_setup keep it current after startup.
+STARTUP_STEPS_VERSION = 1
+
+
+def compute_schema_fingerprint(metadata, category_definitions: Iterable[dict]) -> str:
+    """sha256 of the SQLite DDL of every table and index, the canonical inventory categories and STARTUP_STEPS_VERSION."""
+    dialect = sqlite.dialect()
+    digest = hashlib.sha256(f"steps:{STARTUP_STEPS_VERSION}\n".encode())
+    for table in metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    digest.update(json.dumps(list(category_definitions), sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def read_schema_fingerprint(connection) -> Optional[str]:
+    """The stored fingerprint; None for a new database or one set up before fingerprints."""
+    try:
+        return connection.exec_driver_sql(f"SELECT fingerprint FROM {FINGERPRINT_TABLE} WHERE id = 1").scalar()
+    except OperationalError:
+        return None
+
+
+def store_schema_fingerprint(connection, fingerprint: str) -> None:
+    connection.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {FINGERPRINT_TABLE} ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), fingerprint TEXT NOT NULL, recorded_at TEXT NOT NULL)"
+    )
+    connection.exec_driver_sql(
+        f"INSERT OR REPLACE INTO {FINGERPRINT_TABLE} (id, fingerprint, recorded_at) "
+        "VALUES (1, ?, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))",
+        (fingerprint,),
+    )
+
+
+def clear_schema_fingerprint(connection) -> None:
+    """Force the full startup checks on the next launch (e.g. after an out-of-band migration)."""
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FINGERPRINT_TABLE}")
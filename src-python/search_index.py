@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, inspect as sa_inspect, select, text
+
+from models import Customer, InventoryItem, Invoice, Project
+
+# FTS5 table over the searchable text of customers, projects, invoices and inventory items.
+# Each entry's rowid is <row primary key> * ROWID_STRIDE + <kind code>, so an entry is
+# found (and replaced) by rowid without a lookup table, and a hit maps straight back to its row.
+SEARCH_TABLE = "search_index"
+ROWID_STRIDE = 8
+# Primary keys per re-index batch after a bulk write, well under SQLite's bound-parameter limit.
+REINDEX_CHUNK = 500
+# bm25 column weights: a hit in the title (name, location, number) outranks one in the body.
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# --- Arabic-aware folding ---
+# unicode61 only lower-cases and strips Latin diacritics, so text is folded in Python before it
+# is indexed and before it is queried: harakat and tatweel go, hamza/alef/yaa/taa-marbuta
+# variants collapse to one letter, Eastern digits become ASCII and the definite article is dropped.
+
+# Harakat, Quranic annotation marks, superscript alef and tatweel.
+_ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_LETTERS = str.maketrans({
+    "\u0622": "\u0627",  # alef with madda -> alef
+    "\u0623": "\u0627",  # alef with hamza above -> alef
+    "\u0625": "\u0627",  # alef with hamza below -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0649": "\u064a",  # alef maksura -> yaa
+    "\u0626": "\u064a",  # yaa with hamza -> yaa
+    "\u0624": "\u0648",  # waw with hamza -> waw
+    "\u0629": "\u0647",  # taa marbuta -> haa
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+    **{chr(0x06f0 + d): str(d) for d in range(10)},  # Extended (Persian) digits
+})
+_ARTICLE = "\u0627\u0644"  # definite article (al-)
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def fold(text: Optional[str]) -> str:
+    """Normalize text for indexing and matching (both sides must go through this)."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text))
+    text = _ARABIC_MARKS.sub("", text).translate(_ARABIC_LETTERS).casefold()
+    tokens = []
+    for token in _TOKEN.findall(text):
+        if token.startswith(_ARTICLE) and len(token) > len(_ARTICLE) + 1:
+            token = token[len(_ARTICLE):]
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+def _digits(text: Optional[str]) -> str:
+    """Phone numbers are also indexed without separators, so "249912" finds "+249 912 345 678"."""
+    digits = re.sub(r"\D", "", fold(text).replace(" ", ""))
+    return digits if len(digits) >= 4 else ""
+
+
+# --- What is indexed ---
+
+@dataclass(frozen=True)
+class SearchSource:
+    kind: str
+    code: int
+    model: type
+    title: Callable[[object], str]
+    body: Callable[[object], str]
+
+    @property
+    def pk(self):
+        return sa_inspect(self.model).primary_key[0]
+
+
+SEARCH_SOURCES: Tuple[SearchSource, ...] = (
+    SearchSource(
+        "customers", 1, Customer,
+        title=lambda r: r.full_name,
+        body=lambda r: " ".join(filter(None, (r.phone_number, _digits(r.phone_number), r.email))),
+    ),
+    SearchSource(
+        "projects", 2, Project,
+        title=lambda r: r.project_location,
+        body=lambda r: "",
+    ),
+    SearchSource(
+        "invoices", 3, Invoice,
+        title=lambda r: str(r.invoice_id) if r.invoice_id is not None else "",
+        body=lambda r: r.status,
+    ),
+    SearchSource(
+        "inventory", 4, InventoryItem,
+        title=lambda r: r.name,
+        body=lambda r: " ".join(filter(None, (r.sku, r.brand, r.model))),
+    ),
+)
+SOURCES_BY_KIND: Dict[str, SearchSource] = {source.kind: source for source in SEARCH_SOURCES}
+_SOURCES_BY_MODEL: Dict[type, SearchSource] = {source.model: source for source in SEARCH_SOURCES}
+# Attributes whose change requires re-indexing a row.
+_INDEXED_ATTRS = {
+    Customer: ("full_name", "phone_number", "email", "deleted_at"),
+    Project: ("project_location", "deleted_at"),
+    Invoice: ("invoice_id", "status", "deleted_at"),
+    InventoryItem: ("name", "sku", "brand", "model", "deleted_at"),
+}
+
+
+def _rowid(source: SearchSource, pk_value: int) -> int:
+    return int(pk_value) * ROWID_STRIDE + source.code
+
+
+def _entry(source: SearchSource, record) -> Optional[dict]:
+    pk_value = getattr(record, source.pk.key)
+    if pk_value is None or record.deleted_at is not None:
+        return None
+    title = fold(source.title(record))
+    body = fold(source.body(record))
+    if not (title or body):
+        return None
+    return {"rowid": _rowid(source, pk_value), "title": title, "body": body, "kind": source.kind}
+
+
+# --- Maintenance ---
+
+def create_search_index(connection) -> bool:
+    """Create the FTS5 table if it is missing; returns True when it had to be created."""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).first()
+    if exists:
+        return False
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "title, body, kind UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    return True
+
+
+def rebuild_search_index(connection) -> int:
+    """
+    Re-index every row from scratch; returns the number of entries written. Only the primary key
+    and the indexed columns are read, so the Alembic revision can run it against a schema that
+    lacks columns added to the models later.
+    """
+    connection.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    written = 0
+    for source in SEARCH_SOURCES:
+        columns = [source.pk, *(getattr(source.model, attr) for attr in _INDEXED_ATTRS[source.model])]
+        rows = []
+        for record in connection.execute(select(*columns).where(source.model.deleted_at.is_(None))):
+            entry = _entry(source, record)
+            if entry:
+                rows.append(entry)
+        _write(connection, rows)
+        written += len(rows)
+    return written
+
+
+def _write(connection, rows: List[dict]) -> None:
+    if rows:
+        connection.exec_driver_sql(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, body, kind) VALUES (?, ?, ?, ?)",
+            [(r["rowid"], r["title"], r["body"], r["kind"]) for r in rows],
+        )
+
+
+def _delete(connection, rowids: Iterable[int]) -> None:
+    rowids = list(rowids)
+    if rowids:
+        connection.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = ?", [(rowid,) for rowid in rowids])
+
+
+def collect_search_changes(session) -> Optional[Tuple[List[object], List[int]]]:
+    """
+    Rows to (re-)index and rowids to drop for this flush. Called from db_setup's before_flush
+    listener, while attribute history still shows what changed.
+    """
+    upserts, deletes = [], []
+    for instance in session.new:
+        source = _SOURCES_BY_MODEL.get(type(instance))
+        if source is not None:
+            upserts.append(instance)
+    for instance in session.dirty:
+        source = _SOURCES_BY_MODEL.get(type(instance))
+        if source is None:
+            continue
+        state = sa_inspect(instance)
+        if not any(state.attrs[attr].history.has_changes() for attr in _INDEXED_ATTRS[source.model]):
+            continue
+        # A changed primary key leaves the old entry behind; drop it explicitly.
+        for old_pk in state.attrs[source.pk.key].history.deleted or ():
+            if old_pk is not None:
+                deletes.append(_rowid(source, old_pk))
+        upserts.append(instance)
+    for instance in session.deleted:
+        source = _SOURCES_BY_MODEL.get(type(instance))
+        if source is not None and getattr(instance, source.pk.key) is not None:
+            deletes.append(_rowid(source, getattr(instance, source.pk.key)))
+    if not (upserts or deletes):
+        return None
+    return upserts, deletes
+
+
+def apply_search_changes(connection, changes: Tuple[List[object], List[int]]) -> None:
+    """Write the entries collected by collect_search_changes (after the flush: new rows have their keys)."""
+    instances, deletes = changes
+    rows = []
+    for instance in instances:
+        source = _SOURCES_BY_MODEL[type(instance)]
+        entry = _entry(source, instance)
+        if entry:
+            rows.append(entry)
+        elif getattr(instance, source.pk.key) is not None:
+            # Soft-deleted or emptied: it must stop matching.
+            deletes.append(_rowid(source, getattr(instance, source.pk.key)))
+    _delete(connection, deletes)
+    _write(connection, rows)
+
+
+def bulk_search_pks(session, model, statement) -> List[int]:
+    """Primary keys of the indexed rows a bulk UPDATE/DELETE on `model` will touch (query before it runs)."""
+    query = select(_SOURCES_BY_MODEL[model].pk)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    return [pk_value for (pk_value,) in session.execute(query)]
+
+
+def reindex_rows(session, model, pk_values: List[int]) -> None:
+    """
+    Re-index rows written by a bulk statement, reading them back from the database: soft-deleted
+    or removed rows lose their entry. The statement bypassed the identity map, so it is refreshed.
+    """
+    source = _SOURCES_BY_MODEL[model]
+    connection = session.connection()
+    for start in range(0, len(pk_values), REINDEX_CHUNK):
+        chunk = pk_values[start:start + REINDEX_CHUNK]
+        _delete(connection, (_rowid(source, pk_value) for pk_value in chunk))
+        records = session.execute(
+            select(model).where(source.pk.in_(chunk)).execution_options(populate_existing=True)
+        ).scalars()
+        _write(connection, [entry for entry in (_entry(source, record) for record in records) if entry])
+
+
+def is_indexed_model(model) -> bool:
+    return model in _SOURCES_BY_MODEL
+
+
+# --- Querying ---
+
+def match_expression(query: str) -> Optional[str]:
+    """Every folded term must match, as a prefix: 'احمد 0912' -> '"احمد"* AND "0912"*'."""
+    terms = fold(query).split()
+    if not terms:
+        return None
+    return " AND ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_scoped(scoped_query, query: str, kind: str, limit: int) -> List[Tuple[object, float]]:
+    """
+    (record, rank) of the best matches of one kind among the rows `scoped_query` can see, best
+    first (rank is bm25: lower is better). The matches are joined to the scope before LIMIT, so
+    rows the user cannot see never take a slot.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    source = SOURCES_BY_KIND[kind]
+    matches = (
+        text(
+            f"SELECT rowid, bm25({SEARCH_TABLE}, :title_weight, :body_weight) AS rank FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH :expression AND kind = :kind"
+        )
+        .bindparams(title_weight=TITLE_WEIGHT, body_weight=BODY_WEIGHT, expression=expression, kind=kind)
+        .columns(rowid=Integer, rank=Float)
+        .subquery("matches")
+    )
+    rows = (
+        scoped_query
+        .join(matches, source.pk == matches.c.rowid // ROWID_STRIDE)
+        .add_columns(matches.c.rank)
+        .order_by(matches.c.rank)
+        .limit(limit)
+        .all()
+    )
+    return [(record, rank) for record, rank in rows]
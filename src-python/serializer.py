@@ -3,6 +3,7 @@
 from datetime import datetime, date
 import base64
 from sqlalchemy.inspection import inspect
+from blob_store import BlobInfo, ExternalBlob
 
 def serialize_value(value):
     """
@@ -16,7 +17,11 @@ def serialize_value(value):
         return base64.b64encode(value).decode('utf-8')
     return value
 
-def model_to_dict(obj, include_relationships=False, backrefs=False):
+def blob_url(obj, column_name):
+    """Where routes/blob.py streams a blob column of `obj`."""
+    return f"/blobs/{obj.__tablename__}/{obj.uuid}/{column_name}"
+
+def model_to_dict(obj, include_relationships=False, backrefs=False, fields=None):
     """
     Converts a SQLAlchemy model instance into a dictionary.
     
@@ -24,6 +29,7 @@ def model_to_dict(obj, include_relationships=False, backrefs=False):
         obj: SQLAlchemy model instance
         include_relationships: include related objects
         backrefs: include reverse relationships
+        fields: if given, only these column keys are serialized
 
     Returns:
         dict representing the model
@@ -38,7 +44,15 @@ def model_to_dict(obj, include_relationships=False, backrefs=False):
     # Serialize normal columns
     for column in mapper.columns:
         col_name = column.key
+        if fields is not None and col_name not in fields:
+            continue
+        # Blobs are deferred and never inlined; their `<name>_info` column describes them instead.
+        if isinstance(column.type, ExternalBlob):
+            continue
         value = getattr(obj, col_name)
+        if isinstance(column.type, BlobInfo):
+            data[col_name] = {**value, "url": blob_url(obj, column.type.blob_column)} if value else None
+            continue
         data[col_name] = serialize_value(value)
 
     # Serialize relationships if needed
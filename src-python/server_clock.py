@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Online answers are served from cache for this long before a background refresh is started.
+ONLINE_REFRESH_AFTER_SECONDS = 60.0
+# Beyond this age an online measurement is no longer trusted and callers block on a new one.
+ONLINE_MAX_AGE_SECONDS = 600.0
+# Offline answers are re-checked sooner so a restored connection is picked up quickly.
+OFFLINE_REFRESH_AFTER_SECONDS = 5.0
+OFFLINE_MAX_AGE_SECONDS = 15.0
+
+
+def _parse_server_utc(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not isinstance(value, str) or not value:
+        return None
+    s = value.strip()
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(s)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class ClockSample:
+    """
+    One `get_server_utc` measurement.
+    server_utc is pinned to the monotonic clock at the moment the response arrived,
+    so server time can be extrapolated without trusting the (possibly tampered) wall clock.
+    """
+    online: bool
+    server_utc: Optional[datetime]
+    monotonic_at: float
+    round_trip_seconds: float
+
+    def age(self) -> float:
+        return time.monotonic() - self.monotonic_at
+
+    def server_now(self) -> Optional[datetime]:
+        if not self.online or self.server_utc is None:
+            return None
+        # The server stamped its time before the response was received, so this is a lower
+        # bound on the real server time (never ahead of it), which keeps pull windows safe.
+        return self.server_utc + timedelta(seconds=self.age())
+
+
+class ServerClock:
+    """
+    Caches the server/local clock relationship and the connectivity state derived
+    from the `get_server_utc` RPC. Fresh answers come from cache, stale ones trigger
+    a background refresh, and expired ones block on a new measurement.
+    """
+
+    def __init__(self):
+        self._sample: Optional[ClockSample] = None
+        self._lock = threading.Lock()
+        self._measure_lock = threading.Lock()
+        self._refreshing = False
+
+    # --- Measurement ---
+
+    def _fetch_server_utc(self):
+        from supabase_client import get_anon_client  # Deferred to avoid a circular import with utils
+        response = get_anon_client().rpc("get_server_utc", {}).execute()
+        return getattr(response, "data", None)
+
+    def measure(self, unless_fresher_than: Optional[float] = None) -> ClockSample:
+        """
+        Call the RPC now and replace the cached sample. With `unless_fresher_than`, a sample
+        stored by a concurrent caller while we waited for the lock is reused instead.
+        """
+        with self._measure_lock:
+            if unless_fresher_than is not None:
+                with self._lock:
+                    current = self._sample
+                if current is not None and current.age() <= unless_fresher_than:
+                    return current
+            started = time.monotonic()
+            try:
+                server_utc = _parse_server_utc(self._fetch_server_utc())
+            except Exception as e:
+                print(f"Connectivity check failed: Could not connect to Supabase. Error: {e}")
+                server_utc = None
+            received = time.monotonic()
+            sample = ClockSample(
+                online=server_utc is not None,
+                server_utc=server_utc,
+                monotonic_at=received,
+                round_trip_seconds=received - started,
+            )
+            with self._lock:
+                self._sample = sample
+            return sample
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.measure()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="server-clock-refresh", daemon=True).start()
+
+    def sample(self) -> ClockSample:
+        """Return a usable sample, refreshing it in the background or synchronously as needed."""
+        with self._lock:
+            sample = self._sample
+        if sample is None:
+            return self.measure(unless_fresher_than=OFFLINE_REFRESH_AFTER_SECONDS)
+
+        age = sample.age()
+        refresh_after = ONLINE_REFRESH_AFTER_SECONDS if sample.online else OFFLINE_REFRESH_AFTER_SECONDS
+        max_age = ONLINE_MAX_AGE_SECONDS if sample.online else OFFLINE_MAX_AGE_SECONDS
+        if age > max_age:
+            return self.measure(unless_fresher_than=refresh_after)
+        if age > refresh_after:
+            self._refresh_in_background()
+        return sample
+
+    def invalidate(self):
+        """Drop the cached sample so the next caller measures again."""
+        with self._lock:
+            self._sample = None
+
+    # --- Queries ---
+
+    def is_online(self) -> bool:
+        return self.sample().online
+
+    def server_now(self) -> Optional[datetime]:
+        """Current server UTC time, or None when the server is unreachable."""
+        return self.sample().server_now()
+
+    def offset_seconds(self) -> Optional[float]:
+        """Server time minus local wall-clock time, or None when offline."""
+        server_now = self.server_now()
+        if server_now is None:
+            return None
+        return (server_now - datetime.now(timezone.utc)).total_seconds()
+
+
+server_clock = ServerClock()
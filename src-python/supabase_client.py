@@ -1,10 +1,11 @@
+from __future__ import annotations
+
 import os
 import sys
-from dotenv import load_dotenv
+import threading
+from typing import TYPE_CHECKING, Optional
 
-# Apply Pydantic/PostGREST bootstrap patch early before importing supabase or postgrest
-from pydantic_postgrest_bootstrap import apply_postgrest_pydantic_bootstrap
-apply_postgrest_pydantic_bootstrap()
+from dotenv import load_dotenv
 
 # Try to find the .env from candidate paths
 env_candidates = [
@@ -17,11 +18,13 @@ for env_path in env_candidates:
         load_dotenv(env_path)
         break
 
-from supabase import create_client, Client, ClientOptions
 from utils import get_db
 import models
 from runtime_env import is_compiled_runtime
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 
 
 # These are safe to ship (project URL + publishable anon key).
@@ -34,30 +37,51 @@ url: str = os.getenv("SUPABASE_URL") or DEFAULT_SUPABASE_URL
 anon_key: str = os.getenv("SUPABASE_KEY") or DEFAULT_SUPABASE_ANON_KEY
 service_role_key: str = os.getenv("SERVICE_ROLE_KEY") or DEFAULT_SUPABASE_SRK_KEY
 
-# =================================================================
-# CORRECTION: Explicit Supabase-py Engine Timeout Mapping
-# =================================================================
-options_object = ClientOptions(
-    postgrest_client_timeout=10,  # Limits data table requests
-    storage_client_timeout=10,    # Limits asset calculations
-    schema="public"
-)
-
-# SINGLETON INSTANCES: Initialized once globally to preserve persistent TCP connections
-_anon_client_singleton: Client = create_client(url, anon_key, options=options_object)
-_srk_client_singleton: Client = None
-
-if service_role_key:
-    _srk_client_singleton = create_client(url, service_role_key, options=options_object)
+# The supabase package (PostgREST, storage, pyiceberg, ...) takes about a second to import,
+# so it is loaded and both clients are built on first use instead of delaying BACKEND_READY.
+_clients_lock = threading.Lock()
+_anon_client_singleton: Optional[Client] = None
+_srk_client_singleton: Optional[Client] = None
+_clients_ready = False
+
+
+def _ensure_clients() -> None:
+    global _anon_client_singleton, _srk_client_singleton, _clients_ready
+    if _clients_ready:
+        return
+    with _clients_lock:
+        if _clients_ready:
+            return
+        # Apply Pydantic/PostGREST bootstrap patch before importing supabase or postgrest
+        from pydantic_postgrest_bootstrap import apply_postgrest_pydantic_bootstrap
+        apply_postgrest_pydantic_bootstrap()
+        from supabase import create_client, ClientOptions
+
+        # =================================================================
+        # CORRECTION: Explicit Supabase-py Engine Timeout Mapping
+        # =================================================================
+        options_object = ClientOptions(
+            postgrest_client_timeout=10,  # Limits data table requests
+            storage_client_timeout=10,    # Limits asset calculations
+            schema="public"
+        )
+
+        # SINGLETON INSTANCES: Initialized once to preserve persistent TCP connections
+        _anon_client_singleton = create_client(url, anon_key, options=options_object)
+        if service_role_key:
+            _srk_client_singleton = create_client(url, service_role_key, options=options_object)
+        _clients_ready = True
 
 
 def get_service_role_client() -> Client:
+    _ensure_clients()
     if not _srk_client_singleton:
         raise ValueError("SERVICE_ROLE_KEY environment variable not set.")
     return _srk_client_singleton
 
 
 def get_anon_client() -> Client:
+    _ensure_clients()
     return _anon_client_singleton
 
 
@@ -75,6 +99,7 @@ def get_user_client(auth_entry=None) -> Client:
                 .first()
             )
 
+    _ensure_clients()
     if auth_entry and auth_entry.current_jwt:
         # OPTIMIZATION: Instead of reconstructing an expensive base client,
         # intercept and swap the active Authorization bearer token directly
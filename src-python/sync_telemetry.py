@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import models
+
+# Older runs (and their per-table rows) are pruned once this many are stored.
+SYNC_TELEMETRY_RETENTION_RUNS = 200
+PERCENTILES = (50, 90, 99)
+
+
+def payload_bytes(data) -> int:
+    """Size of a payload as JSON, for transports that don't expose the wire size."""
+    try:
+        return len(json.dumps(data, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class TableMetric:
+    table_name: str
+    phase: str
+    rows: int = 0
+    bytes: int = 0
+    rpc_ms: float = 0.0
+    merge_ms: float = 0.0
+    blob_upload_ms: float = 0.0
+    blob_uploads: int = 0
+    failures: int = 0
+    error: Optional[str] = None
+
+    @property
+    def total_ms(self) -> float:
+        return self.rpc_ms + self.merge_ms + self.blob_upload_ms
+
+
+class SyncTelemetry:
+    """
+    Collects per-table, per-phase metrics for one sync run.
+    push_to_supabase/pull_from_supabase fill it in when one is passed; the /sync route
+    persists it next to SyncLog so /sync_logs/metrics can aggregate recent runs.
+    """
+
+    def __init__(self, lanes: Iterable[str] = ()):
+        self.lanes = tuple(lanes)
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._tables: Dict[Tuple[str, str], TableMetric] = {}
+
+    def table(self, phase: str, table_name: str) -> TableMetric:
+        key = (phase, table_name)
+        metric = self._tables.get(key)
+        if metric is None:
+            metric = self._tables[key] = TableMetric(table_name=table_name, phase=phase)
+        return metric
+
+    def record_failure(self, phase: str, table_name: str, error) -> None:
+        metric = self.table(phase, table_name)
+        metric.failures += 1
+        metric.error = str(error)[:500]
+
+    def duration_seconds(self) -> float:
+        return time.perf_counter() - self._started
+
+    def persist(self, db, user_uuid: str, status: str, error: Optional[str] = None) -> models.SyncRun:
+        run = models.SyncRun(
+            user_uuid=user_uuid,
+            status=status,
+            lanes=",".join(self.lanes) or None,
+            started_at=self.started_at.replace(tzinfo=None),
+            duration_ms=self.duration_seconds() * 1000.0,
+            error=(str(error)[:500] if error else None),
+            is_dirty=False,
+        )
+        run.table_metrics = [
+            models.SyncTableMetric(
+                table_name=m.table_name,
+                phase=m.phase,
+                rows=m.rows,
+                bytes=m.bytes,
+                rpc_ms=m.rpc_ms,
+                merge_ms=m.merge_ms,
+                blob_upload_ms=m.blob_upload_ms,
+                blob_uploads=m.blob_uploads,
+                failures=m.failures,
+                error=m.error,
+                is_dirty=False,
+            )
+            for m in self._tables.values()
+            # Tables with nothing to do add noise to every percentile.
+            if m.rows or m.failures or m.blob_uploads
+        ]
+        db.add(run)
+        db.flush()
+        _prune_old_runs(db)
+        db.commit()
+        return run
+
+
+def _prune_old_runs(db) -> None:
+    cutoff = (
+        db.query(models.SyncRun.sync_run_id)
+        .order_by(models.SyncRun.sync_run_id.desc())
+        .offset(SYNC_TELEMETRY_RETENTION_RUNS)
+        .limit(1)
+        .scalar()
+    )
+    if cutoff is None:
+        return
+    stale = [u for (u,) in db.query(models.SyncRun.uuid).filter(models.SyncRun.sync_run_id <= cutoff).all()]
+    db.query(models.SyncTableMetric).filter(models.SyncTableMetric.sync_run_uuid.in_(stale)).delete(synchronize_session=False)
+    db.query(models.SyncRun).filter(models.SyncRun.sync_run_id <= cutoff).delete(synchronize_session=False)
+
+
+# --- Aggregation for /sync_logs/metrics ---
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(len(sorted_values) * pct / 100))
+    return sorted_values[rank - 1]
+
+
+def distribution(values: Iterable[float]) -> dict:
+    ordered = sorted(v or 0 for v in values)
+    summary = {f"p{p}": percentile(ordered, p) for p in PERCENTILES}
+    summary["max"] = ordered[-1] if ordered else None
+    summary["total"] = sum(ordered)
+    return summary
+
+
+def summarize_runs(runs: List[models.SyncRun]) -> dict:
+    """Percentiles over the given runs, overall and per (phase, table), busiest tables first."""
+    grouped: Dict[Tuple[str, str], List[models.SyncTableMetric]] = {}
+    for run in runs:
+        for metric in run.table_metrics:
+            grouped.setdefault((metric.phase, metric.table_name), []).append(metric)
+
+    total_table_ms = sum(
+        (m.rpc_ms or 0) + (m.merge_ms or 0) + (m.blob_upload_ms or 0)
+        for metrics in grouped.values() for m in metrics
+    )
+    tables = []
+    for (phase, table_name), metrics in grouped.items():
+        total_ms = [(m.rpc_ms or 0) + (m.merge_ms or 0) + (m.blob_upload_ms or 0) for m in metrics]
+        tables.append({
+            "table_name": table_name,
+            "phase": phase,
+            "samples": len(metrics),
+            "share_of_sync_time": (sum(total_ms) / total_table_ms) if total_table_ms else 0.0,
+            "total_ms": distribution(total_ms),
+            "rpc_ms": distribution(m.rpc_ms for m in metrics),
+            "merge_ms": distribution(m.merge_ms for m in metrics),
+            "blob_upload_ms": distribution(m.blob_upload_ms for m in metrics),
+            "rows": distribution(m.rows for m in metrics),
+            "bytes": distribution(m.bytes for m in metrics),
+            "blob_uploads": sum(m.blob_uploads or 0 for m in metrics),
+            "failures": sum(m.failures or 0 for m in metrics),
+        })
+    tables.sort(key=lambda t: t["total_ms"]["total"], reverse=True)
+
+    return {
+        "runs": len(runs),
+        "failed_runs": sum(1 for r in runs if r.status == "failed"),
+        "duration_ms": distribution(r.duration_ms for r in runs),
+        "tables": tables,
+    }
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+End-to-end sync benchmark against a local Supabase stand-in.
+
+Runs push_to_supabase and pull_from_supabase from routes/sync_log.py unchanged,
+pointed at an in-memory fake (separate process) that implements the RPCs and
+storage endpoints the sync uses: get_server_utc, sync_apply_and_pull,
+pull_changes, get_sync_cursor, set_sync_cursor and object upload.
+
+For every size, a fresh local DB is seeded with N rows per benchmarked table and
+these phases are measured:
+  push              every seeded row is dirty and pushed
+  pull (cold)       local rows and cursor dropped, everything pulled back in
+  pull (no changes) cursor is current, nothing to merge
+
+Each phase reports records/sec, round trips, bytes sent/received and the peak
+RSS growth of the sync process. Each size runs in its own subprocess so peak
+memory from one size doesn't leak into the next.
+
+Usage examples:
+  python src-python/test/bench_sync_e2e.py
+  python src-python/test/bench_sync_e2e.py --rows 1000 10000 100000
+  python src-python/test/bench_sync_e2e.py --rows 10000 --blob-rows 500 --blob-bytes 65536
+  SSC_SYNC_PIPELINE=0 python src-python/test/bench_sync_e2e.py --rows 10000
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Ensure src-python is on sys.path for imports when running from repo root.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PYTHON_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
+if SRC_PYTHON_DIR not in sys.path:
+    sys.path.insert(0, SRC_PYTHON_DIR)
+
+BENCH_TABLES = ["customers", "projects", "invoices", "payments", "inventory_items", "documents"]
+
+
+# --- Local Supabase stand-in ---
+
+def _parse_ts(value):
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class FakeSupabase:
+    """Row store and request counters shared by the handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.objects = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"round_trips": {}, "bytes_in": 0, "bytes_out": 0, "records_in": 0, "records_out": 0}
+
+    def count(self, endpoint, bytes_in, bytes_out):
+        with self.lock:
+            trips = self.stats["round_trips"]
+            trips[endpoint] = trips.get(endpoint, 0) + 1
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+
+    def rpc(self, fn, params):
+        if fn == "get_server_utc":
+            return datetime.now(timezone.utc).isoformat()
+        if fn == "sync_apply_and_pull":
+            records = params.get("p_records") or []
+            with self.lock:
+                table = self.tables.setdefault(params["p_table_name"], {})
+                for record in records:
+                    table[record["id"]] = record
+                self.stats["records_in"] += len(records)
+            return {"confirmed_ids": [r["id"] for r in records], "failures": []}
+        if fn == "pull_changes":
+            since = _parse_ts(params["p_last_sync_timestamp"])
+            until = _parse_ts(params["p_high_water_mark"])
+            with self.lock:
+                rows = list(self.tables.get(params["p_table_name"], {}).values())
+            out = [r for r in rows if since < _parse_ts(r.get("updated_at")) <= until]
+            with self.lock:
+                self.stats["records_out"] += len(out)
+            return out
+        if fn in ("get_sync_cursor", "set_sync_cursor"):
+            return None
+        raise KeyError(fn)
+
+
+def _make_handler(fake: FakeSupabase):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body, endpoint, bytes_in):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            if endpoint:
+                fake.count(endpoint, bytes_in, len(data))
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/__bench/stats":
+                with fake.lock:
+                    stats = fake.stats
+                    fake.reset_stats()
+                return self._reply(200, stats, None, 0)
+            # Table reads made at startup (inventory categories) get a transient error,
+            # which sends the app down its local-cache fallback.
+            return self._reply(503, {"message": "Not served by the benchmark stand-in", "code": "PGRST000"}, "GET " + path, 0)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length)
+            path = urlparse(self.path).path
+            if path.startswith("/rest/v1/rpc/"):
+                fn = path.rsplit("/", 1)[-1]
+                try:
+                    body = fake.rpc(fn, json.loads(raw or b"{}"))
+                except KeyError:
+                    return self._reply(404, {"message": f"Unknown function {fn}", "code": "PGRST202"}, "rpc/" + fn, len(raw))
+                return self._reply(200, body, "rpc/" + fn, len(raw))
+            if path.startswith("/storage/v1/object/"):
+                key = path[len("/storage/v1/object/"):]
+                with fake.lock:
+                    fake.objects[key] = len(raw)
+                return self._reply(200, {"Key": key}, "storage/upload", len(raw))
+            return self._reply(404, {"message": "Not found"}, "POST " + path, len(raw))
+
+    return Handler
+
+
+def _serve(port_queue):
+    fake = FakeSupabase()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(fake))
+    server.daemon_threads = True
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def _fetch_stats(base_url):
+    import httpx
+    return httpx.get(f"{base_url}/__bench/stats", timeout=30).json()
+
+
+# --- Peak memory ---
+
+class PeakRss:
+    """Samples this process's RSS on a background thread and keeps the maximum."""
+
+    def __init__(self, interval=0.005):
+        import psutil
+        self._process = psutil.Process()
+        self._interval = interval
+
+    def __enter__(self):
+        self.start = self._process.memory_info().rss
+        self.peak = self.start
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            time.sleep(self._interval)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._process.memory_info().rss)
+
+    @property
+    def growth_mib(self):
+        return (self.peak - self.start) / (1024 * 1024)
+
+
+# --- Seeding ---
+
+def _seed(db, models, user_uuid, rows, blob_rows, blob_bytes):
+    from sqlalchemy import insert
+
+    now = datetime.utcnow() - timedelta(seconds=5)
+    blob = os.urandom(blob_bytes)
+
+    def base():
+        return {"uuid": str(uuid.uuid4()), "created_at": now, "updated_at": now, "is_dirty": True}
+
+    customers = [{**base(), "full_name": f"Customer {i}", "phone_number": f"+2499{i:08d}", "user_uuid": user_uuid} for i in range(rows)]
+    projects = [{**base(), "customer_uuid": c["uuid"], "status": "planning", "user_uuid": user_uuid, "project_location": "Khartoum"} for c in customers]
+    invoices = [{**base(), "project_uuid": p["uuid"], "user_uuid": user_uuid, "amount": 1250.5, "status": "pending", "issued_at": now,
+                 "invoice_details": {"due_date": "2025-01-31"}, "invoice_items": {"inventory": []}} for p in projects]
+    payments = [{**base(), "invoice_uuid": inv["uuid"], "created_by_user_uuid": user_uuid, "amount": 100.0, "method": "cash",
+                 "payment_reference": f"REF-{i}", "payment_date": now} for i, inv in enumerate(invoices)]
+    items = [{**base(), "user_uuid": user_uuid, "name": f"Panel {i}", "sku": f"SKU-{i}", "brand": "Jinko", "model": "Tiger",
+              "technical_specs": {"panel_rated_power": 550}, "quantity_on_hand": 10, "buy_price": 90.0, "sell_price": 120.0} for i in range(rows)]
+    documents = [{**base(), "project_uuid": p["uuid"], "doc_type": "Invoice", "file_name": f"invoice_{i}.pdf", "file_blob": blob}
+                 for i, p in enumerate(projects[:blob_rows])]
+
+    for model, batch in ((models.Customer, customers), (models.Project, projects), (models.Invoice, invoices),
+                         (models.Payment, payments), (models.InventoryItem, items), (models.Document, documents)):
+        if batch:
+            db.execute(insert(model), batch)
+    db.commit()
+
+
+def _drop_local_rows(db, models):
+    from sqlalchemy import delete
+
+    for model in (models.Document, models.Payment, models.Invoice, models.InventoryItem, models.Project, models.Customer, models.SyncState):
+        db.execute(delete(model))
+    db.commit()
+
+
+# --- One benchmark size (runs in its own process) ---
+
+def run_size(rows, blob_rows, blob_bytes, app_output=False):
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    server = ctx.Process(target=_serve, args=(port_queue,), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+
+    # Point the app at the fake and at a throwaway DB before any app module is imported.
+    os.environ["SUPABASE_URL"] = base_url
+    os.environ.setdefault("SERVICE_ROLE_KEY", "bench-service-role-key")
+    os.environ["SSC_DB_DIR"] = tempfile.mkdtemp(prefix="ssc-bench-e2e-")
+
+    try:
+        import models
+        from db_setup import SessionLocal, create_db_and_tables
+        from routes.sync_log import pull_from_supabase, push_to_supabase
+
+        create_db_and_tables()
+        db = SessionLocal()
+        user = models.User(username="bench", email="bench@example.com", role="standard", is_dirty=False)
+        db.add(user)
+        db.commit()
+        user_uuid = user.uuid
+        auth = models.Authentication(user_uuid=user.uuid, password_hash="h", password_salt="s", current_jwt="bench-jwt",
+                                     jwt_issued_at=datetime.utcnow(), is_logged_in=True, last_active=datetime.utcnow(), is_dirty=False)
+        db.add(auth)
+        db.commit()
+
+        seed_start = time.perf_counter()
+        _seed(db, models, user_uuid, rows, min(blob_rows, rows), blob_bytes)
+        seed_seconds = time.perf_counter() - seed_start
+        _fetch_stats(base_url)  # Discard anything counted during startup.
+
+        results = []
+
+        def measure(name, fn, record_key):
+            # The sync prints per-table progress; keep it out of the report unless asked for.
+            sink = contextlib.nullcontext() if app_output else contextlib.redirect_stdout(open(os.devnull, "w"))
+            with sink, PeakRss() as rss:
+                start = time.perf_counter()
+                fn()
+                seconds = time.perf_counter() - start
+            stats = _fetch_stats(base_url)
+            records = stats[record_key]
+            results.append({
+                "phase": name,
+                "records": records,
+                "seconds": seconds,
+                "records_per_sec": records / seconds if seconds else 0.0,
+                "round_trips": sum(stats["round_trips"].values()),
+                "round_trips_by_endpoint": stats["round_trips"],
+                "bytes_sent": stats["bytes_in"],
+                "bytes_received": stats["bytes_out"],
+                "peak_rss_growth_mib": rss.growth_mib,
+            })
+
+        measure("push", lambda: push_to_supabase(db, auth_record=auth), "records_in")
+        _drop_local_rows(db, models)
+        db.expunge_all()
+        auth = db.query(models.Authentication).filter_by(user_uuid=user_uuid).first()
+        measure("pull (cold)", lambda: pull_from_supabase(db, auth_record=auth), "records_out")
+        measure("pull (no changes)", lambda: pull_from_supabase(db, auth_record=auth), "records_out")
+        db.close()
+        return {"rows": rows, "seed_seconds": seed_seconds, "phases": results}
+    finally:
+        server.terminate()
+        server.join()
+
+
+# --- Reporting ---
+
+def _print_report(report, verbose):
+    print(f"\n=== {report['rows']} rows per table ({', '.join(BENCH_TABLES)}; seeded in {report['seed_seconds']:.1f}s) ===")
+    print(f"  {'phase':<18} {'records':>9} {'seconds':>9} {'rec/s':>10} {'trips':>7} {'sent MiB':>9} {'recv MiB':>9} {'peak RSS +MiB':>14}")
+    for p in report["phases"]:
+        print(f"  {p['phase']:<18} {p['records']:>9} {p['seconds']:>9.2f} {p['records_per_sec']:>10.0f} {p['round_trips']:>7} "
+              f"{p['bytes_sent'] / 1048576:>9.2f} {p['bytes_received'] / 1048576:>9.2f} {p['peak_rss_growth_mib']:>14.1f}")
+        if verbose:
+            for endpoint, count in sorted(p["round_trips_by_endpoint"].items()):
+                print(f"      {endpoint:<32} {count:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark push/pull sync end to end against a local Supabase stand-in.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000], help="Rows per table; one run per value.")
+    parser.add_argument("--blob-rows", type=int, default=1000, help="Cap on seeded documents carrying a file blob.")
+    parser.add_argument("--blob-bytes", type=int, default=16384, help="Size of each document blob.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results instead of a table.")
+    parser.add_argument("--verbose", action="store_true", help="Break round trips down per endpoint and show the sync's own output.")
+    args = parser.parse_args()
+
+    pipeline = os.getenv("SSC_SYNC_PIPELINE", "1")
+    if len(args.rows) == 1:
+        reports = [run_size(args.rows[0], args.blob_rows, args.blob_bytes, app_output=args.verbose)]
+    else:
+        # One subprocess per size keeps the DB, caches and peak RSS independent.
+        reports = []
+        for rows in args.rows:
+            cmd = [sys.executable, os.path.abspath(__file__), "--rows", str(rows),
+                   "--blob-rows", str(args.blob_rows), "--blob-bytes", str(args.blob_bytes), "--json"]
+            out = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, text=True).stdout
+            reports.append(json.loads(out.strip().splitlines()[-1]))
+
+    if args.json:
+        for report in reports:
+            print(json.dumps(report))
+        return
+    print(f"SSC_SYNC_PIPELINE={pipeline}")
+    for report in reports:
+        _print_report(report, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
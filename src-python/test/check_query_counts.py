@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+N+1 regression check for the list endpoints.
+
+Seeds a scratch database with --rows customers (each with a project, an invoice with
+payments, an inventory item with a stock adjustment and a sync log), counts the SQL
+statements each list endpoint executes, then doubles the data and counts again. An
+endpoint whose statement count grows with the row count is issuing per-row queries
+(lazy loads, per-row aggregates) and fails the check.
+
+Each endpoint is requested once before counting so the cached auth context is warm
+and only the listing itself is measured.
+
+Usage examples:
+  python src-python/test/check_query_counts.py
+  python src-python/test/check_query_counts.py --rows 50 --verbose
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Ensure src-python is on sys.path for imports when running from repo root.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PYTHON_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
+if SRC_PYTHON_DIR not in sys.path:
+    sys.path.insert(0, SRC_PYTHON_DIR)
+
+# Keep the check away from the real local database and the real Supabase project.
+os.environ.setdefault("SSC_DB_DIR", tempfile.mkdtemp(prefix="ssc-query-counts-"))
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SERVICE_ROLE_KEY", "check-service-role-key")
+
+from sqlalchemy import event
+
+LIST_ENDPOINTS = [
+    "/projects/",
+    "/invoices/",
+    "/inventory/items",
+    "/inventory/adjustments/history",
+    "/customers/",
+    "/sync_logs/",
+]
+
+
+class StatementCounter:
+    """Counts statements executed on the given engines while active."""
+
+    def __init__(self, *engines):
+        self.lock = threading.Lock()
+        self.active = False
+        self.statements = []
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            if self.active:
+                self.statements.append(statement)
+
+    @contextlib.contextmanager
+    def counting(self):
+        with self.lock:
+            self.statements = []
+            self.active = True
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.active = False
+
+
+def seed(user_uuid: str, start: int, count: int) -> None:
+    import models
+    from utils import get_db
+
+    base = datetime(2025, 1, 1)
+    with get_db() as db:
+        for n in range(start, start + count):
+            created_at = base + timedelta(minutes=n)
+            customer = models.Customer(full_name=f"Customer {n}", user_uuid=user_uuid)
+            db.add(customer)
+            db.flush()
+            project = models.Project(customer_uuid=customer.uuid, user_uuid=user_uuid, status="planning",
+                                     project_location=f"Location {n}", created_at=created_at)
+            db.add(project)
+            db.flush()
+            invoice = models.Invoice(project_uuid=project.uuid, user_uuid=user_uuid, amount=100, status="pending",
+                                     created_at=created_at)
+            db.add(invoice)
+            db.flush()
+            db.add_all([models.Payment(invoice_uuid=invoice.uuid, amount=10, method="cash") for _ in range(2)])
+            item = models.InventoryItem(name=f"Item {n}", user_uuid=user_uuid)
+            db.add(item)
+            db.flush()
+            db.add(models.StockAdjustment(item_uuid=item.uuid, user_uuid=user_uuid, adjustment=1, reason="restock",
+                                          created_at=created_at))
+            db.add(models.SyncLog(sync_type="full", table_name="customers", status="success", user_uuid=user_uuid))
+        db.commit()
+
+
+def measure(client, counter, url: str):
+    client.get(url)  # warm the auth context
+    with counter.counting():
+        response = client.get(url)
+    if response.status_code != 200:
+        raise SystemExit(f"{url} answered {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return len(response.get_json()), list(counter.statements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail if a list endpoint runs per-row queries.")
+    parser.add_argument("--rows", type=int, default=20, help="Rows per table in the first round (doubled in the second).")
+    parser.add_argument("--verbose", action="store_true", help="Print the statements of endpoints that fail.")
+    args = parser.parse_args()
+
+    # Importing the app prints its startup banner; keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main as app_main
+    import models
+    from db_setup import engine, read_engine
+    from utils import get_db
+
+    with get_db() as db:
+        user = models.User(username="counts", email="counts@example.com", role="standard")
+        db.add(user)
+        db.flush()
+        db.add(models.Authentication(user_uuid=user.uuid, password_hash="h", password_salt="s", is_logged_in=True,
+                                     device_id="check-device", last_active=datetime.utcnow()))
+        db.commit()
+        user_uuid = user.uuid
+
+    counter = StatementCounter(engine, read_engine)
+    client = app_main.app.test_client()
+
+    seed(user_uuid, 0, args.rows)
+    first = {url: measure(client, counter, url) for url in LIST_ENDPOINTS}
+    seed(user_uuid, args.rows, args.rows)
+    second = {url: measure(client, counter, url) for url in LIST_ENDPOINTS}
+
+    failures = 0
+    for url in LIST_ENDPOINTS:
+        (rows_a, statements_a), (rows_b, statements_b) = first[url], second[url]
+        grows = len(statements_b) > len(statements_a)
+        failures += grows
+        print(f"{'FAIL' if grows else 'ok  '}  {url:<32} {rows_a:>5} rows: {len(statements_a):>3} statements   "
+              f"{rows_b:>5} rows: {len(statements_b):>3} statements")
+        if grows and args.verbose:
+            for statement in statements_b:
+                print(f"        {' '.join(statement.split())[:160]}")
+
+    if failures:
+        print(f"\n{failures} endpoint{'' if failures == 1 else 's'} ran more statements for more rows.")
+        sys.exit(1)
+    print("\nStatement counts are independent of row count.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for the hottest route and sync queries.
+
+Builds the schema (tables and the indexes declared in models.py) in a scratch SQLite
+database, runs EXPLAIN QUERY PLAN on each query below and exits non-zero if any of
+them reads a table with a full scan. The queries mirror the filters the routes use;
+when a route's filter changes, update its entry here.
+
+The scratch database is empty and un-ANALYZEd, so plans reflect index availability
+rather than data distribution.
+
+Usage examples:
+  python src-python/test/check_query_plans.py
+  python src-python/test/check_query_plans.py --verbose
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+# Ensure src-python is on sys.path for imports when running from repo root.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PYTHON_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
+if SRC_PYTHON_DIR not in sys.path:
+    sys.path.insert(0, SRC_PYTHON_DIR)
+
+# Keep the check away from the real local database.
+os.environ.setdefault("SSC_DB_DIR", tempfile.mkdtemp(prefix="ssc-plans-"))
+
+from sqlalchemy import and_, create_engine, func, or_, select, text
+from sqlalchemy.dialects import sqlite
+
+import finance_rollups
+import invoice_balances
+import models
+from models import (
+    Appliance, ApplicationSettings, Authentication, Branch, Customer, Document, FinanceDailyRollup, InventoryItem,
+    InventoryValueRollup, Invoice, Payment, Project, ProjectComponent, StockAdjustment, Subscription, SubscriptionPayment, SyncDirtyColumns,
+    SyncLaneCursor, SyncState, User,
+)
+
+U = "00000000-0000-4000-8000-000000000001"
+ORG = "00000000-0000-4000-8000-000000000002"
+BRANCH = "00000000-0000-4000-8000-000000000003"
+PARENT = "00000000-0000-4000-8000-000000000004"
+DAY, NEXT_DAY = "2025-01-01", "2025-01-02"
+
+
+def _with_literals(sql: str, *values) -> str:
+    """Fill a raw statement's ? placeholders in order (EXPLAIN needs no real parameters)."""
+    for value in values:
+        sql = sql.replace("?", f"'{value}'", 1)
+    return sql
+
+# Synced models, for the push queries (`_scoped_records` with dirty_only=True).
+PUSHED_MODELS = (
+    models.Organization, Branch, User, Authentication, Customer, models.SystemConfiguration, Project,
+    InventoryItem, StockAdjustment, ProjectComponent, Appliance, Subscription, Invoice, Payment,
+    SubscriptionPayment, Document, ApplicationSettings, models.SyncLog,
+)
+
+
+def route_queries():
+    """(label, statement) pairs; each must be answerable without a full table scan."""
+    queries = [
+        ("customers: list (user)",
+         select(Customer).where(Customer.deleted_at.is_(None), Customer.user_uuid == U)),
+        ("customers: list (branch)",
+         select(Customer).where(Customer.organization_uuid == ORG, Customer.branch_uuid == BRANCH, Customer.deleted_at.is_(None))),
+        ("customers: project stats",
+         select(Project.customer_uuid, Project.status, func.count(Project.project_id))
+         .where(Project.customer_uuid.in_([PARENT]), Project.deleted_at.is_(None))
+         .group_by(Project.customer_uuid, Project.status)),
+        ("projects: list (user)",
+         select(Project).outerjoin(Invoice, Invoice.project_uuid == Project.uuid)
+         .where(Project.user_uuid == U).order_by(Project.created_at.desc())),
+        ("projects: list (admin)",
+         select(Project).outerjoin(Invoice, Invoice.project_uuid == Project.uuid)
+         .where(Project.organization_uuid == ORG, or_(Project.branch_uuid == BRANCH, Invoice.issued_at.isnot(None)))
+         .order_by(Project.created_at.desc())),
+        ("projects: list (employee)",
+         select(Project).outerjoin(Invoice, Invoice.project_uuid == Project.uuid)
+         .where(Project.organization_uuid == ORG, Project.branch_uuid == BRANCH,
+                or_(Project.user_uuid == U, Invoice.issued_at.isnot(None)))
+         .order_by(Project.created_at.desc())),
+        ("projects: invoice of project",
+         select(Invoice).where(Invoice.project_uuid == PARENT, Invoice.deleted_at.is_(None))),
+        ("projects: appliances",
+         select(Appliance).where(Appliance.project_uuid == PARENT)),
+        ("projects: documents",
+         select(Document).where(Document.project_uuid == PARENT)),
+        ("projects: components",
+         select(ProjectComponent).where(ProjectComponent.project_uuid == PARENT)),
+        ("invoices: list (user)",
+         select(Invoice)
+         .outerjoin(Project, and_(Invoice.project_uuid == Project.uuid, Project.deleted_at.is_(None)))
+         .outerjoin(User, Invoice.user_uuid == User.uuid)
+         .where(Invoice.deleted_at.is_(None), Invoice.user_uuid == U)
+         .order_by(Invoice.created_at.desc())),
+        ("invoices: balance refresh",
+         text(f"{invoice_balances._REFRESH} WHERE invoices.uuid IN ('{PARENT}')")),
+        ("payments: of invoice",
+         select(Payment).where(Payment.invoice_uuid == PARENT)),
+        ("finances: stats (organization)",
+         select(func.sum(FinanceDailyRollup.revenue))
+         .where(FinanceDailyRollup.organization_uuid == ORG, FinanceDailyRollup.branch_uuid == BRANCH,
+                FinanceDailyRollup.day >= DAY, FinanceDailyRollup.day <= NEXT_DAY)),
+        ("finances: stats (user)",
+         select(FinanceDailyRollup.day, func.sum(FinanceDailyRollup.revenue))
+         .where(or_(FinanceDailyRollup.owner_uuid == U, FinanceDailyRollup.issuer_uuid == U),
+                FinanceDailyRollup.day >= DAY, FinanceDailyRollup.day <= NEXT_DAY)
+         .group_by(FinanceDailyRollup.day)),
+        ("finances: inventory value",
+         select(func.sum(InventoryValueRollup.value)).where(InventoryValueRollup.organization_uuid == ORG)),
+        ("finances: day rebuild",
+         text(_with_literals(finance_rollups._DAILY_RANGE, DAY, NEXT_DAY, DAY, NEXT_DAY))),
+        ("finances: inventory group rebuild",
+         text(_with_literals(finance_rollups._INVENTORY_GROUP, ORG, BRANCH))),
+        ("inventory: items (branch)",
+         select(InventoryItem).where(InventoryItem.deleted_at.is_(None), InventoryItem.organization_uuid == ORG,
+                                     InventoryItem.branch_uuid == BRANCH)),
+        ("inventory: items (user)",
+         select(InventoryItem).where(InventoryItem.deleted_at.is_(None), InventoryItem.user_uuid == U)),
+        ("inventory: item adjustments",
+         select(StockAdjustment).where(StockAdjustment.item_uuid == PARENT)),
+        ("inventory: adjustment history (branch)",
+         select(StockAdjustment).join(InventoryItem, StockAdjustment.item_uuid == InventoryItem.uuid)
+         .where(StockAdjustment.deleted_at.is_(None), InventoryItem.deleted_at.is_(None),
+                StockAdjustment.organization_uuid == ORG, StockAdjustment.branch_uuid == BRANCH)
+         .order_by(StockAdjustment.created_at.desc())),
+        ("inventory: adjustment history (user)",
+         select(StockAdjustment).join(InventoryItem, StockAdjustment.item_uuid == InventoryItem.uuid)
+         .where(StockAdjustment.deleted_at.is_(None), InventoryItem.deleted_at.is_(None), StockAdjustment.user_uuid == U)
+         .order_by(StockAdjustment.created_at.desc())),
+        ("users: organization members",
+         select(User).where(User.organization_uuid == ORG)),
+        ("branches: of organization",
+         select(Branch).where(Branch.organization_uuid == ORG, Branch.deleted_at.is_(None))),
+        ("subscriptions: of user",
+         select(Subscription).where(Subscription.user_uuid == U, Subscription.status == "active")),
+        ("subscription payments: of subscription",
+         select(SubscriptionPayment).where(SubscriptionPayment.subscription_uuid == PARENT)),
+        ("settings: of user",
+         select(ApplicationSettings).where(ApplicationSettings.user_uuid == U)),
+        ("authentications: of user",
+         select(Authentication).where(Authentication.user_uuid == U)),
+        ("sync: cursor",
+         select(SyncState).where(SyncState.user_uuid == U, SyncState.device_id == "device")),
+        ("sync: lane cursors",
+         select(SyncLaneCursor).where(SyncLaneCursor.user_uuid == U, SyncLaneCursor.device_id == "device")),
+        ("sync: dirty columns",
+         select(SyncDirtyColumns.row_uuid, SyncDirtyColumns.columns)
+         .where(SyncDirtyColumns.table_name == "invoices", SyncDirtyColumns.row_uuid.in_([PARENT]))),
+    ]
+    for model in PUSHED_MODELS:
+        queries.append((f"sync: dirty {model.__tablename__}", select(model).where(model.is_dirty == True)))
+    return queries
+
+
+# "SCAN projects" is a full scan; "SCAN projects USING INDEX ..." walks an index in order.
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def explain(connection, statement) -> list:
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail if a hot query needs a full table scan.")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan, not just failures.")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(os.environ['SSC_DB_DIR'], 'plans.db')}")
+    models.Base.metadata.create_all(bind=engine)
+
+    failures = 0
+    with engine.connect() as connection:
+        for label, statement in route_queries():
+            plan = explain(connection, statement)
+            scanned = [m.group(1) for m in map(FULL_SCAN.match, plan) if m]
+            if scanned:
+                failures += 1
+            print(f"{'FAIL' if scanned else 'ok  '}  {label}" + (f"  (full scan: {', '.join(scanned)})" if scanned else ""))
+            if scanned or args.verbose:
+                for detail in plan:
+                    print(f"        {detail}")
+
+    if failures:
+        print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} fell back to a full table scan.")
+        sys.exit(1)
+    print("\nAll queries use an index.")
+
+
+if __name__ == "__main__":
+    main()
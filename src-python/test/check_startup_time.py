@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget check for the sidecar.
+
+Launches `main.py --mode prod` --runs times against one scratch database and times each launch
+from process start to the BACKEND_READY line the Tauri shell waits for. The first launch
+creates the database; the median of the launches after it (an existing database, the normal
+case) must stay within --budget seconds.
+
+Also imports the app once more and fails if a module that should only load on first use
+(Supabase/PostgREST clients, pandas, weasyprint, xlsxwriter, httpx) was imported on the way.
+
+Usage examples:
+  python src-python/test/check_startup_time.py
+  python src-python/test/check_startup_time.py --runs 5 --budget 1.5 --verbose
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PYTHON_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
+MAIN_PY = os.path.join(SRC_PYTHON_DIR, "main.py")
+
+# Imported on first use only; any of these on the startup path is a regression.
+DEFERRED_MODULES = ("supabase", "postgrest", "storage3", "httpx", "pandas", "weasyprint", "xlsxwriter")
+# A launch that has not reported ready by then is counted as failed.
+LAUNCH_TIMEOUT_SECONDS = 60
+
+
+def _child_env(db_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        SSC_DB_DIR=db_dir,
+        # Keep the check away from the real Supabase project.
+        SUPABASE_URL="http://127.0.0.1:9",
+        SERVICE_ROLE_KEY="check-service-role-key",
+        PYTHONUNBUFFERED="1",
+    )
+    env.pop("SSC_PROFILE_BACKEND", None)
+    return env
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_launch(env: dict) -> float:
+    """Seconds from spawning the sidecar to its BACKEND_READY line."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, MAIN_PY, "--mode", "prod", "--port", str(_free_port())],
+        cwd=SRC_PYTHON_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    output = []
+    try:
+        for line in process.stdout:
+            if line.strip() == "BACKEND_READY":
+                return time.perf_counter() - started
+            output.append(line)
+            if time.perf_counter() - started > LAUNCH_TIMEOUT_SECONDS:
+                break
+        raise RuntimeError("The sidecar did not report BACKEND_READY:\n" + "".join(output[-20:]))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def deferred_modules_loaded(env: dict) -> list:
+    """Deferred modules present in sys.modules once the app is built (as on startup, minus the server)."""
+    probe = (
+        "import sys, contextlib, io\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    import main\n"
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=SRC_PYTHON_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    last_line = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return [name for name in last_line.split(",") if name]
+
+
+def slowest_imports(env: dict, limit: int) -> list:
+    """(cumulative seconds, module) of the slowest modules main imports directly, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC_PYTHON_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown as two more spaces of indent per level; main itself sits at one space.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if cumulative.strip().isdigit() and depth == 1:
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail if sidecar startup exceeds its time budget.")
+    parser.add_argument("--runs", type=int, default=4, help="Launches; the first one creates the database.")
+    parser.add_argument("--budget", type=float, default=2.0, help="Allowed median seconds to BACKEND_READY.")
+    parser.add_argument("--verbose", action="store_true", help="Also list the slowest imports of main.")
+    args = parser.parse_args()
+    if args.runs < 2:
+        parser.error("--runs must be at least 2 (the first launch only creates the database)")
+
+    env = _child_env(tempfile.mkdtemp(prefix="ssc-startup-time-"))
+    timings = []
+    for run in range(args.runs):
+        seconds = time_launch(env)
+        timings.append(seconds)
+        print(f"launch {run + 1}: {seconds:.2f}s{'  (new database)' if run == 0 else ''}")
+
+    failures = 0
+    median = statistics.median(timings[1:])
+    over = median > args.budget
+    failures += over
+    print(f"\n{'FAIL' if over else 'ok  '}  median to BACKEND_READY {median:.2f}s (budget {args.budget:.2f}s)")
+
+    loaded = deferred_modules_loaded(env)
+    failures += bool(loaded)
+    print(f"{'FAIL' if loaded else 'ok  '}  deferred modules imported at startup: {', '.join(loaded) or 'none'}")
+
+    if args.verbose:
+        print("\nSlowest imports of main:")
+        for seconds, name in slowest_imports(env, 15):
+            print(f"  {seconds:6.3f}s  {name}")
+
+    if failures:
+        sys.exit(1)
+    print("\nStartup is within budget.")
+
+
+if __name__ == "__main__":
+    main()
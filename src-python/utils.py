@@ -4,11 +4,13 @@ from functools import wraps
 import sys
 from flask import g, jsonify
 from contextlib import contextmanager
-from db_setup import SessionLocal
+from db_setup import SessionLocal, ReadSessionLocal
 import hashlib
 import os
 import string
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from runtime_env import is_compiled_runtime
 
@@ -33,6 +35,19 @@ def get_db():
     finally:
         db.close() # Close the session connection
 
+@contextmanager
+def get_read_db():
+    """
+    Session on the read-only connection pool, for routes that only read.
+    It never waits behind writers; any attempt to write through it raises.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
 # Dynamic session injection decorator
 def inject_db_session(func):
     """
@@ -55,6 +70,20 @@ def inject_db_session(func):
 
     return decorated_function
 
+def inject_read_db_session(func):
+    """Like inject_db_session, but injects a read-only session (see get_read_db)."""
+
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        try:
+            with get_read_db() as db:
+                return func(db, *args, **kwargs)
+        except Exception as e:
+            print(f"Database error during route execution: {e}")
+            return jsonify({"error": "An internal database error occurred."}), 500
+
+    return decorated_function
+
 # Password Hashing Utilities
 def generate_salt():
     """Generates a random salt for password hashing."""
@@ -110,31 +139,21 @@ def get_by_id_or_uuid(db, model, id_column, uuid_column, value):
 
 def get_server_time_or_none():
     """
-    Attempts to fetch the current UTC time from the Supabase server.
+    Returns the current UTC time according to the Supabase server.
     Serves as a connectivity check.
     Returns a datetime object on success, or None on failure (e.g., no internet).
+    Answers come from the cached server clock, so repeated calls don't each pay an RPC round trip.
     """
-    from supabase_client import get_service_role_client # Moved import here to break circular dependency
-    try:
-        service_client = get_service_role_client()
-        # The execute method for rpc might not have a timeout parameter in all client versions.
-        # The underlying http client (httpx) should have a default timeout.
-        response = service_client.rpc('get_server_utc', {}).execute()
-
-        if response.data:
-            # The RPC returns a string like '2024-05-23T10:00:00.123456+00:00'
-            return datetime.fromisoformat(response.data)
-        return None
-    except Exception as e:
-        print(f"Connectivity check failed: Could not connect to Supabase. Error: {e}")
-        return None
+    from server_clock import server_clock
+    return server_clock.server_now()
 
 def require_internet():
     """
     Connectivity check helper.
     Returns (None, None) if online, or (jsonify_error, status_code) if offline.
     """
-    if get_server_time_or_none() is None:
+    from server_clock import server_clock
+    if not server_clock.is_online():
         return jsonify({"error": "Active internet connection required for this action"}), 503
     return None, None
 
@@ -157,11 +176,11 @@ def is_jwt_expired_offline(jwt_issued_at):
     # Use client's current UTC time for the check
     return datetime.now(timezone.utc) > expiration_time
 
-def check_session_validity(user_uuid, device_id):
-    """Return True if the given (user_uuid, device_id) pair has any active
-    authentication row (`is_logged_in=True`) in Supabase.
-    Implements a fail-open policy: network or server errors are treated as
-    valid to avoid locking the user out when connectivity is intermittent.
+def _query_session_validity(user_uuid, device_id):
+    """Ask Supabase whether the (user_uuid, device_id) pair has an active
+    authentication row (`is_logged_in=True`).
+    Returns (is_valid, is_definitive). Fail-open/fail-closed fallbacks are
+    reported as not definitive so they are never cached.
     """
     from supabase_client import get_service_role_client
     from postgrest.exceptions import APIError
@@ -181,10 +200,10 @@ def check_session_validity(user_uuid, device_id):
             .execute()
         )
         # If any active row exists → session is valid
-        return bool(response.data)
+        return bool(response.data), True
     except httpx.TransportError as e:
         logger.warning(f"Session validation failed (network) - assuming valid: {e}")
-        return True  # fail-open
+        return True, False  # fail-open
     except APIError as e:
         status = getattr(e, 'status', None)
         code = getattr(e, 'code', None)
@@ -192,12 +211,86 @@ def check_session_validity(user_uuid, device_id):
             logger.warning(
                 f"Session validation failed (server {status or code}) - assuming valid: {e}"
             )
-            return True  # fail-open for transient server errors
+            return True, False  # fail-open for transient server errors
         logger.error(f"Session validation failed (Supabase) - rejecting: {e}")
-        return False
+        return False, False
     except Exception as e:
         logger.exception(f"Session validation failed due to unexpected error (fail-closed): {e}")
-        return False
+        return False, False
+
+# Cached answers are served as-is for this long...
+SESSION_VALIDITY_REFRESH_AFTER_SECONDS = 30.0
+# ...then served while a background refresh runs, until they expire here.
+SESSION_VALIDITY_MAX_AGE_SECONDS = 120.0
+
+# (user_uuid, device_id) -> (is_valid, monotonic time of the check)
+_session_validity_cache = {}
+_session_validity_refreshing = set()
+_session_validity_lock = threading.Lock()
+# Bumped by every invalidation so checks that were in flight at the time don't repopulate the cache.
+_session_validity_generation = 0
+
+def _store_session_validity(key, result, generation):
+    is_valid, is_definitive = result
+    with _session_validity_lock:
+        if generation != _session_validity_generation:
+            return is_valid
+        if is_definitive:
+            _session_validity_cache[key] = (is_valid, time.monotonic())
+        else:
+            _session_validity_cache.pop(key, None)
+    return is_valid
+
+def _refresh_session_validity_in_background(key):
+    with _session_validity_lock:
+        if key in _session_validity_refreshing:
+            return
+        _session_validity_refreshing.add(key)
+        generation = _session_validity_generation
+
+    def _run():
+        try:
+            _store_session_validity(key, _query_session_validity(*key), generation)
+        finally:
+            with _session_validity_lock:
+                _session_validity_refreshing.discard(key)
+
+    threading.Thread(target=_run, name="session-validity-refresh", daemon=True).start()
+
+def check_session_validity(user_uuid, device_id):
+    """Return True if the given (user_uuid, device_id) pair has any active
+    authentication row (`is_logged_in=True`) in Supabase.
+    Implements a fail-open policy: network or server errors are treated as
+    valid to avoid locking the user out when connectivity is intermittent.
+    Definitive answers are cached per (user_uuid, device_id) and refreshed in
+    the background; login/logout drop them via invalidate_session_validity().
+    """
+    key = (str(user_uuid), str(device_id))
+    with _session_validity_lock:
+        cached = _session_validity_cache.get(key)
+        generation = _session_validity_generation
+
+    if cached is not None:
+        is_valid, checked_at = cached
+        age = time.monotonic() - checked_at
+        if age <= SESSION_VALIDITY_MAX_AGE_SECONDS:
+            if age > SESSION_VALIDITY_REFRESH_AFTER_SECONDS:
+                _refresh_session_validity_in_background(key)
+            return is_valid
+
+    return _store_session_validity(key, _query_session_validity(*key), generation)
+
+def invalidate_session_validity(user_uuid=None, device_id=None):
+    """Drop cached session checks for a user (optionally a single device), or all of them."""
+    global _session_validity_generation
+    with _session_validity_lock:
+        _session_validity_generation += 1
+        if user_uuid is None:
+            _session_validity_cache.clear()
+            return
+        for key in list(_session_validity_cache):
+            if key[0] == str(user_uuid) and (device_id is None or key[1] == str(device_id)):
+                del _session_validity_cache[key]
 
 # --- Hardware-Bound Device ID Helper ---
 
@@ -47,6 +47,7 @@ interface TrendPoint {
 
 interface Stats {
     total_revenue: number;
+    total_invoiced?: number;
     outstanding_invoices: number;
     inventory_value: number;
     revenue_trend: TrendPoint[];
@@ -5,6 +5,13 @@ import { registerStore, StoreKeys } from '@/api/storeRegistry';
 
 // --- 1. Define Types ---
 
+// Blob columns are not inlined in responses; `url` streams the bytes (supports Range and ETag).
+export interface BlobInfo {
+  sha256: string;
+  size: number;
+  url: string;
+}
+
 export interface Document {
   doc_id: number;
   project_id: number;
@@ -13,10 +20,12 @@ export interface Document {
   is_dirty: boolean;
   doc_type: "Invoice" | "Project Breakdown";
   file_name: string;
-  file_blob: string; // Representing LargeBinary as a base64 string
+  file_blob_info: BlobInfo | null;
 }
 
-export type NewDocumentData = Omit<Document, 'doc_id' | 'created_at' | 'updated_at' | 'is_dirty'>;
+export type NewDocumentData = Omit<Document, 'doc_id' | 'created_at' | 'updated_at' | 'is_dirty' | 'file_blob_info'> & {
+  file_blob: string; // base64, upload only
+};
 
 const resource = '/documents';
 
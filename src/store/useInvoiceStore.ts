@@ -31,6 +31,9 @@ export interface Invoice {
   updated_at: string;
   is_dirty: boolean;
   customer_name: string;
+  paid_amount?: number;
+  remainder?: number;
+  last_payment_at?: string | null;
   issued_by_username?: string | null;
   access?: {
     mode: "full" | "view" | "hidden";
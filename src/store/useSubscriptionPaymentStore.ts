@@ -2,6 +2,7 @@
 import { create } from 'zustand';
 import api from '@/api/client';
 import { registerStore, StoreKeys } from '@/api/storeRegistry';
+import type { BlobInfo } from './useDocumentStore';
 
 // --- 1. Define Types ---
 
@@ -11,14 +12,15 @@ export interface SubscriptionPayment {
   amount: number;
   payment_method: string;
   trx_no: string;
-  trx_screenshot?: string; // Base64 or URL
+  trx_screenshot?: string; // base64, upload only
+  trx_screenshot_info?: BlobInfo | null;
   status: "under_processing" | "approved" | "declined";
   created_at: string;
   updated_at: string;
   is_dirty: boolean;
 }
 
-export type NewSubscriptionPaymentData = Omit<SubscriptionPayment, 'payment_id' | 'created_at' | 'updated_at' | 'is_dirty'>;
+export type NewSubscriptionPaymentData = Omit<SubscriptionPayment, 'payment_id' | 'created_at' | 'updated_at' | 'is_dirty' | 'trx_screenshot_info'>;
 
 const resource = '/subscription_payments';
 
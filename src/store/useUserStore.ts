@@ -4,6 +4,7 @@ import { persist } from "zustand/middleware";
 import api from "@/api/client";
 import { registerStore, StoreKeys } from "@/api/storeRegistry";
 import { toast } from "react-hot-toast";
+import type { BlobInfo } from "./useDocumentStore";
 
 // --- 1. Define Types ---
 
@@ -22,7 +23,8 @@ export interface User {
     | "enterprise_tier1"
     | "enterprise_tier2";
   location?: string;
-  business_logo?: any;
+  business_logo?: any; // upload only
+  business_logo_info?: BlobInfo | null;
   business_email?: string;
   status: "active" | "expired" | "grace" | "trial";
   org_id?: number;
@@ -49,9 +49,14 @@ BEGIN
                 CONTINUE; -- Skip records with no fields to update (besides id)
             END IF;
 
+            -- Records may be column deltas: overlay them on the stored row (if any) so the
+            -- proposed insert row still satisfies NOT NULL before ON CONFLICT takes over.
             query := format(
                 'INSERT INTO public.%1$I
-                 SELECT * FROM jsonb_populate_record(null::public.%1$I, $1)
+                 SELECT * FROM jsonb_populate_record(
+                     COALESCE((SELECT t FROM public.%1$I t WHERE t.id = ($1->>''id'')::uuid), null::public.%1$I),
+                     $1
+                 )
                  ON CONFLICT (id) DO UPDATE
                  SET %2$s
                  RETURNING id;',